@@ -1,16 +1,53 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, g, has_request_context
 from flask_cors import CORS
-import pandas as pd
+import click
+from collections import OrderedDict
+from dataclasses import dataclass
+import bisect
+import functools
+import hashlib
+import importlib
+import json
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import unicodedata
+import numpy as np
 import os
-from supabase import create_client, Client
-from sqlalchemy import create_engine, text, inspect
+import subprocess
+import sys
+from sqlalchemy import create_engine, event, text, inspect
 from sqlalchemy.pool import StaticPool
 
+
+class LazyModule:
+    """Stand-in for a heavy module that imports it on first attribute access.
+
+    The first access also rebinds the module-level name to the real module,
+    so later lookups go straight to it.
+    """
+
+    def __init__(self, name, alias):
+        self._name = name
+        self._alias = alias
+
+    def __getattr__(self, attr):
+        # import_module is thread-safe: concurrent first uses share one import
+        module = importlib.import_module(self._name)
+        globals()[self._alias] = module
+        return getattr(module, attr)
+
+
+# pandas is only needed once a request or dataset build touches the data,
+# so importing the app (and answering /healthz) doesn't wait for it
+pd = LazyModule("pandas", "pd")
+
 app = Flask(__name__, static_folder="static")
 
 SUPABASE_URL = os.environ.get('SUPABASE_URL')
 SUPABASE_KEY = os.environ.get('SUPABASE_KEY')
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 DATABASE_URL = os.environ.get('DATABASE_URL')
 
@@ -20,13 +57,24 @@ CORS(app, resources={
     }
 })
 
+# Local SQLite copy of the tables (see `flask load-local-db`), used when
+# DATABASE_URL isn't set
+LOCAL_DB_PATH = os.environ.get("LOCAL_DB_PATH")
+
+
 def get_db_engine():
     """Create SQLAlchemy engine for database connections"""
     database_url = os.getenv('DATABASE_URL')
-    
+
+    if not database_url and LOCAL_DB_PATH:
+        database_url = f"sqlite:///{os.path.abspath(LOCAL_DB_PATH)}"
+
     if not database_url:
-        raise ValueError("DATABASE_URL environment variable not set")
-    
+        raise ValueError("DATABASE_URL (or LOCAL_DB_PATH) environment variable not set")
+
+    if database_url.startswith("sqlite"):
+        return get_local_db_engine(database_url)
+
     # For Supabase/PostgreSQL, make sure URL starts with postgresql://
     if database_url.startswith('postgres://'):
         database_url = database_url.replace('postgres://', 'postgresql://', 1)
@@ -41,13 +89,699 @@ def get_db_engine():
     
     return engine
 
-db_engine = get_db_engine()
+
+def get_local_db_engine(database_url):
+    """Engine for an embedded SQLite database, tuned for read-only serving"""
+    engine = create_engine(
+        database_url,
+        connect_args={"check_same_thread": False},
+        echo=False,
+    )
+
+    @event.listens_for(engine, "connect")
+    def configure_connection(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # The app only reads; map the file and keep a large page cache
+        cursor.execute("PRAGMA query_only = ON")
+        cursor.execute("PRAGMA mmap_size = 268435456")
+        cursor.execute("PRAGMA cache_size = -65536")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+        cursor.close()
+
+    return engine
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """The shared SQLAlchemy engine, created on first use"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = get_db_engine()
+    return _engine
+
+
+def dispose_engine(close=True):
+    """Drop the engine's pooled connections (close=False after a fork)"""
+    if _engine is not None:
+        _engine.dispose(close=close)
+
+_supabase_client = None
+
 
 def get_supabase_client():
-    """Get Supabase client for easier operations"""
-    return supabase
+    """Get Supabase client for easier operations, created on first use"""
+    global _supabase_client
+    if _supabase_client is None:
+        from supabase import create_client
+
+        _supabase_client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    return _supabase_client
+
+
+# Read-only datasets derived from the Lahman/Retrosheet tables. Each one is
+# built the first time it is requested and then shared by every request in
+# the process, since the underlying data only changes on a data load.
+_datasets = {}
+_datasets_lock = threading.RLock()
+_dataset_accessors = []
+
+
+def preloaded_dataset(loader):
+    """Decorator that turns a dataset loader into a build-once accessor"""
+    name = loader.__name__.replace("get_", "", 1)
+
+    @functools.wraps(loader)
+    def get_dataset():
+        dataset = _datasets.get(name)
+        if dataset is None:
+            with _datasets_lock:
+                dataset = _datasets.get(name)
+                if dataset is None:
+                    dataset = loader()
+                    _datasets[name] = dataset
+        return dataset
+
+    get_dataset.dataset_name = name
+    _dataset_accessors.append(get_dataset)
+    return get_dataset
+
+
+# Progress of the boot-time dataset build, reported by /readyz. Datasets
+# that failed (say, the database was briefly down) are retried when /readyz
+# is polled, at most every WARM_UP_RETRY_SECONDS.
+WARM_UP_RETRY_SECONDS = 30
+
+_warm_up = {
+    "state": "pending",
+    "started_at": None,
+    "finished_at": None,
+    "current": None,
+    "built": [],
+    "failed": {},
+    # Popular pages requested into the response caches (see warm_responses)
+    "responses": {"state": "pending", "total": 0, "done": 0, "errors": {}, "elapsed_seconds": None},
+}
+_warm_up_lock = threading.Lock()
+
+
+def warm_datasets():
+    """Build every registered dataset not built yet, logging (not raising) failures"""
+    _warm_up.update(state="running", started_at=time.time(), finished_at=None)
+    for get_dataset in _dataset_accessors:
+        name = get_dataset.dataset_name
+        if name in _warm_up["built"]:
+            continue
+        _warm_up["current"] = name
+        try:
+            get_dataset()
+            _warm_up["built"].append(name)
+            _warm_up["failed"].pop(name, None)
+        except Exception as e:
+            print(f"Failed to build dataset '{name}': {e}")
+            _warm_up["failed"][name] = str(e)
+    _warm_up.update(state="done", current=None, finished_at=time.time())
+
+
+def start_warm_up():
+    """Run the warm-up in a background thread, unless it has run and succeeded"""
+    with _warm_up_lock:
+        retry_due = (
+            _warm_up["state"] == "done"
+            and _warm_up["failed"]
+            and time.time() - _warm_up["finished_at"] >= WARM_UP_RETRY_SECONDS
+        )
+        if _warm_up["state"] != "pending" and not retry_due:
+            return
+        _warm_up["state"] = "starting"
+    threading.Thread(target=run_warm_up, name="warm-up", daemon=True).start()
+
+
+def warm_up_status():
+    """Snapshot of the warm-up progress"""
+    started_at, finished_at = _warm_up["started_at"], _warm_up["finished_at"]
+    elapsed = None
+    if started_at is not None:
+        elapsed = round((finished_at or time.time()) - started_at, 2)
+    return {
+        "state": _warm_up["state"],
+        "current": _warm_up["current"],
+        "datasets_built": len(_warm_up["built"]),
+        "datasets_total": len(_dataset_accessors),
+        "failed": dict(_warm_up["failed"]),
+        "elapsed_seconds": elapsed,
+        "responses": {**_warm_up["responses"], "errors": dict(_warm_up["responses"]["errors"])},
+    }
+
+
+def reset_datasets():
+    """Drop all preloaded datasets so they are rebuilt from the database"""
+    with _datasets_lock:
+        _datasets.clear()
+
+
+# Process-local cache of finished responses. Player and team pages are pure
+# functions of the loaded data, so repeat lookups are served from memory until
+# their TTL runs out or the data version changes.
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+RESPONSE_CACHE_TTLS = {
+    "player": 6 * 60 * 60,
+    "team": 6 * 60 * 60,
+    "h2h": 60 * 60,
+    "leaderboard": 6 * 60 * 60,
+}
+CACHEABLE_STATUSES = {200, 404, 422, 423}
+DATA_VERSION_CHECK_SECONDS = int(os.environ.get("DATA_VERSION_CHECK_SECONDS", "300"))
+
+
+class ResponseCache:
+    """Thread-safe LRU of response bodies with per-entry expiry"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key, data_version):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            expires_at, version, value = entry
+            if expires_at <= now or version != data_version:
+                del self._entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def set(self, key, value, ttl, data_version):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, data_version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.stats["invalidations"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else None,
+            }
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES)
+
+
+# Second cache tier on local disk, shared by every gunicorn worker on the host
+# and kept across worker restarts and deploys. Set SHARED_CACHE_PATH=off to
+# disable it.
+SHARED_CACHE_PATH = os.environ.get(
+    "SHARED_CACHE_PATH", os.path.join(tempfile.gettempdir(), "statlines-response-cache.sqlite3")
+)
+SHARED_CACHE_MAX_BYTES = int(os.environ.get("SHARED_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+SHARED_CACHE_EVICT_EVERY = 64  # writes between size checks
+SHARED_CACHE_TOUCH_SECONDS = 60  # minimum gap between accessed_at updates
+
+
+# Shared entries outlive deploys, so a deploy starts with a warm cache.
+# Bump RESPONSE_SCHEMA_VERSION whenever a cached payload changes shape (as
+# adding run_diff/win_pct to team stats did) so old bodies stop matching.
+# BUILD_VERSION, if set, replaces it; operators can use it to force a
+# fresh cache on a particular deploy.
+RESPONSE_SCHEMA_VERSION = 1
+RESPONSE_VERSION = os.environ.get("BUILD_VERSION") or f"schema-{RESPONSE_SCHEMA_VERSION}"
+
+
+class SharedResponseCache:
+    """SQLite-backed response store shared between processes.
+
+    Each write is a single INSERT OR REPLACE, so readers in other workers
+    only ever see complete entries. Once the stored bodies exceed max_bytes
+    the least recently read entries are deleted. Entries are stored under
+    "<response version>/<data version>" and only match that pair.
+    """
+
+    def __init__(self, path, max_bytes, response_version):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.response_version = response_version
+        self.enabled = bool(path) and path.lower() != "off"
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    data_version TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    status INTEGER NOT NULL,
+                    mimetype TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, stat, amount=1):
+        with self._lock:
+            self.stats[stat] += amount
+
+    def _failed(self, action, error):
+        self._count("errors")
+        print(f"Shared cache {action} failed: {error}")
+        self._local.conn = None
+
+    @staticmethod
+    def serialize_key(key):
+        return json.dumps(key, default=str, separators=(",", ":"))
+
+    def tag(self, data_version):
+        return f"{self.response_version}/{data_version}"
+
+    def get(self, key, data_version):
+        """Return (value, seconds_left) for a live entry, or None"""
+        if not self.enabled:
+            return None
+        try:
+            conn = self._connect()
+            skey = self.serialize_key(key)
+            row = conn.execute(
+                "SELECT body, status, mimetype, expires_at, accessed_at FROM responses "
+                "WHERE key = ? AND data_version = ?",
+                (skey, self.tag(data_version)),
+            ).fetchone()
+            now = time.time()
+            if row is None or row[3] <= now:
+                self._count("misses")
+                return None
+            if now - row[4] > SHARED_CACHE_TOUCH_SECONDS:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, skey))
+            self._count("hits")
+            return (bytes(row[0]), row[1], row[2]), row[3] - now
+        except Exception as e:
+            self._failed("read", e)
+            return None
+
+    def set(self, key, value, ttl, data_version):
+        if not self.enabled:
+            return
+        body, status, mimetype = value
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, data_version, expires_at, accessed_at, status, mimetype, body, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.serialize_key(key), self.tag(data_version), now + ttl, now, status, mimetype, body, len(body)),
+            )
+            self._count("writes")
+            with self._lock:
+                self._writes += 1
+                check_size = self._writes % SHARED_CACHE_EVICT_EVERY == 1
+            if check_size:
+                self.evict(conn)
+        except Exception as e:
+            self._failed("write", e)
+
+    def evict(self, conn):
+        """Drop expired entries, then least recently read ones over the size cap"""
+        now = time.time()
+        removed = conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total > self.max_bytes:
+            # Trim to 90% of the cap so we aren't evicting on every write
+            excess = total - int(self.max_bytes * 0.9)
+            cutoff = conn.execute(
+                "SELECT accessed_at FROM ("
+                "  SELECT accessed_at, SUM(size) OVER (ORDER BY accessed_at, key) AS freed"
+                "  FROM responses"
+                ") WHERE freed >= ? ORDER BY accessed_at LIMIT 1",
+                (excess,),
+            ).fetchone()
+            if cutoff is not None:
+                removed += conn.execute(
+                    "DELETE FROM responses WHERE accessed_at <= ?", (cutoff[0],)
+                ).rowcount
+        if removed:
+            self._count("evictions", removed)
+
+    def invalidate(self, data_version):
+        """Remove entries built against any other data version or response version"""
+        if not self.enabled:
+            return
+        try:
+            self._connect().execute(
+                "DELETE FROM responses WHERE data_version != ?", (self.tag(data_version),)
+            )
+        except Exception as e:
+            self._failed("invalidate", e)
+
+    def snapshot(self):
+        with self._lock:
+            stats = {
+                **self.stats,
+                "enabled": self.enabled,
+                "max_bytes": self.max_bytes,
+                "response_version": self.response_version,
+            }
+        if self.enabled:
+            try:
+                entries, size = self._connect().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()
+                stats.update(entries=entries, bytes=size)
+            except Exception as e:
+                self._failed("stats", e)
+        return stats
+
+
+shared_response_cache = SharedResponseCache(SHARED_CACHE_PATH, SHARED_CACHE_MAX_BYTES, RESPONSE_VERSION)
+
+_data_version = {"value": None, "checked_at": 0.0}
+_data_version_lock = threading.Lock()
+
+
+def fetch_data_version():
+    """Cheap fingerprint of the loaded tables; DATA_VERSION overrides it.
+
+    Row counts catch loads and deletes; sums over the stat columns catch
+    in-place corrections (an UPDATE of a stat line, a WAR re-import with
+    the same row count). Changes outside those columns, such as a name
+    fix, need a DATA_VERSION bump.
+    """
+    pinned = os.environ.get("DATA_VERSION")
+    if pinned:
+        return pinned
+
+    query = text("""
+        SELECT (SELECT COUNT(*) FROM lahman_people),
+               (SELECT COUNT(*) FROM lahman_batting),
+               (SELECT MAX(yearid) FROM lahman_batting),
+               (SELECT COUNT(*) FROM lahman_teams),
+               (SELECT MAX(date) FROM retrosheet_teamstats),
+               (SELECT COUNT(*) FROM jeffbagwell_war)
+    """)
+    # WAR is summed in whole hundredths so the total doesn't depend on the
+    # order the database adds the floats in
+    content_query = text("""
+        SELECT (SELECT SUM(ab) + SUM(h) + SUM(hr) + SUM(rbi) + SUM(bb) + SUM(so) FROM lahman_batting),
+               (SELECT SUM(ipouts) + SUM(er) + SUM(so) + SUM(w) + SUM(sv) FROM lahman_pitching),
+               (SELECT SUM(w) + SUM(l) + SUM(r) + SUM(ra) FROM lahman_teams),
+               (SELECT SUM(win) FROM retrosheet_teamstats),
+               (SELECT SUM(ROUND(WAR162 * 100)) FROM jeffbagwell_war)
+    """)
+    with get_engine().connect() as conn:
+        row = conn.execute(query).fetchone()
+        content = conn.execute(content_query).fetchone()
+    checksum = hashlib.sha1(repr([None if v is None else int(v) for v in content]).encode()).hexdigest()[:8]
+    return "-".join(str(value) for value in row) + f"-{checksum}"
+
+
+def get_data_version():
+    """Current data version, re-checked at most every DATA_VERSION_CHECK_SECONDS.
+
+    When the version changes, cached responses and preloaded datasets are
+    dropped so they get rebuilt from the new data.
+    """
+    now = time.monotonic()
+    if _data_version["value"] is not None and now - _data_version["checked_at"] < DATA_VERSION_CHECK_SECONDS:
+        return _data_version["value"]
+
+    with _data_version_lock:
+        if _data_version["value"] is not None and now - _data_version["checked_at"] < DATA_VERSION_CHECK_SECONDS:
+            return _data_version["value"]
+        try:
+            version = fetch_data_version()
+        except Exception as e:
+            print(f"Data version check failed: {e}")
+            version = _data_version["value"] or "unknown"
+
+        previous = _data_version["value"]
+        if previous is not None and version != previous:
+            print(f"Data version changed ({previous} -> {version}), invalidating caches")
+            response_cache.clear()
+            shared_response_cache.invalidate(version)
+            reset_datasets()
+        _data_version["value"] = version
+        _data_version["checked_at"] = now
+        return version
+
+
+# On-disk snapshot of the largest datasets: one .npy file per array plus a
+# header.json. Workers open the arrays with mmap, so they start without
+# querying the tables and share the pages through the OS page cache.
+# Build it with `flask build-snapshot`; SNAPSHOT_DIR=off disables it.
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_DIR = os.environ.get(
+    "SNAPSHOT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshot")
+)
+
+_snapshot = {"header": None, "loaded": False, "disabled": SNAPSHOT_DIR.lower() == "off"}
+_snapshot_lock = threading.Lock()
+
+
+def read_snapshot_header():
+    """The snapshot's header.json, or None when there's no usable snapshot"""
+    if _snapshot["disabled"]:
+        return None
+    if not _snapshot["loaded"]:
+        with _snapshot_lock:
+            if not _snapshot["loaded"]:
+                header = None
+                try:
+                    with open(os.path.join(SNAPSHOT_DIR, "header.json")) as f:
+                        header = json.load(f)
+                    if header.get("format") != SNAPSHOT_FORMAT:
+                        print(f"Ignoring snapshot format {header.get('format')}, expected {SNAPSHOT_FORMAT}")
+                        header = None
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    print(f"Snapshot header unreadable: {e}")
+                _snapshot["header"] = header
+                _snapshot["loaded"] = True
+    return _snapshot["header"]
+
+
+def read_snapshot_dataset(name):
+    """(arrays, meta) of a dataset in the snapshot, memory-mapped, or None.
+
+    A snapshot taken at another data version is ignored, unless the
+    database can't be reached to tell.
+    """
+    header = read_snapshot_header()
+    if header is None or name not in header["datasets"]:
+        return None
+
+    version = get_data_version()
+    if version not in (header["data_version"], "unknown"):
+        print(f"Snapshot is from data version {header['data_version']}, not {version}; building '{name}' from the database")
+        return None
+
+    entry = header["datasets"][name]
+    try:
+        arrays = {
+            # Plain ndarray views, still backed by the mapped file
+            key: np.load(
+                os.path.join(SNAPSHOT_DIR, filename), mmap_mode="r", allow_pickle=False
+            ).view(np.ndarray)
+            for key, filename in entry["arrays"].items()
+        }
+    except Exception as e:
+        print(f"Snapshot of '{name}' unreadable, building it from the database: {e}")
+        return None
+    return arrays, entry["meta"]
+
+
+def write_snapshot(path, datasets, data_version):
+    """Write datasets (name -> dataset with to_snapshot()) as a snapshot at path.
+
+    The snapshot is written to a staging directory and swapped in with
+    renames, so workers never see a half-written one.
+    """
+    staging = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    header = {
+        "format": SNAPSHOT_FORMAT,
+        "data_version": data_version,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "datasets": {},
+    }
+    for name, dataset in datasets.items():
+        arrays, meta = dataset.to_snapshot()
+        files = {}
+        for key, array in arrays.items():
+            files[key] = f"{name}.{key}.npy"
+            np.save(os.path.join(staging, files[key]), np.ascontiguousarray(array), allow_pickle=False)
+        header["datasets"][name] = {"arrays": files, "meta": meta}
+
+    with open(os.path.join(staging, "header.json"), "w") as f:
+        json.dump(header, f, indent=2)
+
+    previous = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.rename(path, previous)
+    os.rename(staging, path)
+    shutil.rmtree(previous, ignore_errors=True)
+    return header
 
 
+def normalize_name_key(name):
+    """Case-folded, whitespace-collapsed name for cache keys"""
+    return " ".join(name.split()).casefold()
+
+
+def player_cache_key():
+    name = request.args.get("name", "")
+    if " " not in name:
+        return None
+    return (
+        request.path,
+        normalize_name_key(name),
+        request.args.get("mode", "career").lower(),
+        request.args.get("player_type", "").lower(),
+    )
+
+
+def team_cache_key():
+    team = request.args.get("team", "").strip()
+    if not team:
+        return None
+    team_id, year = parse_team_input(team)
+    return (
+        "team",
+        team_id,
+        year,
+        request.args.get("mode", "season").lower(),
+        request.args.get("from", "").strip(),
+        request.args.get("to", "").strip(),
+    )
+
+
+def h2h_cache_key():
+    team_a = request.args.get("team_a")
+    team_b = request.args.get("team_b")
+    if not team_a or not team_b:
+        return None
+    team_a_id, _ = parse_team_input(team_a)
+    team_b_id, _ = parse_team_input(team_b)
+    return (
+        "h2h",
+        team_a_id,
+        team_b_id,
+        (request.args.get("year") or "").strip(),
+        request.args.get("from", "").strip(),
+        request.args.get("to", "").strip(),
+    )
+
+
+def leaderboard_cache_key():
+    return ("leaderboard",) + tuple(
+        request.args.get(arg, "").strip().lower()
+        for arg in ("award", "league", "decade", "position", "franchise", "limit", "offset", "player")
+    )
+
+
+def h2h_matrix_cache_key():
+    return (
+        "h2h-matrix",
+        request.args.get("year", "").strip(),
+        request.args.get("from", "").strip(),
+        request.args.get("to", "").strip(),
+    )
+
+
+def skip_response_cache(reason):
+    """Keep the current response out of the caches, e.g. when a fallback
+    answered with placeholder data after a database error"""
+    if has_request_context():
+        g.skip_response_cache = reason
+
+
+def cached_route(route_name, make_key):
+    """Serve a view from the response cache, keyed by make_key().
+
+    Goes under @app.route so the cached wrapper is what gets registered.
+    Requests whose key can't be built bypass the cache. Responses are only
+    stored with a status in CACHEABLE_STATUSES and when nothing called
+    skip_response_cache() while building them.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                key = make_key()
+            except Exception:
+                key = None
+            if key is None:
+                return view(*args, **kwargs)
+
+            version = get_data_version()
+            cached = response_cache.get(key, version)
+            cache_status = "HIT"
+            if cached is None:
+                shared = shared_response_cache.get(key, version)
+                if shared is not None:
+                    # Promote to this worker's memory for the rest of its TTL
+                    cached, seconds_left = shared
+                    response_cache.set(key, cached, seconds_left, version)
+                    cache_status = "SHARED-HIT"
+            if cached is not None:
+                body, status, mimetype = cached
+                response = app.response_class(body, status=status, mimetype=mimetype)
+                response.headers["X-Cache"] = cache_status
+                return response
+
+            response = app.make_response(view(*args, **kwargs))
+            if (
+                response.status_code in CACHEABLE_STATUSES
+                and not response.direct_passthrough
+                and not g.get("skip_response_cache")
+            ):
+                value = (response.get_data(), response.status_code, response.mimetype)
+                ttl = RESPONSE_CACHE_TTLS[route_name]
+                response_cache.set(key, value, ttl, version)
+                shared_response_cache.set(key, value, ttl, version)
+            response.headers["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
+
 
 KNOWN_TWO_WAY_PLAYERS = {
     # Modern era two-way players
@@ -66,12 +800,21 @@ def is_predefined_two_way_player(playerid):
     return playerid in KNOWN_TWO_WAY_PLAYERS
 
 
+def two_way_prompt_message(playerid, first, last):
+    """Message for the 423 two-way prompt; only the predefined list is called known"""
+    if is_predefined_two_way_player(playerid):
+        reason = "is a known two-way player"
+    else:
+        reason = "has significant pitching and hitting stats"
+    return f"{first} {last} {reason}. Please select which stats to display:"
+
+
 def detect_two_way_player_simple(playerid, conn):
-    """Simplified two-way detection using only predefined list"""
+    """Two-way detection: the predefined list overrides the precomputed type table"""
     if is_predefined_two_way_player(playerid):
         return "two-way"
 
-    # For all other players, use the original detection logic
+    # For all other players, use the data-driven classification
     return detect_player_type(playerid, conn)
 
 
@@ -84,35 +827,7 @@ def get_world_series_championships(playerid, conn):
     from sqlalchemy import text
     
     try:
-        ws_query = text("""
-        SELECT DISTINCT b.yearid, b.teamid, s.name as team_name
-        FROM lahman_batting b
-        JOIN lahman_seriespost sp ON b.yearid = sp.yearid AND b.teamid = sp.teamidwinner
-        LEFT JOIN lahman_teams s ON b.teamid = s.teamid AND b.yearid = s.yearid
-        WHERE b.playerid = :playerid AND sp.round = 'WS'
-        
-        UNION
-        
-        SELECT DISTINCT p.yearid, p.teamid, s.name as team_name
-        FROM lahman_pitching p
-        JOIN lahman_seriespost sp ON p.yearid = sp.yearid AND p.teamid = sp.teamidwinner
-        LEFT JOIN lahman_teams s ON p.teamid = s.teamid AND p.yearid = s.yearid
-        WHERE p.playerid = :playerid AND sp.round = 'WS'
-        
-        ORDER BY 1 DESC
-        """)
-
-        with db_engine.connect() as conn:
-            ws_results = conn.execute(ws_query, {"playerid": playerid}).fetchall()
-
-        championships = []
-        for row in ws_results:
-            year, team_id, team_name = row
-            championships.append(
-                {"year": year, "team": team_id, "team_name": team_name or team_id}
-            )
-
-        return championships
+        return get_postseason_index().championships(playerid)
 
     except Exception as e:
         # Fallback: check awards table for WS entries
@@ -124,7 +839,7 @@ def get_world_series_championships(playerid, conn):
                 ORDER BY yearid DESC
             """)
 
-            with db_engine.connect() as conn:
+            with get_engine().connect() as conn:
                 fallback_results = conn.execute(fallback_query, {"playerid": playerid}).fetchall()
                 
             championships = []
@@ -153,7 +868,7 @@ def get_career_war(playerid):
             WHERE key_bbref = :playerid
         """)
 
-        with db_engine.connect() as conn:
+        with get_engine().connect() as conn:
             result = conn.execute(query, {"playerid": playerid}).fetchone()
 
         if result and result[0] is not None:
@@ -167,7 +882,12 @@ def get_career_war(playerid):
 def get_season_war_history(playerid):
     """Get season-by-season WAR from JEFFBAGWELL database"""
     from sqlalchemy import text
-    
+
+    try:
+        return get_player_stats_store().sections["war"].frame(playerid)
+    except Exception as e:
+        print(f"Player stats store unavailable, querying WAR history: {e}")
+
     try:
         query = text("""
             SELECT year_ID, WAR162 as war
@@ -176,7 +896,7 @@ def get_season_war_history(playerid):
             ORDER BY year_ID DESC
         """)
         
-        df = pd.read_sql_query(query, db_engine, params={"playerid": playerid})
+        df = pd.read_sql_query(query, get_engine(), params={"playerid": playerid})
     
         if 'year_ID' in df.columns:
             df = df.rename(columns={'year_ID': 'yearid'})
@@ -188,41 +908,93 @@ def get_season_war_history(playerid):
         return pd.DataFrame()
 
 def detect_player_type(playerid, conn):
-    """Detect if player is primarily a pitcher or hitter based on their stats"""
+    """Detect if player is primarily a pitcher, hitter or two-way player based on their stats"""
+    return get_player_type_table().get(playerid, "hitter")
+
+
+def classify_player_type(pitch_seasons, total_games_pitched, total_starts, bat_seasons, total_at_bats):
+    """Apply the hitter/pitcher thresholds to a player's career aggregates"""
+    if pitch_seasons >= 3 or total_games_pitched >= 50 or total_starts >= 10:
+        return "pitcher"
+    elif bat_seasons >= 3 or total_at_bats >= 300:
+        return "hitter"
+    else:
+        return "pitcher" if pitch_seasons > 0 else "hitter"
+
+
+# A season counts toward two-way detection as a hitting season when the
+# player batted in at least this many games beyond the ones they pitched
+TWO_WAY_MIN_NON_PITCHING_GAMES = 20
+
+
+@preloaded_dataset
+def get_player_type_table():
+    """
+    Classify every player as pitcher/hitter/two-way in one grouped pass.
+
+    Pitcher and hitter use the classify_player_type thresholds. A pitcher is
+    also two-way when the player's hitting seasons (see
+    TWO_WAY_MIN_NON_PITCHING_GAMES) meet the hitter thresholds on their own.
+    """
     from sqlalchemy import text
+
     pitching_query = text("""
-    SELECT COUNT(*) as pitch_seasons, SUM(g) as total_games_pitched, SUM(gs) as total_starts
-    FROM lahman_pitching WHERE playerid = :playerid
+    SELECT playerid, yearid, COUNT(*) as stints, SUM(g) as g, SUM(gs) as gs
+    FROM lahman_pitching
+    GROUP BY playerid, yearid
     """)
 
     batting_query = text("""
-    SELECT COUNT(*) as bat_seasons, SUM(g) as total_games_batted, SUM(ab) as total_at_bats
-    FROM lahman_batting WHERE playerid = :playerid
+    SELECT playerid, yearid, COUNT(*) as stints, SUM(g) as g, SUM(ab) as ab
+    FROM lahman_batting
+    GROUP BY playerid, yearid
     """)
-    
-    with db_engine.connect() as conn:
-        pitch_result = conn.execute(pitching_query, {"playerid": playerid}).fetchone()
-        bat_result = conn.execute(batting_query, {"playerid": playerid}).fetchone()
 
-    pitch_seasons = pitch_result[0] if pitch_result else 0
-    total_games_pitched = pitch_result[1] if pitch_result and pitch_result[1] else 0
-    total_starts = pitch_result[2] if pitch_result and pitch_result[2] else 0
+    with get_engine().connect() as conn:
+        pitching = pd.read_sql_query(pitching_query, conn)
+        batting = pd.read_sql_query(batting_query, conn)
+
+    seasons = batting.merge(
+        pitching, on=["playerid", "yearid"], how="outer", suffixes=("_bat", "_pitch")
+    ).fillna({"stints_bat": 0, "g_bat": 0, "ab": 0, "stints_pitch": 0, "g_pitch": 0, "gs": 0})
+
+    hitting_season = (seasons["g_bat"] - seasons["g_pitch"]) >= TWO_WAY_MIN_NON_PITCHING_GAMES
+    seasons["hitting_seasons"] = hitting_season.astype(int)
+    seasons["hitting_ab"] = seasons["ab"].where(hitting_season, 0)
+
+    career = seasons.groupby("playerid").agg(
+        pitch_seasons=("stints_pitch", "sum"),
+        games_pitched=("g_pitch", "sum"),
+        starts=("gs", "sum"),
+        bat_seasons=("stints_bat", "sum"),
+        at_bats=("ab", "sum"),
+        hitting_seasons=("hitting_seasons", "sum"),
+        hitting_ab=("hitting_ab", "sum"),
+    )
+
+    pitcher = (career["pitch_seasons"] >= 3) | (career["games_pitched"] >= 50) | (career["starts"] >= 10)
+    hitter = (career["bat_seasons"] >= 3) | (career["at_bats"] >= 300)
+    two_way = pitcher & ((career["hitting_seasons"] >= 3) | (career["hitting_ab"] >= 300))
 
-    bat_seasons = bat_result[0] if bat_result else 0
-    total_games_batted = bat_result[1] if bat_result and bat_result[1] else 0
-    total_at_bats = bat_result[2] if bat_result and bat_result[2] else 0
+    player_type = np.where(
+        two_way, "two-way",
+        np.where(pitcher, "pitcher",
+                 np.where(hitter, "hitter",
+                          np.where(career["pitch_seasons"] > 0, "pitcher", "hitter"))))
 
-    if pitch_seasons >= 3 or total_games_pitched >= 50 or total_starts >= 10:
-        return "pitcher"
-    elif bat_seasons >= 3 or total_at_bats >= 300:
-        return "hitter"
-    else:
-        return "pitcher" if pitch_seasons > 0 else "hitter"
+    # Only three distinct strings, so the dict values are shared
+    types = {"two-way": "two-way", "pitcher": "pitcher", "hitter": "hitter"}
+    return {playerid: types[t] for playerid, t in zip(career.index, player_type)}
 
 
 def get_player_awards(playerid, conn):
     """Get all awards for a player from the lahman database"""
     from sqlalchemy import text
+
+    try:
+        return get_awards_index().payload(playerid)
+    except Exception as e:
+        print(f"Awards index unavailable, querying directly: {e}")
     
     try:
         # Query for all awards
@@ -233,44 +1005,20 @@ def get_player_awards(playerid, conn):
         ORDER BY yearid DESC, awardid
         """)
 
-        with db_engine.connect() as conn:
+        with get_engine().connect() as conn:
             awards_data = conn.execute(awards_query, {"playerid": playerid}).fetchall()
             
-        awards = []
-        for row in awards_data:
-            year, award_id, league, tie, notes = row
-
-            # Format award name for display
-            award_display = format_award_name(award_id)
-
-            award_info = {
-                "year": year,
-                "award": award_display,
-                "award_id": award_id,
-                "league": league,
-                "tie": bool(tie) if tie else False,
-                "notes": notes,
-            }
-            awards.append(award_info)
-
-        # Group and summarize awards
-        award_summary = summarize_awards(awards)
-
         # Get MLB All-Star Game appearances:
         allstar_games = get_allstar_appearances(playerid, conn)
 
         # Get world series championships
         ws_championships = get_world_series_championships(playerid, conn)
 
-        return {
-            "awards": awards,
-            "summary": award_summary,
-            "mlbAllStar": allstar_games,
-            "world_series_championships": ws_championships,
-            "ws_count": len(ws_championships),
-        }
+        return format_awards_payload(awards_data, allstar_games, ws_championships)
 
     except Exception as e:
+        print(f"get_player_awards error: {e}")
+        skip_response_cache("awards unavailable")
         return {
             "awards": [],
             "summary": {},
@@ -280,43 +1028,76 @@ def get_player_awards(playerid, conn):
         }
 
 
-def format_award_name(award_id):
-    """Convert award IDs to readable names"""
-    award_names = {
-        "MVP": "Most Valuable Player",
-        "CYA": "Cy Young Award",
-        "CY": "Cy Young Award",
-        "ROY": "Rookie of the Year",
-        "GG": "Gold Glove",
-        "SS": "Silver Slugger",
-        "AS": "TSN All-Star Team",
-        "WSMVP": "World Series MVP",
-        "WS": "World Series Champion",
-        "ALCS MVP": "ALCS MVP",
-        "NLCS MVP": "NLCS MVP",
-        "ASG MVP": "All-Star Game MVP",
-        "ASGMVP": "All-Star Game MVP",
-        "COMEB": "Comeback Player of the Year",
-        "Hutch": "Hutch Award",
-        "Lou Gehrig": "Lou Gehrig Memorial Award",
-        "Babe Ruth": "Babe Ruth Award",
-        "Roberto Clemente": "Roberto Clemente Award",
-        "Branch Rickey": "Branch Rickey Award",
-        "Hank Aaron": "Hank Aaron Award",
-        "DHL Hometown Hero": "DHL Hometown Hero",
-        "Edgar Martinez": "Edgar Martinez Outstanding DH Award",
-        "Hutch Award": "Hutch Award",
-        "Man of the Year": "Man of the Year",
-        "Players Choice": "Players Choice Award",
-        "Reliever": "Reliever of the Year",
-        "TSN Fireman": "The Sporting News Fireman Award",
-        "TSN MVP": "The Sporting News MVP",
-        "TSN Pitcher": "The Sporting News Pitcher of the Year",
-        "TSN Player": "The Sporting News Player of the Year",
-        "TSN Rookie": "The Sporting News Rookie of the Year",
+def format_awards_payload(awards_data, allstar_games, ws_championships):
+    """Build the awards section of a player profile from raw award rows"""
+    awards = []
+    for row in awards_data:
+        year, award_id, league, tie, notes = row
+
+        # Format award name for display
+        award_display = format_award_name(award_id)
+
+        award_info = {
+            "year": year,
+            "award": award_display,
+            "award_id": award_id,
+            "league": league,
+            "tie": bool(tie) if tie else False,
+            "notes": notes,
+        }
+        awards.append(award_info)
+
+    # Group and summarize awards
+    award_summary = summarize_awards(awards)
+
+    return {
+        "awards": awards,
+        "summary": award_summary,
+        "mlbAllStar": allstar_games,
+        "world_series_championships": ws_championships,
+        "ws_count": len(ws_championships),
     }
 
-    return award_names.get(award_id, award_id)
+
+# Lahman award IDs -> display names
+AWARD_NAMES = {
+    "MVP": "Most Valuable Player",
+    "CYA": "Cy Young Award",
+    "CY": "Cy Young Award",
+    "ROY": "Rookie of the Year",
+    "GG": "Gold Glove",
+    "SS": "Silver Slugger",
+    "AS": "TSN All-Star Team",
+    "WSMVP": "World Series MVP",
+    "WS": "World Series Champion",
+    "ALCS MVP": "ALCS MVP",
+    "NLCS MVP": "NLCS MVP",
+    "ASG MVP": "All-Star Game MVP",
+    "ASGMVP": "All-Star Game MVP",
+    "COMEB": "Comeback Player of the Year",
+    "Hutch": "Hutch Award",
+    "Lou Gehrig": "Lou Gehrig Memorial Award",
+    "Babe Ruth": "Babe Ruth Award",
+    "Roberto Clemente": "Roberto Clemente Award",
+    "Branch Rickey": "Branch Rickey Award",
+    "Hank Aaron": "Hank Aaron Award",
+    "DHL Hometown Hero": "DHL Hometown Hero",
+    "Edgar Martinez": "Edgar Martinez Outstanding DH Award",
+    "Hutch Award": "Hutch Award",
+    "Man of the Year": "Man of the Year",
+    "Players Choice": "Players Choice Award",
+    "Reliever": "Reliever of the Year",
+    "TSN Fireman": "The Sporting News Fireman Award",
+    "TSN MVP": "The Sporting News MVP",
+    "TSN Pitcher": "The Sporting News Pitcher of the Year",
+    "TSN Player": "The Sporting News Player of the Year",
+    "TSN Rookie": "The Sporting News Rookie of the Year",
+}
+
+
+def format_award_name(award_id):
+    """Convert award IDs to readable names"""
+    return AWARD_NAMES.get(award_id, award_id)
 
 
 def summarize_awards(awards):
@@ -345,6 +1126,11 @@ def summarize_awards(awards):
 def get_allstar_appearances(playerid, conn):
     """Get MLB All-Star Game appearances from AllstarFull table"""
     from sqlalchemy import text
+
+    try:
+        return get_awards_index().allstar_games.get(playerid, 0)
+    except Exception as e:
+        print(f"Awards index unavailable, querying directly: {e}")
     
     try:
         query = text("""
@@ -352,19 +1138,607 @@ def get_allstar_appearances(playerid, conn):
             FROM lahman_allstarfull 
             WHERE playerid = :playerid
         """)
-        with db_engine.connect() as conn:
+        with get_engine().connect() as conn:
             result = conn.execute(query, {"playerid": playerid}).fetchone()
         
         return result[0] if result else 0
     except Exception as e:
         return 0
 
+@dataclass(frozen=True)
+class AwardsIndex:
+    """Every player's awards section, built once from the awards tables.
+
+    payloads are shared between requests and must not be modified.
+    """
+    payloads: dict
+    allstar_games: dict
+
+    def payload(self, playerid):
+        payload = self.payloads.get(playerid)
+        if payload is None:
+            return format_awards_payload([], 0, [])
+        return payload
+
+
+@preloaded_dataset
+def get_awards_index():
+    """Precompute the awards payload of every player with an award, All-Star game or title"""
+    awards_df = pd.read_sql_query(
+        text("SELECT playerid, yearid, awardid, lgid, tie, notes FROM lahman_awardsplayers"),
+        get_engine(),
+    )
+    awards_df = awards_df.sort_values(["playerid", "awardid"], kind="stable")
+    awards_df = awards_df.sort_values(["playerid", "yearid"], ascending=[True, False], kind="stable")
+    awards_df = awards_df.astype(object).where(awards_df.notna(), None)
+
+    award_rows = {}
+    for row in awards_df.itertuples(index=False):
+        award_rows.setdefault(row.playerid, []).append(
+            (int(row.yearid), row.awardid, row.lgid, row.tie, row.notes)
+        )
+
+    allstar_df = pd.read_sql_query(
+        text("""
+            SELECT playerid, COUNT(*) AS allstar_games
+            FROM lahman_allstarfull
+            GROUP BY playerid
+        """),
+        get_engine(),
+    )
+    allstar_games = {
+        playerid: int(games)
+        for playerid, games in zip(allstar_df["playerid"], allstar_df["allstar_games"])
+    }
+
+    postseason = get_postseason_index()
+    playerids = set(award_rows) | set(allstar_games) | set(postseason.ws_titles)
+    payloads = {
+        playerid: format_awards_payload(
+            award_rows.get(playerid, []),
+            allstar_games.get(playerid, 0),
+            postseason.championships(playerid),
+        )
+        for playerid in playerids
+    }
+
+    return AwardsIndex(payloads=payloads, allstar_games=allstar_games)
+
+
+# Leaderboard filters, in key order after the award. Any of them can be
+# left open (None) to rank across all values.
+LEADERBOARD_FILTERS = ("league", "decade", "position", "franchise")
+LEADERBOARD_POSITIONS = {"P", "C", "1B", "2B", "3B", "SS", "LF", "CF", "RF", "OF", "DH"}
+ALLSTAR_LEADERBOARD = "MLB All-Star Game"
+ALLSTAR_STARTING_POSITIONS = {
+    1: "P", 2: "C", 3: "1B", 4: "2B", 5: "3B", 6: "SS", 7: "LF", 8: "CF", 9: "RF", 10: "DH",
+}
+
+
+@dataclass(frozen=True)
+class AwardLeaderboards:
+    """Award and All-Star counts ranked per (award, league, decade, position, franchise).
+
+    Every leaderboard is a slice of the same arrays. In ranked_* order a
+    slice runs from most awards to fewest (ties by playerid), and
+    ranked_neg_counts is ascending within it so ranks come from
+    searchsorted. lookup_* holds the same slice ordered by playerid for
+    finding one player's count.
+    """
+    boards: dict
+    ranked_players: np.ndarray
+    ranked_neg_counts: np.ndarray
+    lookup_players: np.ndarray
+    lookup_counts: np.ndarray
+    award_aliases: dict
+    franchise_aliases: dict
+    names: dict
+
+    def resolve_award(self, award):
+        return self.award_aliases.get(award.strip().lower())
+
+    def resolve_franchise(self, franchise):
+        return self.franchise_aliases.get(franchise.strip().upper())
+
+    def awards(self):
+        """Every award with its all-time total, most common first"""
+        totals = [
+            (key[0], total) for key, (_, _, total) in self.boards.items()
+            if key[1:] == (None,) * len(LEADERBOARD_FILTERS)
+        ]
+        return sorted(totals, key=lambda item: (-item[1], item[0]))
+
+    def board(self, award, league=None, decade=None, position=None, franchise=None):
+        """(start, end, total awards) of a leaderboard, or None if it's empty"""
+        return self.boards.get((award, league, decade, position, franchise))
+
+    def top(self, board, limit, offset=0):
+        """[(rank, playerid, count)] for a page of a leaderboard"""
+        start, end, _ = board
+        first, last = min(start + offset, end), min(start + offset + limit, end)
+        page = self.ranked_neg_counts[first:last]
+        # Tied counts share the rank of the first player with that count
+        ranks = np.searchsorted(self.ranked_neg_counts[start:end], page, side="left") + 1
+        return [
+            (int(rank), str(playerid), -int(neg))
+            for rank, playerid, neg in zip(ranks, self.ranked_players[first:last], page)
+        ]
+
+    def rank_of(self, board, playerid):
+        """(rank, count) of a player on a leaderboard, or None if they aren't on it"""
+        start, end, _ = board
+        position = start + int(np.searchsorted(self.lookup_players[start:end], playerid))
+        if position >= end or self.lookup_players[position] != playerid:
+            return None
+        count = int(self.lookup_counts[position])
+        rank = int(np.searchsorted(self.ranked_neg_counts[start:end], -count, side="left")) + 1
+        return rank, count
+
+
+@preloaded_dataset
+def get_award_leaderboards():
+    """Rank award and All-Star counts for every combination of filters"""
+    awards_df = pd.read_sql_query(
+        text("SELECT playerid, awardid, yearid, lgid, notes FROM lahman_awardsplayers"),
+        get_engine(),
+    )
+    allstar_df = pd.read_sql_query(
+        text("""
+            SELECT s.playerid, s.yearid, s.lgid, s.startingpos, t.franchid
+            FROM lahman_allstarfull s
+            LEFT JOIN lahman_teams t ON s.teamid = t.teamid AND s.yearid = t.yearid
+        """),
+        get_engine(),
+    )
+    teams_df = pd.read_sql_query(
+        text("SELECT teamid, franchid, yearid FROM lahman_teams WHERE franchid IS NOT NULL"),
+        get_engine(),
+    ).sort_values("yearid", kind="stable")
+
+    records = pd.concat([
+        pd.DataFrame({
+            "playerid": awards_df["playerid"],
+            "award": awards_df["awardid"].map(format_award_name),
+            "league": awards_df["lgid"],
+            "decade": awards_df["yearid"] // 10 * 10,
+            # Position awards (Gold Glove, Silver Slugger, ...) note the position
+            "position": awards_df["notes"].where(awards_df["notes"].isin(LEADERBOARD_POSITIONS)),
+            "franchise": None,
+        }),
+        pd.DataFrame({
+            "playerid": allstar_df["playerid"],
+            "award": ALLSTAR_LEADERBOARD,
+            "league": allstar_df["lgid"],
+            "decade": allstar_df["yearid"] // 10 * 10,
+            "position": pd.to_numeric(allstar_df["startingpos"], errors="coerce").map(ALLSTAR_STARTING_POSITIONS),
+            "franchise": allstar_df["franchid"],
+        }),
+    ], ignore_index=True).dropna(subset=["playerid", "award"])
+    records = records.astype(object).where(records.notna(), None)
+
+    # Count every player once per combination of open and fixed filters
+    key_columns = ["award", *LEADERBOARD_FILTERS]
+    counted = []
+    for mask in range(1 << len(LEADERBOARD_FILTERS)):
+        fixed = [f for bit, f in enumerate(LEADERBOARD_FILTERS) if mask & (1 << bit)]
+        subset = records.dropna(subset=fixed)
+        if subset.empty:
+            continue
+        counts = subset.groupby(["award", *fixed, "playerid"]).size().reset_index(name="count")
+        for column in LEADERBOARD_FILTERS:
+            if column not in fixed:
+                counts[column] = "*"
+        counted.append(counts[key_columns + ["playerid", "count"]])
+
+    if counted:
+        counts = pd.concat(counted, ignore_index=True)
+    else:
+        counts = pd.DataFrame(columns=key_columns + ["playerid", "count"])
+    counts["board"] = counts.groupby(key_columns, sort=False).ngroup()
+    counts["count"] = counts["count"].astype(np.int32)
+
+    ranked = counts.sort_values(["board", "count", "playerid"], ascending=[True, False, True])
+    lookup = counts.sort_values(["board", "playerid"])
+
+    board_ids = ranked["board"].to_numpy()
+    starts = np.flatnonzero(np.r_[True, board_ids[1:] != board_ids[:-1]]) if len(board_ids) else np.array([], dtype=int)
+    ends = np.r_[starts[1:], len(board_ids)]
+    ranked_counts = ranked["count"].to_numpy()
+    totals = np.add.reduceat(ranked_counts, starts) if len(starts) else []
+
+    key_rows = ranked[key_columns].to_numpy()
+    boards = {}
+    for start, end, total in zip(starts, ends, totals):
+        key = tuple(None if value == "*" else value for value in key_rows[start])
+        if key[2] is not None:
+            key = key[:2] + (int(key[2]),) + key[3:]
+        boards[key] = (int(start), int(end), int(total))
+
+    award_aliases = {}
+    for award_id, display in AWARD_NAMES.items():
+        award_aliases[award_id.lower()] = display
+    for award_id in awards_df["awardid"].dropna().unique():
+        award_aliases[award_id.lower()] = format_award_name(award_id)
+    for alias in ("asg", "all-star", "allstar", "all-star game", ALLSTAR_LEADERBOARD.lower()):
+        award_aliases[alias] = ALLSTAR_LEADERBOARD
+    award_aliases.update({key[0].lower(): key[0] for key in boards})
+
+    # Franchise IDs resolve to themselves, team IDs to their latest franchise
+    franchise_aliases = dict(zip(teams_df["teamid"], teams_df["franchid"]))
+    franchise_aliases.update({franchid: franchid for franchid in teams_df["franchid"]})
+
+    directory = get_player_directory()
+    ranked_ids = set(counts["playerid"])
+    names = {
+        entry[2]: " ".join(part for part in entry[:2] if part)
+        for entry in directory.entries
+        if entry[2] in ranked_ids
+    }
+
+    arrays = {
+        "ranked_players": ranked["playerid"].to_numpy(dtype=str),
+        "ranked_neg_counts": -ranked_counts,
+        "lookup_players": lookup["playerid"].to_numpy(dtype=str),
+        "lookup_counts": lookup["count"].to_numpy(),
+    }
+    for array in arrays.values():
+        array.setflags(write=False)
+
+    return AwardLeaderboards(
+        boards=boards,
+        award_aliases=award_aliases,
+        franchise_aliases=franchise_aliases,
+        names=names,
+        **arrays,
+    )
+
+
+# Counting columns pulled from lahman_batting for hitter profiles
+BATTING_COUNT_COLUMNS = ["g", "ab", "h", "hr", "rbi", "sb", "bb", "hbp", "sf", "sh", "2b", "3b"]
+
+# Sections of the player bundle: (name, [(json key, column expression)], table, player ID column)
+PLAYER_BUNDLE_SECTIONS = [
+    ("person", [("namefirst", "namefirst"), ("namelast", "namelast")],
+     "lahman_people", "playerid"),
+    ("batting", [(col, f'"{col}"' if col[0].isdigit() else col) for col in
+                 ["yearid", "teamid"] + BATTING_COUNT_COLUMNS],
+     "lahman_batting", "playerid"),
+    ("pitching", [(col, col) for col in
+                  ["yearid", "teamid", "w", "l", "g", "gs", "cg", "sho", "sv",
+                   "ipouts", "h", "er", "hr", "bb", "so", "era"]],
+     "lahman_pitching", "playerid"),
+    ("war", [("yearid", "year_ID"), ("war", "WAR162")],
+     "jeffbagwell_war", "key_bbref"),
+]
+
+PLAYER_BUNDLE_COLUMNS = {
+    name: [key for key, _ in fields] for name, fields, _, _ in PLAYER_BUNDLE_SECTIONS
+}
+
+# JSON aggregate functions for dialects that can return a whole bundle in one row
+JSON_AGGREGATES = {
+    "postgresql": "COALESCE(json_agg(json_build_object({pairs})), '[]')",
+    "sqlite": "json_group_array(json_object({pairs}))",
+}
+
+
+@dataclass
+class PlayerBundle:
+    """A player's name and stat lines, loaded in a single database round trip"""
+    playerid: str
+    first: str
+    last: str
+    batting: "pd.DataFrame"
+    pitching: "pd.DataFrame"
+    war: "pd.DataFrame"
+
+    @property
+    def career_war(self):
+        return float(self.war["war"].sum()) if not self.war.empty else 0.0
+
+    def awards_payload(self):
+        # Awards, All-Star games and titles are precomputed in the awards index
+        return get_player_awards(self.playerid, None)
+
+
+def build_player_bundle_query(dialect):
+    """Build one SELECT that returns every bundle section as a JSON array column"""
+    aggregate = JSON_AGGREGATES[dialect]
+    columns = []
+    for name, fields, table, key_column in PLAYER_BUNDLE_SECTIONS:
+        pairs = ", ".join(f"'{key}', {expr}" for key, expr in fields)
+        columns.append(
+            f"(SELECT {aggregate.format(pairs=pairs)} FROM {table} "
+            f"WHERE {key_column} = :playerid) AS {name}"
+        )
+
+    return "SELECT\n    " + ",\n    ".join(columns)
+
+
+def fetch_player_bundle_sections(playerid):
+    """Fetch the raw bundle sections as lists of dicts keyed by section name"""
+    import json
+    from sqlalchemy import text
+
+    dialect = get_engine().dialect.name
+    params = {"playerid": playerid}
+
+    with get_engine().connect() as conn:
+        if dialect in JSON_AGGREGATES:
+            try:
+                row = conn.execute(text(build_player_bundle_query(dialect)), params).fetchone()
+                return {
+                    name: json.loads(value) if isinstance(value, str) else (value or [])
+                    for (name, _, _, _), value in zip(PLAYER_BUNDLE_SECTIONS, row)
+                }
+            except Exception as e:
+                print(f"Player bundle query failed, loading sections separately: {e}")
+                conn.rollback()
+
+        # Fallback: one query per section, still on a single connection.
+        # Only WAR is optional; any other failure fails the request so a
+        # partial profile is never cached.
+        sections = {}
+        for name, fields, table, key_column in PLAYER_BUNDLE_SECTIONS:
+            select_list = ", ".join(f'{expr} AS "{key}"' for key, expr in fields)
+            query = text(f"SELECT {select_list} FROM {table} WHERE {key_column} = :playerid")
+            if name != "war":
+                sections[name] = [dict(r._mapping) for r in conn.execute(query, params)]
+                continue
+            try:
+                sections[name] = [dict(r._mapping) for r in conn.execute(query, params)]
+            except Exception as e:
+                print(f"Player WAR query failed: {e}")
+                conn.rollback()
+                sections[name] = []
+
+    return sections
+
+
+@dataclass(frozen=True)
+class StatColumns:
+    """One bundle section for every player, stored a NumPy column at a time.
+
+    Rows are sorted by player ID, newest season first, and players[i]'s rows
+    are offsets[i]:offsets[i + 1] (CSR style). Columns keep their database
+    type (integer, float or text). missing holds a null mask for each column
+    that has NULLs; integer columns store 0 in those rows.
+    """
+    players: np.ndarray
+    offsets: np.ndarray
+    columns: dict
+    missing: dict
+
+    def row_range(self, playerid):
+        i = int(np.searchsorted(self.players, playerid))
+        if i == len(self.players) or self.players[i] != playerid:
+            return 0, 0
+        return int(self.offsets[i]), int(self.offsets[i + 1])
+
+    def frame(self, playerid):
+        """A player's rows as a DataFrame built over read-only column slices"""
+        lo, hi = self.row_range(playerid)
+        data = {}
+        for name, values in self.columns.items():
+            values = values[lo:hi]
+            missing = self.missing.get(name)
+            if missing is not None:
+                missing = missing[lo:hi]
+            if values.dtype.kind == "U":
+                # Text read from a snapshot: back to Python strings and None
+                values = values.astype(object)
+                if missing is not None:
+                    values[missing] = None
+            if missing is not None and hi > lo:
+                if missing.all():
+                    # Same as a column of JSON nulls
+                    values = np.full(hi - lo, None, dtype=object)
+                elif missing.any() and values.dtype.kind == "i":
+                    values = np.where(missing, np.nan, values)
+            data[name] = values
+        return pd.DataFrame(data, copy=False)
+
+    def first_value(self, playerid, name):
+        """A column's value in the player's first row, or None"""
+        lo, hi = self.row_range(playerid)
+        if lo == hi or (name in self.missing and self.missing[name][lo]):
+            return None
+        value = self.columns[name][lo]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def to_snapshot(self):
+        arrays = {"players": self.players, "offsets": self.offsets}
+        for name, values in self.columns.items():
+            if values.dtype == object:
+                values = np.array(["" if value is None else str(value) for value in values], dtype=str)
+            arrays[f"column.{name}"] = values
+        for name, missing in self.missing.items():
+            arrays[f"missing.{name}"] = missing
+        return arrays, {"columns": list(self.columns), "missing": list(self.missing)}
+
+    @classmethod
+    def from_snapshot(cls, arrays, meta):
+        return cls(
+            players=arrays["players"],
+            offsets=arrays["offsets"],
+            columns={name: arrays[f"column.{name}"] for name in meta["columns"]},
+            missing={name: arrays[f"missing.{name}"] for name in meta["missing"]},
+        )
+
+
+@dataclass(frozen=True)
+class PlayerStatsStore:
+    """Every player bundle section held in memory as StatColumns"""
+    sections: dict
+
+    def bundle(self, playerid):
+        person = self.sections["person"]
+        first = person.first_value(playerid, "namefirst")
+        last = person.first_value(playerid, "namelast")
+        return PlayerBundle(
+            playerid=playerid,
+            first=first or "Unknown",
+            last=last or "Unknown",
+            batting=self.sections["batting"].frame(playerid),
+            pitching=self.sections["pitching"].frame(playerid),
+            war=self.sections["war"].frame(playerid),
+        )
+
+    def to_snapshot(self):
+        arrays, meta = {}, {}
+        for name, section in self.sections.items():
+            section_arrays, meta[name] = section.to_snapshot()
+            arrays.update({f"{name}.{key}": array for key, array in section_arrays.items()})
+        return arrays, meta
+
+    @classmethod
+    def from_snapshot(cls, arrays, meta):
+        sections = {}
+        for name, section_meta in meta.items():
+            prefix = f"{name}."
+            section_arrays = {
+                key[len(prefix):]: array for key, array in arrays.items() if key.startswith(prefix)
+            }
+            sections[name] = StatColumns.from_snapshot(section_arrays, section_meta)
+        return cls(sections)
+
+
+def build_stat_columns(df, kinds):
+    """Sort one section's rows by player (newest season first) into StatColumns.
+
+    kinds maps each column to "int", "float" or "text".
+    """
+    df = df.dropna(subset=["playerid"])
+    if "yearid" in kinds:
+        years = pd.to_numeric(df["yearid"], errors="coerce").fillna(0).to_numpy()
+        order = np.lexsort((-years, df["playerid"].to_numpy(dtype=str)))
+    else:
+        order = np.argsort(df["playerid"].to_numpy(dtype=str), kind="stable")
+    df = df.iloc[order].reset_index(drop=True)
+
+    playerids = df["playerid"].to_numpy(dtype=str)
+    players, starts = np.unique(playerids, return_index=True)
+    offsets = np.append(starts, len(df)).astype(np.int64)
+
+    columns, missing = {}, {}
+    for key, kind in kinds.items():
+        column = df[key]
+        if kind == "text":
+            is_null = column.isna().to_numpy()
+            values = column.astype(object).where(~is_null, None).to_numpy()
+        elif kind == "float":
+            values = pd.to_numeric(column, errors="coerce").to_numpy(dtype=np.float64)
+            is_null = np.isnan(values)
+        else:
+            numbers = pd.to_numeric(column, errors="coerce")
+            is_null = numbers.isna().to_numpy()
+            values = numbers.fillna(0).to_numpy(dtype=np.int64)
+        values.setflags(write=False)
+        columns[key] = values
+        if is_null.any():
+            is_null.setflags(write=False)
+            missing[key] = is_null
+
+    players.setflags(write=False)
+    offsets.setflags(write=False)
+    return StatColumns(players, offsets, columns, missing)
+
+
+def column_kind(column_type, dtype):
+    """"int", "float" or "text" for a column, from its database type if known"""
+    from sqlalchemy import types
+
+    if isinstance(column_type, types.Integer):
+        return "int"
+    if isinstance(column_type, (types.Float, types.Numeric)):
+        return "float"
+    if column_type is not None:
+        return "text"
+    # Unknown to the inspector: go by what pandas read
+    return {"i": "int", "u": "int", "f": "float"}.get(dtype.kind, "text")
+
+
+@preloaded_dataset
+def get_player_stats_store():
+    """Load the people, batting, pitching and WAR tables behind player bundles"""
+    snapshot = read_snapshot_dataset("player_stats_store")
+    if snapshot is not None:
+        return PlayerStatsStore.from_snapshot(*snapshot)
+
+    sections = {}
+    with get_engine().connect() as conn:
+        inspector = inspect(conn)
+        for name, fields, table, key_column in PLAYER_BUNDLE_SECTIONS:
+            select_list = ", ".join(f'{expr} AS "{key}"' for key, expr in fields)
+            df = pd.read_sql_query(
+                text(f'SELECT {key_column} AS "playerid", {select_list} FROM {table}'), conn
+            )
+
+            # JSON bundles keep each value's database type, so the store does too
+            column_types = {
+                column["name"].lower(): column["type"] for column in inspector.get_columns(table)
+            }
+            kinds = {
+                key: column_kind(column_types.get(expr.strip('"').lower()), df[key].dtype)
+                for key, expr in fields
+            }
+            sections[name] = build_stat_columns(df, kinds)
+    return PlayerStatsStore(sections)
+
+
+def load_player_bundle(playerid):
+    """Load the player bundle for a profile request"""
+    try:
+        return get_player_stats_store().bundle(playerid)
+    except Exception as e:
+        print(f"Player stats store unavailable, querying the bundle: {e}")
+
+    sections = fetch_player_bundle_sections(playerid)
+
+    person = sections["person"][0] if sections["person"] else {}
+    first = person.get("namefirst") or "Unknown"
+    last = person.get("namelast") or "Unknown"
+
+    def frame(name, sort_by):
+        df = pd.DataFrame.from_records(sections[name], columns=PLAYER_BUNDLE_COLUMNS[name])
+        return df.sort_values(sort_by, ascending=False, kind="stable").reset_index(drop=True)
+
+    return PlayerBundle(
+        playerid=playerid,
+        first=first,
+        last=last,
+        batting=frame("batting", "yearid"),
+        pitching=frame("pitching", "yearid"),
+        war=frame("war", "yearid"),
+    )
+
+
+def detect_bundle_player_type(bundle):
+    """Two-way/pitcher/hitter detection for a player whose bundle is loaded"""
+    try:
+        return detect_two_way_player_simple(bundle.playerid, None)
+    except Exception as e:
+        print(f"Player type table unavailable, classifying from bundle: {e}")
+
+    if is_predefined_two_way_player(bundle.playerid):
+        return "two-way"
+
+    return classify_player_type(
+        len(bundle.pitching),
+        bundle.pitching["g"].fillna(0).sum(),
+        bundle.pitching["gs"].fillna(0).sum(),
+        len(bundle.batting),
+        bundle.batting["ab"].fillna(0).sum(),
+    )
+
+
 @app.route("/")
 def serve_index():
     return send_from_directory("static", "index.html")
 
 # Route for two-way player handling
 @app.route("/player-two-way")
+@cached_route("player", player_cache_key)
 def get_player_with_two_way():
     """Enhanced player endpoint that handles two-way players"""
     from sqlalchemy import text
@@ -391,15 +1765,10 @@ def get_player_with_two_way():
     if playerid is None:
         return jsonify({"error": "Player not found"}), 404
 
-    detected_type = detect_two_way_player_simple(playerid, None)
-
-    # Get player's actual name for display
-    name_query = text("SELECT namefirst, namelast FROM lahman_people WHERE playerid = :playerid")
-    
-    with db_engine.connect() as conn:
-        name_result = conn.execute(name_query, {"playerid": playerid}).fetchone()
-    
-    first, last = name_result if name_result else ("Unknown", "Unknown")
+    # Name, stats and WAR arrive in one round trip; awards come from memory
+    bundle = load_player_bundle(playerid)
+    detected_type = detect_bundle_player_type(bundle)
+    first, last = bundle.first, bundle.last
 
     # Handle two-way players
     if detected_type == "two-way" and not player_type:
@@ -415,33 +1784,426 @@ def get_player_with_two_way():
                             "label": f"{first} {last} (Pitching Stats)",
                         },
                         {"type": "hitter", "label": f"{first} {last} (Hitting Stats)"},
+                        {"type": "both", "label": f"{first} {last} (Hitting and Pitching Stats)"},
                     ],
-                    "message": f"{first} {last} is a known two-way player. Please select which stats to display:",
+                    "message": two_way_prompt_message(playerid, first, last),
                 }
             ),
             423,
         )  # Using 423 for two-way player selection
 
-    # Use specified player_type or detected type
-    final_type = player_type if player_type in ["pitcher", "hitter"] else detected_type
-    if final_type == "two-way":
-        final_type = "hitter"  # Default fallback
+    # Hitting and pitching together in one response
+    if player_type in ["both", "two-way"]:
+        return handle_two_way_stats(playerid, mode, None, first, last, bundle)
+
+    # Use specified player_type or detected type
+    final_type = player_type if player_type in ["pitcher", "hitter"] else detected_type
+    if final_type == "two-way":
+        final_type = "hitter"  # Default fallback
+
+    # Get photo URL
+    photo_url = get_photo_url_for_player(playerid, None)
+
+    # Process stats based on final type
+    if final_type == "pitcher":
+        return handle_pitcher_stats(playerid, None, mode, photo_url, first, last, bundle)
+    else:
+        return handle_hitter_stats(playerid, mode, photo_url, first, last, bundle)
+
+
+def fold_accents(text):
+    """Lowercase and strip accents so 'Acuña' and 'acuna' compare equal"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+@dataclass(frozen=True)
+class PlayerDirectory:
+    """In-memory player directory with a suffix-array index over searchable names"""
+    # One tuple per player, in ORDER BY debut DESC, namelast, namefirst order:
+    # (namefirst, namelast, playerid, debut, finalgame, birthyear, primary_pos)
+    entries: list
+    has_stats: np.ndarray
+    debut_year: np.ndarray
+    # Players the search endpoint may return (known birth year and some stats)
+    searchable: np.ndarray
+    # Accent-folded names of searchable players joined with NUL separators
+    corpus: str
+    suffix_array: np.ndarray
+    # Per corpus position: owning entry and offset into that entry's name
+    position_entry: np.ndarray
+    position_offset: np.ndarray
+    # Per entry: priority of a match at offset 0, offset where the last name starts
+    start_priority: np.ndarray
+    last_name_offset: np.ndarray
+
+    def _suffix_key(self, position, length):
+        return self.corpus[position:position + length]
+
+    def search(self, query, limit=15):
+        """
+        Ranked substring search matching the old SQL autocomplete:
+        priority (full name prefix, last name prefix, first name prefix, substring),
+        then debut DESC, namelast, namefirst
+        """
+        query = fold_accents(query)
+        if not query or "\x00" in query:
+            return []
+
+        key = functools.partial(self._suffix_key, length=len(query))
+        lo = bisect.bisect_left(self.suffix_array, query, key=key)
+        hi = bisect.bisect_right(self.suffix_array, query, lo=lo, key=key)
+        if lo == hi:
+            return []
+
+        positions = self.suffix_array[lo:hi]
+        entry_ids = self.position_entry[positions]
+        offsets = self.position_offset[positions]
+
+        priority = np.where(
+            offsets == 0,
+            self.start_priority[entry_ids],
+            np.where(offsets == self.last_name_offset[entry_ids], 2, 4),
+        )
+
+        # Entries are stored in ORDER BY order, so (priority, entry id) is the
+        # ranking; keep each player's best-priority match
+        n = len(self.entries)
+        sort_keys = np.unique(priority.astype(np.int64) * n + entry_ids)
+        ranked_entries = sort_keys % n
+        _, first_seen = np.unique(ranked_entries, return_index=True)
+
+        results = []
+        for i in np.sort(first_seen)[:limit]:
+            first, last, playerid, debut, final_game, birth_year, position = self.entries[ranked_entries[i]]
+            priority = int(sort_keys[i] // n)
+            results.append((first, last, playerid, debut, final_game, birth_year, priority, position))
+
+        return results
+
+
+@preloaded_dataset
+def get_player_directory():
+    """Load lahman_people with debut, birth year, primary position and stats flag"""
+    from sqlalchemy import text
+
+    people_query = text("""
+    SELECT playerid, namefirst, namelast, debut, finalgame, birthyear
+    FROM lahman_people
+    """)
+
+    stats_query = text("""
+    SELECT playerid FROM lahman_batting
+    UNION
+    SELECT playerid FROM lahman_pitching
+    """)
+
+    positions_query = text("""
+    SELECT playerid, pos, SUM(g) as games
+    FROM lahman_fielding
+    GROUP BY playerid, pos
+    """)
+
+    with get_engine().connect() as conn:
+        people = pd.read_sql_query(people_query, conn)
+        with_stats = set(r[0] for r in conn.execute(stats_query))
+        positions = pd.read_sql_query(positions_query, conn)
+
+    # Keep birth years as ints even though the column has NULLs
+    people["birthyear"] = pd.to_numeric(people["birthyear"], errors="coerce").astype("Int64")
+    people = people.astype(object).where(people.notna(), None)
+
+    primary_pos = {}
+    if not positions.empty:
+        positions = positions.sort_values("games", ascending=False, kind="stable")
+        primary_pos = positions.drop_duplicates("playerid").set_index("playerid")["pos"].to_dict()
+
+    # Directory order matches ORDER BY debut DESC NULLS LAST, namelast, namefirst
+    records = list(people.itertuples(index=False, name=None))
+    records.sort(key=lambda r: (r[2] is None, r[2] or "", r[1] is None, r[1] or ""))
+    records.sort(key=lambda r: r[3] or "", reverse=True)
+
+    entries = []
+    has_stats = []
+    debut_year = []
+    corpus_parts = []
+    corpus_length = 0
+    suffixes = []
+    position_entry = []
+    position_offset = []
+    start_priority = []
+    last_name_offset = []
+    searchable = []
+
+    for entry_id, (playerid, first, last, debut, final_game, birth_year) in enumerate(records):
+        entries.append((first, last, playerid, debut, final_game, birth_year, primary_pos.get(playerid)))
+        has_stats.append(playerid in with_stats)
+        debut_year.append(int(debut[:4]) if debut and debut[:4].isdigit() else -1)
+
+        # Mirrors the old WHERE clause: a NULL first name makes the full name NULL
+        if first is not None and last is not None:
+            name, start, last_offset = f"{first} {last}", 1, len(fold_accents(first)) + 1
+        elif last is not None:
+            name, start, last_offset = last, 2, 0
+        elif first is not None:
+            name, start, last_offset = first, 3, -1
+        else:
+            name, start, last_offset = None, 0, -1
+
+        start_priority.append(start)
+        last_name_offset.append(last_offset)
+        searchable.append(name is not None and birth_year is not None and has_stats[-1])
+
+        if not searchable[-1]:
+            continue
+
+        name = fold_accents(name)
+        for offset in range(len(name)):
+            suffixes.append((name[offset:], corpus_length + offset))
+        corpus_parts.append(name + "\x00")
+        position_entry.extend([entry_id] * (len(name) + 1))
+        position_offset.extend(range(len(name) + 1))
+        corpus_length += len(name) + 1
+
+    suffixes.sort()
+
+    return PlayerDirectory(
+        entries=entries,
+        has_stats=np.array(has_stats, dtype=bool),
+        debut_year=np.array(debut_year, dtype=np.int32),
+        searchable=np.array(searchable, dtype=bool),
+        corpus="".join(corpus_parts),
+        suffix_array=np.array([position for _, position in suffixes], dtype=np.int32),
+        position_entry=np.array(position_entry, dtype=np.int32),
+        position_offset=np.array(position_offset, dtype=np.int32),
+        start_priority=np.array(start_priority, dtype=np.int8),
+        last_name_offset=np.array(last_name_offset, dtype=np.int32),
+    )
+
+
+# Nickname groups; every spelling maps to the first one when names are compared
+NICKNAME_GROUPS = [
+    ("michael", "mike", "mikey"),
+    ("vladimir", "vlad"),
+    ("william", "bill", "billy", "will", "willie"),
+    ("robert", "bob", "bobby", "rob", "robbie"),
+    ("james", "jim", "jimmy", "jimmie"),
+    ("joseph", "joe", "joey"),
+    ("thomas", "tom", "tommy"),
+    ("david", "dave", "davey"),
+    ("steven", "steve", "stephen"),
+    ("christopher", "chris"),
+    ("matthew", "matt"),
+    ("alexander", "alex"),
+    ("anthony", "tony"),
+    ("nicholas", "nick"),
+    ("daniel", "dan", "danny"),
+    ("edward", "ed", "eddie"),
+    ("kenneth", "ken", "kenny"),
+    ("richard", "rick", "ricky", "rich", "dick"),
+    ("frederick", "fred", "freddie", "freddy"),
+    ("jacob", "jake"),
+    ("andrew", "andy", "drew"),
+    ("timothy", "tim"),
+    ("peter", "pete"),
+    ("samuel", "sam"),
+    ("ronald", "ron", "ronnie"),
+    ("gregory", "greg"),
+    ("jonathan", "jon"),
+    ("john", "johnny", "jack"),
+    ("charles", "charlie", "chuck"),
+    ("albert", "al"),
+    ("benjamin", "ben"),
+    ("lawrence", "larry"),
+    ("joshua", "josh"),
+    ("zachary", "zach", "zack"),
+    ("nathan", "nate"),
+    ("manuel", "manny"),
+    ("miguel", "miggy"),
+    ("rafael", "rafa"),
+    ("fernando", "nando"),
+]
+
+NICKNAMES = {name: group[0] for group in NICKNAME_GROUPS for name in group}
+
+# Wall-clock budget for one fuzzy lookup before returning the best so far
+FUZZY_SEARCH_BUDGET_MS = float(os.environ.get("FUZZY_SEARCH_BUDGET_MS", 25))
+FUZZY_CANDIDATES = 64
+
+
+def canonical_name(text):
+    """Accent-folded, punctuation-free name with nicknames expanded"""
+    folded = fold_accents(text).replace(".", "").replace("'", "").replace("-", " ")
+    tokens = folded.split()
+    if tokens:
+        tokens[0] = NICKNAMES.get(tokens[0], tokens[0])
+    return " ".join(tokens)
+
+
+def name_trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_edit_distance(a, b, max_distance):
+    """Levenshtein distance, or max_distance + 1 once it is known to exceed the bound"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+
+    return previous[-1]
+
+
+@dataclass(frozen=True)
+class FuzzyNameIndex:
+    """Trigram index over canonical player names, verified with bounded edit distance"""
+    # Per directory entry: canonical full name and canonical last name
+    full_names: list
+    last_names: list
+    # Trigram -> array of directory entry ids containing it
+    postings: dict
+    trigram_counts: np.ndarray
+
+    def search(self, query, limit=15, entry_filter=None, budget_ms=FUZZY_SEARCH_BUDGET_MS):
+        """
+        Return (entry_id, distance) pairs for names within a few edits of the query,
+        best first. Single-word queries are also compared against last names.
+        With budget_ms=None every candidate is checked, so the result doesn't
+        depend on timing.
+        """
+        deadline = None if budget_ms is None else time.perf_counter() + budget_ms / 1000
+        query = canonical_name(query)
+        if len(query) < 3:
+            return []
+
+        query_trigrams = name_trigrams(query)
+        hits = [self.postings[t] for t in query_trigrams if t in self.postings]
+        if not hits:
+            return []
+
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.full_names))
+        dice = 2 * shared / (len(query_trigrams) + self.trigram_counts)
+        if entry_filter is not None:
+            dice = np.where(entry_filter, dice, 0)
+
+        count = min(FUZZY_CANDIDATES, len(dice))
+        candidates = np.argpartition(-dice, count - 1)[:count]
+        candidates = candidates[dice[candidates] > 0.3]
+        candidates = candidates[np.lexsort((candidates, -dice[candidates]))]
+
+        max_distance = max(1, len(query) // 5)
+        single_word = " " not in query
+        matches = []
+        for entry_id in candidates:
+            name = self.full_names[entry_id]
+            distance = bounded_edit_distance(query, name, max_distance)
+            if single_word and self.last_names[entry_id]:
+                distance = min(distance, bounded_edit_distance(query, self.last_names[entry_id], max_distance))
+            if distance <= max_distance:
+                matches.append((int(entry_id), distance))
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+
+        matches.sort(key=lambda m: (m[1], m[0]))
+        return matches[:limit]
+
+
+@preloaded_dataset
+def get_fuzzy_name_index():
+    """Build the trigram index from the player directory"""
+    directory = get_player_directory()
+
+    full_names = []
+    last_names = []
+    postings = {}
+    trigram_counts = []
+
+    for entry_id, (first, last, *_rest) in enumerate(directory.entries):
+        full_name = canonical_name(" ".join(part for part in (first, last) if part))
+        trigrams = name_trigrams(full_name) if full_name else set()
+
+        full_names.append(full_name)
+        last_names.append(canonical_name(last) if last else "")
+        trigram_counts.append(len(trigrams))
+        for trigram in trigrams:
+            postings.setdefault(trigram, []).append(entry_id)
+
+    return FuzzyNameIndex(
+        full_names=full_names,
+        last_names=last_names,
+        postings={t: np.array(ids, dtype=np.int32) for t, ids in postings.items()},
+        trigram_counts=np.array(trigram_counts, dtype=np.int32),
+    )
+
+
+def fuzzy_full_name_key(name):
+    """
+    Resolve a misspelled/accented/nicknamed full name to the player name index
+    key (lowercase first, lowercase last) of the closest matching player with
+    stats. The answer gets cached, so the scan runs to completion rather than
+    stopping at the time budget.
+    """
+    directory = get_player_directory()
+    matches = get_fuzzy_name_index().search(
+        name, limit=1, entry_filter=directory.has_stats, budget_ms=None
+    )
+    if not matches:
+        return None
+
+    first, last = directory.entries[matches[0][0]][:2]
+    if first is None or last is None:
+        return None
+
+    return first.lower(), last.lower()
+
+
+def disambiguation_suffix(index, count):
+    """Suffix for the index-th (by debut) of count players sharing a name"""
+    if count == 2:
+        return "Sr." if index == 0 else "Jr."
+    return ["Sr.", "Jr.", "III"][index] if index < 3 else f"({index+1})"
+
+
+@preloaded_dataset
+def get_player_name_index():
+    """
+    Map (lowercase first, lowercase last) to that name's players as
+    (playerid, namefirst, namelast, debut, finalgame, birthyear, suffix)
+    rows ordered by debut
+    """
+    groups = {}
+    for first, last, playerid, debut, final_game, birth_year, _ in get_player_directory().entries:
+        if first is None or last is None:
+            continue
+        groups.setdefault((first.lower(), last.lower()), []).append(
+            (playerid, first, last, debut, final_game, birth_year)
+        )
 
-    # Get photo URL
-    photo_url = get_photo_url_for_player(playerid, None)
+    name_index = {}
+    for key, players in groups.items():
+        players.sort(key=lambda p: (p[3] is None, p[3] or ""))
+        name_index[key] = tuple(
+            (*player, disambiguation_suffix(i, len(players))) for i, player in enumerate(players)
+        )
 
-    # Process stats based on final type
-    if final_type == "pitcher":
-        return handle_pitcher_stats(playerid, None, mode, photo_url, first, last)
-    else:
-        return handle_hitter_stats(playerid, mode, photo_url, first, last)
+    return name_index
 
 
 @app.route('/search-players')
 def search_players_enhanced():
     """Enhanced search that handles father/son players and provides disambiguation"""
-    from sqlalchemy import text
-    
     query = request.args.get("q", "").strip()
 
     if len(query) < 2:
@@ -449,49 +2211,22 @@ def search_players_enhanced():
 
     try:
         query_clean = query.lower().strip()
-        search_term = f"%{query_clean}%"
-        exact_match = f"{query_clean}%"
-
-        search_query = text("""
-        SELECT DISTINCT 
-            p.namefirst,
-            p.namelast,
-            p.playerid,
-            p.debut,
-            p.finalgame,
-            p.birthyear,
-            CASE 
-                WHEN LOWER(p.namefirst || ' ' || p.namelast) LIKE :exact_match THEN 1
-                WHEN LOWER(p.namelast) LIKE :exact_match THEN 2
-                WHEN LOWER(p.namefirst) LIKE :exact_match THEN 3
-                ELSE 4
-            END as priority,
-            (SELECT pos FROM lahman_fielding f 
-             WHERE f.playerid = p.playerid
-             GROUP BY pos 
-             ORDER BY SUM(g) DESC 
-             LIMIT 1) as primary_pos
-        FROM lahman_people p
-        WHERE (
-            LOWER(p.namefirst || ' ' || p.namelast) LIKE :search_term
-            OR LOWER(p.namelast) LIKE :search_term
-            OR LOWER(p.namefirst) LIKE :search_term
-        )
-        AND p.birthyear IS NOT NULL
-        AND (
-            EXISTS (SELECT 1 FROM lahman_batting b WHERE b.playerid = p.playerid)
-            OR EXISTS (SELECT 1 FROM lahman_pitching pt WHERE pt.playerid = p.playerid)
-        )
-        ORDER BY priority, p.debut DESC NULLS LAST, p.namelast, p.namefirst
-        LIMIT 15
-        """)
 
-        with db_engine.connect() as conn:
-            results = conn.execute(search_query, {
-                "exact_match": exact_match,
-                "search_term": search_term
-            }).fetchall()
+        # Served from the in-memory directory; same ranking as the old SQL query
+        directory = get_player_directory()
+        results = directory.search(query_clean, limit=15)
 
+        # Top up with typo/accent/nickname-tolerant matches ranked after them
+        if len(results) < 15:
+            seen = {row[2] for row in results}
+            fuzzy_matches = get_fuzzy_name_index().search(
+                query_clean, limit=15, entry_filter=directory.searchable
+            )
+            for entry_id, _ in fuzzy_matches:
+                first, last, playerid, debut, final_game, birth_year, position = directory.entries[entry_id]
+                if playerid not in seen and len(results) < 15:
+                    seen.add(playerid)
+                    results.append((first, last, playerid, debut, final_game, birth_year, 5, position))
 
         # Group players by name to detect duplicates
         name_groups = {}
@@ -549,10 +2284,7 @@ def search_players_enhanced():
                     birth_year = player["birth_year"] or "Unknown"
 
                     # Determine suffix (Sr./Jr. or I/II based on debut order)
-                    if len(player_list) == 2:
-                        suffix = "Sr." if i == 0 else "Jr."
-                    else:
-                        suffix = ["Sr.", "Jr.", "III"][i] if i < 3 else f"({i+1})"
+                    suffix = disambiguation_suffix(i, len(player_list))
 
                     # Create display name with disambiguation
                     base_display = f"{name} {suffix}"
@@ -584,33 +2316,32 @@ def search_players_enhanced():
             "traceback": error_trace
         }), 500
 
+# Common suffixes users type after a name
+NAME_SUFFIXES = {
+    "jr": "Jr.",
+    "jr.": "Jr.",
+    "junior": "Jr.",
+    "sr": "Sr.",
+    "sr.": "Sr.",
+    "senior": "Sr.",
+    "ii": "II",
+    "iii": "III",
+    "2nd": "II",
+    "3rd": "III",
+}
+
+
 def improved_player_lookup_with_disambiguation(name):
     """
     Improved player lookup that handles common father/son cases
     and provides suggestions when multiple players exist
     """
-    from sqlalchemy import text
-    
-    # Handle common suffixes
-    suffixes = {
-        "jr": "Jr.",
-        "jr.": "Jr.",
-        "junior": "Jr.",
-        "sr": "Sr.",
-        "sr.": "Sr.",
-        "senior": "Sr.",
-        "ii": "II",
-        "iii": "III",
-        "2nd": "II",
-        "3rd": "III",
-    }
-
     name_lower = name.lower().strip()
     suffix = None
     clean_name = name
 
     # Check if name contains a suffix
-    for suffix_variant, standard_suffix in suffixes.items():
+    for suffix_variant, standard_suffix in NAME_SUFFIXES.items():
         if name_lower.endswith(" " + suffix_variant):
             suffix = standard_suffix
             clean_name = name[: -(len(suffix_variant) + 1)].strip()
@@ -621,19 +2352,14 @@ def improved_player_lookup_with_disambiguation(name):
 
     first, last = clean_name.split(" ", 1)
 
-    # Find all players with this name using SQLAlchemy
-    all_players_query = text("""
-    SELECT playerid, namefirst, namelast, debut, finalgame, birthyear
-    FROM lahman_people
-    WHERE LOWER(namefirst) = :first AND LOWER(namelast) = :last
-    ORDER BY debut
-    """)
+    # All players with this name, in debut order with their Sr./Jr. suffix
+    name_index = get_player_name_index()
+    all_matches = name_index.get((first.lower(), last.lower()), ())
 
-    with db_engine.connect() as conn:
-        all_matches = conn.execute(all_players_query, {
-            "first": first.lower(), 
-            "last": last.lower()
-        }).fetchall()
+    if not all_matches:
+        # Fall back to typo/accent/nickname-tolerant matching
+        fuzzy_key = fuzzy_full_name_key(clean_name)
+        all_matches = name_index.get(fuzzy_key, ()) if fuzzy_key else ()
 
     if not all_matches:
         return None, []
@@ -645,16 +2371,10 @@ def improved_player_lookup_with_disambiguation(name):
     suggestions = []
     target_player = None
 
-    for i, (playerid, fname, lname, debut, final_game, birth_year) in enumerate(all_matches):
+    for playerid, fname, lname, debut, final_game, birth_year, player_suffix in all_matches:
         full_name = f"{fname} {lname}"
         debut_year = debut[:4] if debut else "Unknown"
 
-        # Create suggestion with disambiguation
-        if len(all_matches) == 2:
-            player_suffix = "Sr." if i == 0 else "Jr."
-        else:
-            player_suffix = ["Sr.", "Jr.", "III"][i] if i < 3 else f"({i+1})"
-
         suggestion = {
             "name": f"{full_name} {player_suffix}",
             "playerid": playerid,
@@ -671,6 +2391,7 @@ def improved_player_lookup_with_disambiguation(name):
 
 
 @app.route("/player-disambiguate")
+@cached_route("player", player_cache_key)
 def get_player_with_disambiguation():
     """Enhanced player endpoint that handles disambiguation"""
     from sqlalchemy import text
@@ -702,15 +2423,9 @@ def get_player_with_disambiguation():
         return jsonify({"error": "Player not found"}), 404
 
     # Continue with existing logic using the found playerid
-    detected_type = detect_two_way_player_simple(playerid, None)
-
-    # Get player's actual name for display using SQLAlchemy
-    name_query = text("SELECT namefirst, namelast FROM lahman_people WHERE playerid = :playerid")
-    
-    with db_engine.connect() as conn:
-        name_result = conn.execute(name_query, {"playerid": playerid}).fetchone()
-    
-    first, last = name_result if name_result else ("Unknown", "Unknown")
+    bundle = load_player_bundle(playerid)
+    detected_type = detect_bundle_player_type(bundle)
+    first, last = bundle.first, bundle.last
 
     # Handle two-way players
     if detected_type == "two-way" and not player_type:
@@ -725,13 +2440,18 @@ def get_player_with_disambiguation():
                             "label": f"{first} {last} (Pitching Stats)",
                         },
                         {"type": "hitter", "label": f"{first} {last} (Hitting Stats)"},
+                        {"type": "both", "label": f"{first} {last} (Hitting and Pitching Stats)"},
                     ],
-                    "message": f"{first} {last} is a known two-way player. Please select which stats to display:",
+                    "message": two_way_prompt_message(playerid, first, last),
                 }
             ),
             423,
         )
 
+    # Hitting and pitching together in one response
+    if player_type in ["both", "two-way"]:
+        return handle_two_way_stats(playerid, mode, None, first, last, bundle)
+
     # Continue with existing logic using specified or detected type
     final_type = player_type if player_type in ["pitcher", "hitter"] else detected_type
     if final_type == "two-way":
@@ -741,46 +2461,140 @@ def get_player_with_disambiguation():
     photo_url = get_photo_url_for_player(playerid, None)
 
     if final_type == "pitcher":
-        return handle_pitcher_stats(playerid, None, mode, photo_url, first, last)
+        return handle_pitcher_stats(playerid, None, mode, photo_url, first, last, bundle)
     else:
-        return handle_hitter_stats(playerid, mode, photo_url, first, last)
+        return handle_hitter_stats(playerid, mode, photo_url, first, last, bundle)
+
+# Players the front end links first; their pages are also warmed at boot
+POPULAR_PLAYERS = [
+    "Mike Trout",
+    "Aaron Judge",
+    "Mookie Betts",
+    "Ronald Acuña",
+    "Juan Soto",
+    "Vladimir Guerrero Jr.",
+    "Fernando Tatis Jr.",
+    "Gerrit Cole",
+    "Jacob deGrom",
+    "Tarik Skubal",
+    "Spencer Strider",
+    "Freddie Freeman",
+    "Manny Machado",
+    "Jose Altuve",
+    "Kyle Tucker",
+]
+
 
 @app.route("/popular-players")
 def popular_players():
-    fallback_players = [
-        "Mike Trout",
-        "Aaron Judge",
-        "Mookie Betts",
-        "Ronald Acuña",
-        "Juan Soto",
-        "Vladimir Guerrero Jr.",
-        "Fernando Tatis Jr.",
-        "Gerrit Cole",
-        "Jacob deGrom",
-        "Tarik Skubal",
-        "Spencer Strider",
-        "Freddie Freeman",
-        "Manny Machado",
-        "Jose Altuve",
-        "Kyle Tucker",
-    ]
-    return jsonify(fallback_players)
-
-def handle_pitcher_stats(playerid, conn, mode, photo_url, first, last):
-    from sqlalchemy import text
-    
-    stats_query = text("""
-    SELECT yearid, teamid, w, l, g, gs, cg, sho, sv, ipouts, h, er, hr, bb, so, era
-    FROM lahman_pitching WHERE playerid = :playerid
-    ORDER BY yearid DESC
-    """)
-    
-    df_lahman = pd.read_sql_query(stats_query, db_engine, params={"playerid": playerid})
-    awards_data = get_player_awards(playerid, None)
-    
+    return jsonify(POPULAR_PLAYERS)
+
+
+LEADERBOARD_DEFAULT_LIMIT = 25
+LEADERBOARD_MAX_LIMIT = 100
+
+
+@app.route("/leaderboards/awards")
+@cached_route("leaderboard", leaderboard_cache_key)
+def award_leaderboard():
+    """Players ranked by award or All-Star count.
+
+    award: award ID or name (MVP, Gold Glove, ASG, ...); omit to list awards
+    league, decade (1990 or 1990s), position, franchise (ID or team name):
+        optional filters
+    limit, offset: page of the leaderboard
+    player: optional name or playerid to report the rank of
+    """
+    try:
+        leaderboards = get_award_leaderboards()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Leaderboards unavailable: {str(e)}"}), 503
+
+    award_param = request.args.get("award", "").strip()
+    available = [{"award": award, "total": total} for award, total in leaderboards.awards()]
+    if not award_param:
+        return jsonify({"awards": available})
+
+    award = leaderboards.resolve_award(award_param)
+    if award is None:
+        return jsonify({"error": f"Unknown award '{award_param}'", "awards": available}), 404
+
+    try:
+        decade = request.args.get("decade", "").strip().lower().rstrip("s")
+        decade = int(decade) // 10 * 10 if decade else None
+        limit = min(max(int(request.args.get("limit", LEADERBOARD_DEFAULT_LIMIT)), 1), LEADERBOARD_MAX_LIMIT)
+        offset = max(int(request.args.get("offset", 0)), 0)
+    except ValueError:
+        return jsonify({"error": "decade, limit and offset must be numbers"}), 400
+
+    league = request.args.get("league", "").strip().upper() or None
+    position = request.args.get("position", "").strip().upper() or None
+    franchise = request.args.get("franchise", "").strip() or None
+    if franchise:
+        franchise_id = leaderboards.resolve_franchise(franchise)
+        if franchise_id is None:
+            franchise_id = leaderboards.resolve_franchise(parse_team_input(franchise)[0])
+        if franchise_id is None:
+            return jsonify({"error": f"Unknown franchise '{franchise}'"}), 404
+        franchise = franchise_id
+
+    filters = {"league": league, "decade": decade, "position": position, "franchise": franchise}
+    board = leaderboards.board(award, **filters)
+    total = board[2] if board else 0
+
+    def ranked_entry(rank, playerid, count):
+        return {
+            "rank": rank,
+            "playerid": playerid,
+            "name": leaderboards.names.get(playerid, playerid),
+            "count": count,
+            "share": round(count / total, 4) if total else 0,
+        }
+
+    response = {
+        "award": award,
+        "filters": filters,
+        "total_awards": total,
+        "total_players": board[1] - board[0] if board else 0,
+        "leaders": [ranked_entry(*row) for row in leaderboards.top(board, limit, offset)] if board else [],
+    }
+
+    player = request.args.get("player", "").strip()
+    if player:
+        playerid = player if player in leaderboards.names else None
+        if playerid is None and " " in player:
+            playerid, suggestions = improved_player_lookup_with_disambiguation(player)
+            if playerid is None and suggestions:
+                response["player"] = {"error": "Multiple players found", "suggestions": suggestions}
+        if playerid is not None:
+            placing = leaderboards.rank_of(board, playerid) if board else None
+            response["player"] = (
+                ranked_entry(placing[0], playerid, placing[1]) if placing
+                else {"playerid": playerid, "name": leaderboards.names.get(playerid, playerid), "rank": None, "count": 0}
+            )
+        elif "player" not in response:
+            response["player"] = {"error": "Player not found"}
+
+    return jsonify(response)
+
+
+def handle_pitcher_stats(playerid, conn, mode, photo_url, first, last, bundle=None):
+    if bundle is None:
+        bundle = load_player_bundle(playerid)
+
+    payload, status = build_pitcher_payload(bundle, mode, photo_url, bundle.awards_payload())
+    return jsonify(payload), status
+
+
+def build_pitcher_payload(bundle, mode, photo_url, awards_data):
+    """Pitching profile for a loaded bundle as a (payload, HTTP status) pair"""
+    df_lahman = bundle.pitching
+
     if mode == "career":
         if df_lahman.empty:
-            return jsonify({"error": "No pitching stats found"}), 404
+            return {"error": "No pitching stats found"}, 404
 
         totals = df_lahman.agg({
             "w": "sum", "l": "sum", "g": "sum", "gs": "sum", "cg": "sum", 
@@ -791,7 +2605,7 @@ def handle_pitcher_stats(playerid, conn, mode, photo_url, first, last):
         innings_pitched = totals["ipouts"] / 3.0 if totals["ipouts"] > 0 else 0
         era = (totals["er"] * 9) / innings_pitched if innings_pitched > 0 else 0
         whip = (totals["h"] + totals["bb"]) / innings_pitched if innings_pitched > 0 else 0
-        career_war = get_career_war(playerid)
+        career_war = bundle.career_war
 
         result = {
             "war": round(career_war, 1),
@@ -812,19 +2626,19 @@ def handle_pitcher_stats(playerid, conn, mode, photo_url, first, last):
             "whip": round(whip, 2),
         }
 
-        return jsonify({
+        return {
             "mode": "career",
             "player_type": "pitcher", 
             "totals": result,
             "photo_url": photo_url,
             "awards": awards_data,
-        })
+        }, 200
 
     elif mode == "season":
         if df_lahman.empty:
-            return jsonify({"error": "No pitching stats found"}), 404
+            return {"error": "No pitching stats found"}, 404
 
-        df_war_history = get_season_war_history(playerid)
+        df_war_history = bundle.war
 
         df = df_lahman.copy()
         df["innings_pitched"] = df["ipouts"] / 3.0
@@ -857,142 +2671,260 @@ def handle_pitcher_stats(playerid, conn, mode, photo_url, first, last):
             "era_final": "era",
         })
 
-        return jsonify({
+        return {
             "mode": "season",
             "player_type": "pitcher",
             "stats": df_result.to_dict(orient="records"),
             "photo_url": photo_url,
             "awards": awards_data,
-        })
+        }, 200
 
     # Return error for live and combined modes
     elif mode in ["live", "combined"]:
-        return jsonify({"error": f"{mode.title()} stats temporarily disabled"}), 503
+        return {"error": f"{mode.title()} stats temporarily disabled"}, 503
 
     else:
-        return jsonify({"error": "Invalid mode"}), 400
+        return {"error": "Invalid mode"}, 400
+
+_stats_executor = None
+_stats_executor_lock = threading.Lock()
+
+
+def get_stats_executor():
+    """Thread pool used to build the sections of combined responses concurrently"""
+    global _stats_executor
+    if _stats_executor is None:
+        with _stats_executor_lock:
+            if _stats_executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                _stats_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="stats")
+    return _stats_executor
+
+
+def reset_stats_executor():
+    """Forget the pool in a forked child: its threads stayed in the parent"""
+    global _stats_executor, _stats_executor_lock
+    _stats_executor = None
+    _stats_executor_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=reset_stats_executor)
+
+
+def handle_two_way_stats(playerid, mode, photo_url, first, last, bundle=None):
+    """Hitting and pitching profiles in one response, built concurrently from one bundle"""
+    if bundle is None:
+        bundle = load_player_bundle(playerid)
+
+    executor = get_stats_executor()
+    hitting = executor.submit(build_hitter_payload, bundle, mode, photo_url, None)
+    pitching = executor.submit(build_pitcher_payload, bundle, mode, photo_url, None)
+    hitting_payload, hitting_status = hitting.result()
+    pitching_payload, pitching_status = pitching.result()
+
+    # Awards and photo are shared, so they only appear once at the top level
+    for section in (hitting_payload, pitching_payload):
+        section.pop("awards", None)
+        section.pop("photo_url", None)
+
+    if 200 not in (hitting_status, pitching_status):
+        return jsonify(hitting_payload), hitting_status
+
+    return jsonify({
+        "mode": mode,
+        "player_type": "two-way",
+        "hitting": hitting_payload,
+        "pitching": pitching_payload,
+        "photo_url": photo_url,
+        "awards": bundle.awards_payload(),
+    })
+
+
+# Fallback league averages for seasons missing from the league environment
+DEFAULT_LEAGUE_OBP = 0.320
+DEFAULT_LEAGUE_SLG = 0.400
+
+
+@dataclass(frozen=True)
+class LeagueEnvironment:
+    """Season-by-season league averages stored in arrays indexed by yearid"""
+    first_year: int
+    ba: np.ndarray
+    obp: np.ndarray
+    slg: np.ndarray
+    era: np.ndarray
+    runs_per_game: np.ndarray
+
+    def year_index(self, years):
+        """Map yearids to array positions (-1 for seasons outside the table)"""
+        idx = np.asarray(years, dtype=np.int64) - self.first_year
+        return np.where((idx >= 0) & (idx < len(self.obp)), idx, -1)
+
+    def obp_slg(self, years):
+        """League OBP and SLG for each year, with fallbacks for unknown seasons"""
+        idx = self.year_index(years)
+        lg_obp = np.where(idx >= 0, self.obp[idx], np.nan)
+        lg_slg = np.where(idx >= 0, self.slg[idx], np.nan)
+
+        # Same rule as the old per-year query: both values or neither
+        valid = (lg_obp > 0) & (lg_slg > 0)
+        return (
+            np.where(valid, lg_obp, DEFAULT_LEAGUE_OBP),
+            np.where(valid, lg_slg, DEFAULT_LEAGUE_SLG),
+        )
 
-def get_league_averages(conn, year):
-    """Get league average OBP and SLG for a given year"""
+
+@preloaded_dataset
+def get_league_environment():
+    """Build league BA/OBP/SLG/ERA/R-per-game for every season in one pass"""
     from sqlalchemy import text
-    
-    query = text("""
-    SELECT 
+
+    batting_query = text("""
+    SELECT yearid,
+        SUM(h) * 1.0 / NULLIF(SUM(ab), 0) as lg_ba,
         SUM(h + bb + hbp) * 1.0 / NULLIF(SUM(ab + bb + hbp + sf), 0) as lg_obp,
         (SUM(h - "2b" - "3b" - hr) + 2 * SUM("2b") + 3 * SUM("3b") + 4 * SUM(hr)) * 1.0 / NULLIF(SUM(ab), 0) as lg_slg
     FROM lahman_batting
-    WHERE yearid = :year
+    GROUP BY yearid
     """)
-    
-    with db_engine.connect() as conn:
-        result = conn.execute(query, {"year": year}).fetchone()
-    
-    if result and result[0] and result[1]:
-        return {"obp": float(result[0]), "slg": float(result[1])}
-    return {"obp": 0.320, "slg": 0.400}  # Fallback averages
+
+    pitching_query = text("""
+    SELECT yearid, SUM(er) * 27.0 / NULLIF(SUM(ipouts), 0) as lg_era
+    FROM lahman_pitching
+    GROUP BY yearid
+    """)
+
+    teams_query = text("""
+    SELECT yearid, SUM(r) * 1.0 / NULLIF(SUM(g), 0) as lg_rpg
+    FROM lahman_teams
+    GROUP BY yearid
+    """)
+
+    with get_engine().connect() as conn:
+        batting = pd.read_sql_query(batting_query, conn)
+        pitching = pd.read_sql_query(pitching_query, conn)
+        teams = pd.read_sql_query(teams_query, conn)
+
+    years = pd.concat([batting["yearid"], pitching["yearid"], teams["yearid"]]).dropna()
+    if years.empty:
+        first_year, last_year = 0, -1
+    else:
+        first_year, last_year = int(years.min()), int(years.max())
+
+    def by_year(df, column):
+        values = np.full(last_year - first_year + 1, np.nan)
+        if not df.empty:
+            values[df["yearid"].astype(int).to_numpy() - first_year] = pd.to_numeric(
+                df[column], errors="coerce"
+            ).to_numpy(dtype=float)
+        values.setflags(write=False)
+        return values
+
+    return LeagueEnvironment(
+        first_year=first_year,
+        ba=by_year(batting, "lg_ba"),
+        obp=by_year(batting, "lg_obp"),
+        slg=by_year(batting, "lg_slg"),
+        era=by_year(pitching, "lg_era"),
+        runs_per_game=by_year(teams, "lg_rpg"),
+    )
+
+
+def get_league_averages(conn, year):
+    """Get league average OBP and SLG for a given year"""
+    lg_obp, lg_slg = get_league_environment().obp_slg([year])
+    return {"obp": float(lg_obp[0]), "slg": float(lg_slg[0])}
+
+
+def calculate_ops_plus_array(obp, slg, years):
+    """Vectorized OPS+ for parallel arrays of OBP, SLG and yearid"""
+    lg_obp, lg_slg = get_league_environment().obp_slg(years)
+
+    # OPS+ = 100 * (OBP/lgOBP + SLG/lgSLG - 1)
+    ops_plus = 100 * (np.asarray(obp, dtype=float) / lg_obp + np.asarray(slg, dtype=float) / lg_slg - 1)
+    return np.round(ops_plus)
 
 
 def calculate_ops_plus(obp, slg, year):
     """Calculate OPS+ for a player given their OBP, SLG, and year"""
-    lg_avg = get_league_averages(None, year)
-    
-    if lg_avg["obp"] == 0 or lg_avg["slg"] == 0:
-        return 100
-    
-    # OPS+ = 100 * (OBP/lgOBP + SLG/lgSLG - 1)
-    ops_plus = 100 * ((obp / lg_avg["obp"]) + (slg / lg_avg["slg"]) - 1)
-    return round(ops_plus)
+    return int(calculate_ops_plus_array([obp], [slg], [year])[0])
+
+
+def safe_divide(numerator, denominator):
+    """Element-wise division that returns 0 wherever the denominator is 0 or missing"""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+
+    result = np.zeros(np.broadcast(numerator, denominator).shape)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+
+    return float(result) if result.ndim == 0 else result
+
+
+def compute_batting_lines(df):
+    """Derive BA/OBP/SLG/OPS/PA/OPS+ columns for a frame of batting seasons"""
+    df = df.copy()
+    df[BATTING_COUNT_COLUMNS] = df[BATTING_COUNT_COLUMNS].fillna(0).astype("int64")
+
+    df["singles"] = df["h"] - df["2b"] - df["3b"] - df["hr"]
+    df["total_bases"] = df["singles"] + 2 * df["2b"] + 3 * df["3b"] + 4 * df["hr"]
 
+    # OBP denominator doubles as the PA used to weight career OPS+
+    df["obp_pa"] = df["ab"] + df["bb"] + df["hbp"] + df["sf"]
+    df["ba"] = safe_divide(df["h"], df["ab"])
+    df["obp"] = safe_divide(df["h"] + df["bb"] + df["hbp"], df["obp_pa"])
+    df["slg"] = safe_divide(df["total_bases"], df["ab"])
+    df["ops"] = df["obp"] + df["slg"]
+    df["pa"] = df["obp_pa"] + df["sh"]
+    df["ops_plus"] = calculate_ops_plus_array(df["obp"], df["slg"], df["yearid"]).astype("int64")
 
-def calculate_career_ops_plus(playerid):
+    return df
+
+
+def calculate_career_ops_plus(batting_lines):
     """Calculate career OPS+ weighted by plate appearances"""
-    from sqlalchemy import text
-    
-    # Get all seasons with OBP/SLG
-    query = text("""
-    SELECT yearid, ab, h, bb, hbp, sf, "2b", "3b", hr
-    FROM lahman_batting 
-    WHERE playerid = :playerid
-    ORDER BY yearid
-    """)
-    
-    df = pd.read_sql_query(query, db_engine, params={"playerid": playerid})
-    
-    if df.empty:
-        return 100
-    
-    total_weighted_ops_plus = 0
-    total_pa = 0
-    
-    for _, row in df.iterrows():
-        ab = row['ab'] or 0
-        h = row['h'] or 0
-        bb = row['bb'] or 0
-        hbp = row['hbp'] or 0
-        sf = row['sf'] or 0
-        doubles = row['2b'] or 0
-        triples = row['3b'] or 0
-        hr = row['hr'] or 0
-        
-        pa = ab + bb + hbp + sf
-        
-        if pa == 0:
-            continue
-        
-        # Calculate season OBP and SLG
-        obp_denom = ab + bb + hbp + sf
-        obp = (h + bb + hbp) / obp_denom if obp_denom > 0 else 0
-        
-        singles = h - doubles - triples - hr
-        total_bases = singles + 2 * doubles + 3 * triples + 4 * hr
-        slg = total_bases / ab if ab > 0 else 0
-        
-        # Get OPS+ for this season
-        season_ops_plus = calculate_ops_plus(obp, slg, row['yearid'])
-        
-        # Weight by plate appearances
-        total_weighted_ops_plus += season_ops_plus * pa
-        total_pa += pa
-    
+    weights = batting_lines["obp_pa"].to_numpy(dtype=float)
+    total_pa = weights.sum()
+
     if total_pa == 0:
         return 100
-    
-    return round(total_weighted_ops_plus / total_pa)
 
-def handle_hitter_stats(playerid, mode, photo_url, first, last):
-    from sqlalchemy import text
-    
-    stats_query = text("""
-    SELECT yearid, teamid, g, ab, h, hr, rbi, sb, bb, hbp, sf, sh, "2b", "3b"
-    FROM lahman_batting WHERE playerid = :playerid
-    ORDER BY yearid DESC
-    """)
-    
-    df_lahman = pd.read_sql_query(stats_query, db_engine, params={"playerid": playerid})
-    awards_data = get_player_awards(playerid, None)
-    
-    if mode == "career":
-        if df_lahman.empty:
-            return jsonify({"error": "No batting stats found"}), 404
+    return round(float((batting_lines["ops_plus"].to_numpy() * weights).sum() / total_pa))
 
-        totals = df_lahman.agg({
-            "g": "sum", "ab": "sum", "h": "sum", "hr": "sum", "rbi": "sum",
-            "sb": "sum", "bb": "sum", "hbp": "sum", "sf": "sum", "sh": "sum",
-            "2b": "sum", "3b": "sum",
-        }).to_dict()
+
+def handle_hitter_stats(playerid, mode, photo_url, first, last, bundle=None):
+    if bundle is None:
+        bundle = load_player_bundle(playerid)
+
+    payload, status = build_hitter_payload(bundle, mode, photo_url, bundle.awards_payload())
+    return jsonify(payload), status
+
+
+def build_hitter_payload(bundle, mode, photo_url, awards_data):
+    """Hitting profile for a loaded bundle as a (payload, HTTP status) pair"""
+    df_lahman = bundle.batting
+
+    if mode not in ["career", "season"]:
+        return {"error": "Invalid mode. Use 'career' or 'season'"}, 400
+
+    if df_lahman.empty:
+        return {"error": "No batting stats found"}, 404
+
+    # Season lines, career totals and career OPS+ all come from this frame
+    df = compute_batting_lines(df_lahman)
+
+    if mode == "career":
+        totals = df[BATTING_COUNT_COLUMNS].sum()
 
         singles = totals["h"] - totals["2b"] - totals["3b"] - totals["hr"]
         total_bases = singles + 2 * totals["2b"] + 3 * totals["3b"] + 4 * totals["hr"]
-        ba = totals["h"] / totals["ab"] if totals["ab"] > 0 else 0
         obp_denominator = totals["ab"] + totals["bb"] + totals["hbp"] + totals["sf"]
-        obp = (totals["h"] + totals["bb"] + totals["hbp"]) / obp_denominator if obp_denominator > 0 else 0
-        slg = total_bases / totals["ab"] if totals["ab"] > 0 else 0
+        ba = safe_divide(totals["h"], totals["ab"])
+        obp = safe_divide(totals["h"] + totals["bb"] + totals["hbp"], obp_denominator)
+        slg = safe_divide(total_bases, totals["ab"])
         ops = obp + slg
-        plate_appearances = totals["ab"] + totals["bb"] + totals["hbp"] + totals["sf"] + totals["sh"]
-        career_war = get_career_war(playerid)
-        
-        # Calculate career OPS+
-        career_ops_plus = calculate_career_ops_plus(playerid)
+        plate_appearances = obp_denominator + totals["sh"]
+        career_war = bundle.career_war
 
         result = {
             "war": round(career_war, 1),
@@ -1006,72 +2938,52 @@ def handle_hitter_stats(playerid, mode, photo_url, first, last):
             "on_base_percentage": round(obp, 3),
             "slugging_percentage": round(slg, 3),
             "ops": round(ops, 3),
-            "ops_plus": career_ops_plus,
+            "ops_plus": calculate_career_ops_plus(df),
         }
 
-        return jsonify({
+        return {
             "mode": "career",
             "player_type": "hitter",
             "totals": result,
             "photo_url": photo_url,
             "awards": awards_data,
-        })
-
-    elif mode == "season":
-        if df_lahman.empty:
-            return jsonify({"error": "No batting stats found"}), 404
-
-        df_war_history = get_season_war_history(playerid)
-
-        df = df_lahman.copy()
-        df["singles"] = df["h"] - df["2b"] - df["3b"] - df["hr"]
-        df["total_bases"] = df["singles"] + 2 * df["2b"] + 3 * df["3b"] + 4 * df["hr"]
-        df["ba"] = df.apply(lambda row: row["h"] / row["ab"] if row["ab"] > 0 else 0, axis=1)
-        df["obp"] = df.apply(lambda row: (
-            (row["h"] + row["bb"] + row["hbp"]) / 
-            (row["ab"] + row["bb"] + row["hbp"] + row["sf"])
-            if (row["ab"] + row["bb"] + row["hbp"] + row["sf"]) > 0 else 0
-        ), axis=1)
-        df["slg"] = df.apply(lambda row: row["total_bases"] / row["ab"] if row["ab"] > 0 else 0, axis=1)
-        df["ops"] = df["obp"] + df["slg"]
-        df["pa"] = df["ab"] + df["bb"] + df["hbp"] + df["sf"] + df["sh"]
-        
-        # Calculate OPS+ for each season
-        df["ops_plus"] = df.apply(
-            lambda row: calculate_ops_plus(row["obp"], row["slg"], row["yearid"]),
-            axis=1
-        )
-
-        if not df_war_history.empty:
-            df = df.merge(df_war_history, on="yearid", how="left")
-            df["war"] = df["war"].fillna(0)
-        else:
-            df["war"] = 0
-
-        df_result = df[[
-            "yearid", "teamid", "g", "pa", "ab", "h", "hr", "rbi", "sb", "bb",
-            "hbp", "sf", "2b", "3b", "ba", "obp", "slg", "ops", "ops_plus", "war",
-        ]].rename(columns={
-            "yearid": "year", "g": "games", "ab": "at_bats", "h": "hits",
-            "hr": "home_runs", "rbi": "rbi", "sb": "stolen_bases", "bb": "walks",
-            "hbp": "hit_by_pitch", "sf": "sacrifice_flies", "2b": "doubles", "3b": "triples",
-        })
+        }, 200
 
-        return jsonify({
-            "mode": "season",
-            "player_type": "hitter",
-            "stats": df_result.to_dict(orient="records"),
-            "photo_url": photo_url,
-            "awards": awards_data,
-        })
+    df_war_history = bundle.war
 
+    if not df_war_history.empty:
+        df = df.merge(df_war_history, on="yearid", how="left")
+        df["war"] = df["war"].fillna(0)
     else:
-        return jsonify({"error": "Invalid mode. Use 'career' or 'season'"}), 400
+        df["war"] = 0
+
+    df_result = df[[
+        "yearid", "teamid", "g", "pa", "ab", "h", "hr", "rbi", "sb", "bb",
+        "hbp", "sf", "2b", "3b", "ba", "obp", "slg", "ops", "ops_plus", "war",
+    ]].rename(columns={
+        "yearid": "year", "g": "games", "ab": "at_bats", "h": "hits",
+        "hr": "home_runs", "rbi": "rbi", "sb": "stolen_bases", "bb": "walks",
+        "hbp": "hit_by_pitch", "sf": "sacrifice_flies", "2b": "doubles", "3b": "triples",
+    })
+
+    return {
+        "mode": "season",
+        "player_type": "hitter",
+        "stats": df_result.to_dict(orient="records"),
+        "photo_url": photo_url,
+        "awards": awards_data,
+    }, 200
 
 
 @app.route("/team")
+@cached_route("team", team_cache_key)
 def get_team_stats():
-    """Unified endpoint that returns both batting and pitching stats"""
+    """Unified endpoint that returns both batting and pitching stats.
+
+    `from`/`to` limit franchise and career totals to a season range.
+    mode=series returns each season of the range (default: the whole
+    franchise history) instead of one total.
+    """
     try:
         team = request.args.get("team", "").strip()
         mode = request.args.get("mode", "season").lower()
@@ -1079,10 +2991,24 @@ def get_team_stats():
         if not team:
             return jsonify({"error": "Enter team"}), 400
 
+        try:
+            start_year, end_year = parse_year_range_args()
+        except ValueError:
+            return jsonify({"error": "from and to must be years"}), 400
+
+        # A season range is a franchise total over those seasons
+        if mode == "season" and (start_year, end_year) != (None, None):
+            mode = "franchise"
+
         team_id, year = parse_team_input(team)
 
+        if mode == "series":
+            if (start_year, end_year) == (None, None) and year is not None:
+                start_year = end_year = year
+            return handle_team_series(team_id, start_year, end_year)
+
         # Get combined stats
-        return handle_combined_team_stats(team_id, year, mode)
+        return handle_combined_team_stats(team_id, year, mode, start_year, end_year)
 
     except Exception as e:
         import traceback
@@ -1091,7 +3017,7 @@ def get_team_stats():
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 
-def handle_combined_team_stats(team_id, year, mode):
+def handle_combined_team_stats(team_id, year, mode, start_year=None, end_year=None):
     """Get both batting and pitching stats in one query - updated for SQLAlchemy"""
     try:
         # Use SQLAlchemy engine directly instead of get_db_connection()
@@ -1099,6 +3025,9 @@ def handle_combined_team_stats(team_id, year, mode):
         
         # Track the actual year being used
         actual_year = None
+        franchise_ids = None
+        # Franchise totals from the running-totals table carry playoff counts
+        has_playoff_stats = False
 
         if mode == "season":
             actual_year = year or 2024
@@ -1111,44 +3040,21 @@ def handle_combined_team_stats(team_id, year, mode):
             FROM lahman_teams 
             WHERE teamid = :team_id AND yearid = :year
             """)
-            df = pd.read_sql_query(query, db_engine, params={"team_id": team_id, "year": actual_year})
+            df = pd.read_sql_query(query, get_engine(), params={"team_id": team_id, "year": actual_year})
 
         elif mode in ["franchise", "career", "overall"]:
             # Check for franchise moves
             franchise_ids = get_franchise_team_ids(team_id)
-
-            if len(franchise_ids) > 1:
-                # Multiple team IDs for this franchise
-                placeholders = ",".join([f":team_id_{i}" for i in range(len(franchise_ids))])
-                query_str = f"""
-                SELECT 'FRANCHISE' as teamid, 
-                       COUNT(*) as seasons,
-                       -- Basic aggregates
-                       SUM(g) as g, SUM(w) as w, SUM(l) as l, 
-                       SUM(r) as r, SUM(ra) as ra,
-                       -- We'll calculate playoff stats separately
-                       0 as playoff_apps, 0 as ws_apps, 0 as ws_championships
-                FROM lahman_teams 
-                WHERE teamid IN ({placeholders})
-                """
-                query = text(query_str)
-                params = {f"team_id_{i}": team_id for i, team_id in enumerate(franchise_ids)}
-                df = pd.read_sql_query(query, db_engine, params=params)
+            totals = lookup_franchise_totals(franchise_ids, start_year, end_year)
+
+            if totals is not None:
+                df = pd.DataFrame()
+                if totals["seasons"]:
+                    teamid = "FRANCHISE" if len(franchise_ids) > 1 else team_id
+                    df = pd.DataFrame([{"teamid": teamid, **totals}])
+                has_playoff_stats = True
             else:
-                # Single team ID
-                query = text("""
-                SELECT teamid, 
-                       COUNT(*) as seasons,
-                       -- Basic aggregates
-                       SUM(g) as g, SUM(w) as w, SUM(l) as l, 
-                       SUM(r) as r, SUM(ra) as ra,
-                       -- We'll calculate playoff stats separately
-                       0 as playoff_apps, 0 as ws_apps, 0 as ws_championships
-                FROM lahman_teams 
-                WHERE teamid = :team_id
-                GROUP BY teamid
-                """)
-                df = pd.read_sql_query(query, db_engine, params={"team_id": team_id})
+                df = query_franchise_totals(team_id, franchise_ids, start_year, end_year)
 
         else:
             # Default to season
@@ -1160,16 +3066,22 @@ def handle_combined_team_stats(team_id, year, mode):
             FROM lahman_teams 
             WHERE teamid = :team_id AND yearid = :year
             """)
-            df = pd.read_sql_query(query, db_engine, params={"team_id": team_id, "year": actual_year})
+            df = pd.read_sql_query(query, get_engine(), params={"team_id": team_id, "year": actual_year})
 
-        if not df.empty:
+        if not df.empty and not has_playoff_stats:
             # Add playoff statistics - pass actual_year for season mode
             df = add_playoff_stats(
-                df, team_id, actual_year if mode == "season" else year, mode
+                df, team_id, actual_year if mode == "season" else year, mode,
+                team_ids=franchise_ids, start_year=start_year, end_year=end_year,
             )
 
         if df.empty:
-            if mode in ["franchise", "career", "overall"]:
+            if mode in ["franchise", "career", "overall"] and (start_year, end_year) != (None, None):
+                return (
+                    jsonify({"error": f"Team '{team_id}' has no seasons in that range"}),
+                    404,
+                )
+            elif mode in ["franchise", "career", "overall"]:
                 return (
                     jsonify({"error": f"Team '{team_id}' not found in database"}),
                     404,
@@ -1182,17 +3094,359 @@ def handle_combined_team_stats(team_id, year, mode):
                     404,
                 )
 
-        # Calculate derived stats
-        df = calculate_simple_team_stats(df)
+        # Calculate derived stats
+        df = calculate_simple_team_stats(df)
+
+        # Pass the correct year value based on mode
+        year_to_pass = actual_year if mode == "season" else None
+        year_range = (start_year, end_year) if mode != "season" else None
+        return format_combined_team_response(df, mode, team_id, year_to_pass, year_range)
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+
+def handle_team_series(team_id, start_year=None, end_year=None):
+    """Every season of a franchise in a range, one row per season"""
+    try:
+        franchise_ids = get_franchise_team_ids(team_id)
+        params = {f"team_id_{i}": franchise_id for i, franchise_id in enumerate(franchise_ids)}
+        placeholders = ",".join(f":{name}" for name in params)
+
+        year_filter = ""
+        if start_year is not None:
+            year_filter += " AND yearid >= :start_year"
+            params["start_year"] = start_year
+        if end_year is not None:
+            year_filter += " AND yearid <= :end_year"
+            params["end_year"] = end_year
+
+        query = text(f"""
+        SELECT yearid, teamid, name, g, w, l, r, ra
+        FROM lahman_teams
+        WHERE teamid IN ({placeholders}){year_filter}
+        ORDER BY yearid
+        """)
+        df = pd.read_sql_query(query, get_engine(), params=params)
+
+        if df.empty:
+            return jsonify({"error": f"Team '{team_id}' has no seasons in that range"}), 404
+
+        # Playoff flags for each season the franchise reached the postseason
+        postseason = get_postseason_index()
+        playoff_seasons = {}
+        for franchise_id in franchise_ids:
+            for yearid, round_name, winner, _, _, _ in postseason.team_series(franchise_id):
+                apps, ws_apps, ws_championships = playoff_seasons.get((yearid, franchise_id), (1, 0, 0))
+                if round_name == "WS":
+                    ws_apps = 1
+                    ws_championships += int(winner == franchise_id)
+                playoff_seasons[(yearid, franchise_id)] = (apps, ws_apps, ws_championships)
+
+        flags = pd.DataFrame(
+            [key + counts for key, counts in playoff_seasons.items()],
+            columns=["yearid", "teamid", "playoff_apps", "ws_apps", "ws_championships"],
+        )
+        df = df.merge(flags, on=["yearid", "teamid"], how="left")
+        df[["playoff_apps", "ws_apps", "ws_championships"]] = (
+            df[["playoff_apps", "ws_apps", "ws_championships"]].fillna(0).astype(int)
+        )
+
+        df = calculate_simple_team_stats(df)
+
+        return jsonify({
+            "mode": "series",
+            "team_id": team_id,
+            "team_name": get_team_name(team_id, None, "franchise"),
+            "from": int(df["yearid"].iloc[0]),
+            "to": int(df["yearid"].iloc[-1]),
+            "team_logo": get_team_logo_with_fallback(team_id),
+            "seasons": format_and_round_stats(df),
+        })
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+
+def lookup_franchise_totals(team_ids, start_year=None, end_year=None):
+    """Franchise totals from the running-totals table, or None to use SQL"""
+    try:
+        return get_franchise_totals().totals(team_ids, start_year, end_year)
+    except Exception as e:
+        print(f"Franchise totals unavailable, falling back to SQL: {e}")
+        return None
+
+
+def query_franchise_totals(team_id, franchise_ids, start_year=None, end_year=None):
+    """Sum a franchise's lahman_teams seasons, optionally within a season range"""
+    params = {f"team_id_{i}": franchise_id for i, franchise_id in enumerate(franchise_ids)}
+    placeholders = ",".join(f":{name}" for name in params)
+
+    year_filter = ""
+    if start_year is not None:
+        year_filter += " AND yearid >= :start_year"
+        params["start_year"] = start_year
+    if end_year is not None:
+        year_filter += " AND yearid <= :end_year"
+        params["end_year"] = end_year
+
+    query = text(f"""
+    SELECT COUNT(*) as seasons,
+           -- Basic aggregates
+           SUM(g) as g, SUM(w) as w, SUM(l) as l,
+           SUM(r) as r, SUM(ra) as ra,
+           -- We'll calculate playoff stats separately
+           0 as playoff_apps, 0 as ws_apps, 0 as ws_championships
+    FROM lahman_teams
+    WHERE teamid IN ({placeholders}){year_filter}
+    """)
+    df = pd.read_sql_query(query, get_engine(), params=params)
+
+    if df.empty or not df.loc[0, "seasons"]:
+        return pd.DataFrame()
+    df.insert(0, "teamid", "FRANCHISE" if len(franchise_ids) > 1 else team_id)
+    return df
+
+
+# Team codes in use (by people and by older parts of the app) that aren't
+# Lahman team IDs -> the Lahman team ID they mean
+TEAM_ID_ALIASES = {
+    "CHC": "CHN",
+    "CWS": "CHA",
+    "CHW": "CHA",
+    "KCR": "KCA",
+    "LAD": "LAN",
+    "SFG": "SFN",
+    "SF": "SFN",
+    "WSN": "WAS",
+    "WSH": "WAS",
+    "SDP": "SDN",
+    "SD": "SDN",
+    "TB": "TBA",
+    "TBR": "TBA",
+    "FLA": "FLO",
+    "NYY": "NYA",
+    "NYM": "NYN",
+    "STL": "SLN",
+}
+
+# Lahman franchise ID -> (ESPN logo abbreviation, MLB team id)
+FRANCHISE_LOGOS = {
+    "ANA": ("laa", "108"),
+    "ARI": ("ari", "109"),
+    "ATL": ("atl", "144"),
+    "BAL": ("bal", "110"),
+    "BOS": ("bos", "111"),
+    "CHC": ("chc", "112"),
+    "CHW": ("cws", "145"),
+    "CIN": ("cin", "113"),
+    "CLE": ("cle", "114"),
+    "COL": ("col", "115"),
+    "DET": ("det", "116"),
+    "FLA": ("mia", "146"),
+    "HOU": ("hou", "117"),
+    "KCR": ("kc", "118"),
+    "LAD": ("lad", "119"),
+    "MIL": ("mil", "158"),
+    "MIN": ("min", "142"),
+    "NYM": ("nym", "121"),
+    "NYY": ("nyy", "147"),
+    "OAK": ("oak", "133"),
+    "PHI": ("phi", "143"),
+    "PIT": ("pit", "134"),
+    "SDP": ("sd", "135"),
+    "SEA": ("sea", "136"),
+    "SFG": ("sf", "137"),
+    "STL": ("stl", "138"),
+    "TBD": ("tb", "139"),
+    "TEX": ("tex", "140"),
+    "TOR": ("tor", "141"),
+    "WSN": ("wsh", "120"),
+}
+
+
+def team_logo_descriptor(abbrev, mlb_id):
+    """Logo URLs for a team, primary first"""
+    return {
+        "primary": f"https://a.espncdn.com/i/teamlogos/mlb/500/{abbrev}.png",
+        "fallbacks": [
+            f"https://loodibee.com/wp-content/uploads/mlb-{abbrev}-logo-transparent.png",
+            f"https://content.sportslogos.net/logos/54/team/{abbrev}-logo-primary-dark.png",
+        ],
+        "mlb": f"https://www.mlbstatic.com/team-logos/url/{mlb_id}.svg",
+    }
+
+
+@dataclass(frozen=True)
+class TeamInfo:
+    """One Lahman team ID: its franchise, seasons, names and logo"""
+    teamid: str
+    franchid: str
+    first_year: int
+    last_year: int
+    # Seasons actually played; Lahman reuses IDs after gaps (LAA 1961-64, 2005-)
+    seasons: frozenset
+    # (first year, last year, name) for each unbroken run of seasons under one name
+    eras: tuple
+    logo: dict
+
+    def played_in(self, year):
+        return year in self.seasons
+
+    def name_in(self, year=None):
+        """Team name in a season, or the latest name without one.
+
+        For a season the ID didn't play, the name it last played under
+        before then (or its first name).
+        """
+        if year is not None:
+            name = self.eras[0][2]
+            for first_year, _, era_name in self.eras:
+                if first_year > year:
+                    break
+                name = era_name
+            return name
+        return self.eras[-1][2]
+
+
+@dataclass(frozen=True)
+class Franchise:
+    franchid: str
+    name: str
+    active: bool
+    # Current team ID first, then older ones by most recent season
+    team_ids: tuple
+
+
+@dataclass(frozen=True)
+class TeamRegistry:
+    """Every Lahman team and franchise, keyed for one-lookup access"""
+    teams: dict
+    franchises: dict
+    # Alias or franchise ID -> team ID
+    aliases: dict
+
+    def canonical_id(self, team_id):
+        code = team_id.upper().strip()
+        if code in self.teams:
+            return code
+        return self.aliases.get(code, code)
+
+    def team(self, team_id):
+        return self.teams.get(self.canonical_id(team_id))
+
+    def season_team_id(self, team_id, year):
+        """The franchise's team ID in a season, for a franchise's current code.
+
+        Matches on seasons played, not the first-to-last span, so a reused
+        ID resolves to whoever held the franchise that year: LAA in 1962,
+        CAL in 1995, ANA in 2000 and LAA again in 2010.
+        """
+        team = self.team(team_id)
+        if team is None:
+            return team_id
+        if team.played_in(year):
+            return team.teamid
+        franchise = self.franchises[team.franchid]
+        if franchise.team_ids[0] != team.teamid:
+            return team.teamid
+        for teamid in franchise.team_ids:
+            member = self.teams[teamid]
+            if member.played_in(year):
+                return teamid
+        return team.teamid
+
+    def franchise_team_ids(self, team_id):
+        """All team IDs of the franchise for its current code, else just the team"""
+        team = self.team(team_id)
+        if team is None:
+            return [team_id]
+        franchise = self.franchises[team.franchid]
+        if franchise.team_ids[0] != team.teamid:
+            return [team.teamid]
+        return list(franchise.team_ids)
+
+
+@preloaded_dataset
+def get_team_registry():
+    """Build the team registry from lahman_teams and lahman_teamsfranchises"""
+    with get_engine().connect() as conn:
+        teams_df = pd.read_sql_query(
+            text("SELECT yearid, teamid, franchid, name FROM lahman_teams"), conn
+        )
+        franchises_df = pd.read_sql_query(
+            text("SELECT franchid, franchname, active FROM lahman_teamsfranchises"), conn
+        )
+
+    teams_df = teams_df.dropna(subset=["yearid", "teamid"]).sort_values(["teamid", "yearid"])
+    teams_df["franchid"] = teams_df["franchid"].fillna(teams_df["teamid"])
+    teams_df["name"] = teams_df["name"].fillna(teams_df["teamid"])
+
+    teams = {}
+    for teamid, seasons in teams_df.groupby("teamid", sort=False):
+        years = seasons["yearid"].astype(int).tolist()
+        names = seasons["name"].tolist()
+        eras = []
+        for year, name in zip(years, names):
+            if eras and eras[-1][2] == name and eras[-1][1] == year - 1:
+                eras[-1][1] = year
+            else:
+                eras.append([year, year, name])
+
+        franchid = seasons["franchid"].iloc[-1]
+        abbrev, mlb_id = FRANCHISE_LOGOS.get(franchid, (teamid.lower(), "0"))
+        teams[teamid] = TeamInfo(
+            teamid=teamid,
+            franchid=franchid,
+            first_year=years[0],
+            last_year=years[-1],
+            seasons=frozenset(years),
+            eras=tuple(tuple(era) for era in eras),
+            logo=team_logo_descriptor(abbrev, mlb_id),
+        )
 
-        # Pass the correct year value based on mode
-        year_to_pass = actual_year if mode == "season" else None
-        return format_combined_team_response(df, mode, team_id, year_to_pass)
+    franchise_names = dict(zip(franchises_df["franchid"], franchises_df["franchname"]))
+    franchise_active = dict(zip(franchises_df["franchid"], franchises_df["active"]))
+    by_franchise = {}
+    for team in teams.values():
+        by_franchise.setdefault(team.franchid, []).append(team)
+
+    franchises = {}
+    aliases = {}
+    for franchid, members in by_franchise.items():
+        members.sort(key=lambda t: (-t.last_year, -t.first_year, t.teamid))
+        franchises[franchid] = Franchise(
+            franchid=franchid,
+            name=franchise_names.get(franchid) or members[0].name_in(),
+            active=franchise_active.get(franchid) == "Y",
+            team_ids=tuple(t.teamid for t in members),
+        )
+        aliases[franchid] = members[0].teamid
+    aliases.update({alias: teamid for alias, teamid in TEAM_ID_ALIASES.items() if teamid in teams})
 
+    return TeamRegistry(teams=teams, franchises=franchises, aliases=aliases)
+
+
+def canonical_team_id(team_id):
+    """Lahman team ID for a code or alias (CHC -> CHN, CWS -> CHA, ...)"""
+    try:
+        return get_team_registry().canonical_id(team_id)
     except Exception as e:
-        import traceback
-        traceback.print_exc()
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
+        print(f"Team registry unavailable: {e}")
+        return team_id
+
+
+def season_team_id(team_id, year):
+    """Team ID a franchise played under in a given season"""
+    try:
+        return get_team_registry().season_team_id(team_id, year)
+    except Exception as e:
+        print(f"Team registry unavailable: {e}")
+        return team_id
 
 
 def get_franchise_team_ids(team_id):
@@ -1200,148 +3454,269 @@ def get_franchise_team_ids(team_id):
     Map current team IDs to all historical team IDs for franchise totals
     This handles team moves and ID changes
     """
-    franchise_mapping = {
-        # Modern team ID -> All historical IDs for that franchise
-        # Milwaukee Brewers - Current franchise (1970+)
-        "MIL": ["MIL", "ML4"],  # NL Brewers (1998+) + AL Brewers (1970-1997)
-        # Atlanta Braves - includes Boston Braves and Milwaukee Braves
-        "ATL": ["ATL", "BSN", "ML1"],  # Atlanta + Boston + Milwaukee Braves (1953-1965)
-        # Los Angeles Dodgers - includes all Brooklyn Dodgers
-        "LAN": ["LAN", "BRO", "BR3"],
-        # San Francisco Giants - includes New York Giants
-        "SFN": ["SFN", "NY1"],
-        # Baltimore Orioles - includes St. Louis Browns
-        "BAL": ["BAL", "SLA", "MLA"],
-        # Chicago White Sox
-        "CHA": ["CHA"],
-        # Cleveland Guardians/Indians
-        "CLE": ["CLE"],
-        # Cincinnati Reds
-        "CIN": ["CIN", "CN2"],
-        # Philadelphia Phillies
-        "PHI": ["PHI"],
-        # Oakland Athletics
-        "OAK": [
-            "OAK",
-            "KC1",
-            "PHA",
-        ],
-        # St. Louis Cardinals
-        "SLN": ["SLN", "SL4"],
-        # New York Yankees
-        "NYA": ["NYA"],
-        # New York Mets
-        "NYN": ["NYN"],
-        # Kansas City Royals
-        "KCR": ["KCR"],
-        # Minnesota Twins - includes original Washington Senators (1901-1960)
-        "MIN": ["MIN", "WS1"],
-        # Texas Rangers - includes expansion Washington Senators (1961-1971)
-        "TEX": ["TEX", "WS2"],
-        # Washington Nationals - includes Montreal Expos
-        "WAS": ["WAS", "MON"],
-        # Los Angeles Angels - various eras
-        "LAA": ["LAA", "ANA", "CAL"],
-        # Tampa Bay Rays
-        "TBA": ["TBA", "TBD"],
-        # Miami Marlins
-        "MIA": ["MIA", "FLO", "FLA"],
-        # Seattle Mariners
-        "SEA": ["SEA"],
-        # Pittsburgh Pirates
-        "PIT": ["PIT", "PT1"],
-        # Single-location franchises (no historical moves)
-        "ARI": ["ARI"],
-        "BOS": ["BOS"],
-        "COL": ["COL"],
-        "DET": ["DET"],
-        "HOU": ["HOU"],
-        "SDN": ["SDN"],
-        "TOR": ["TOR"],
-        "CHC": ["CHN"],
-    }
+    try:
+        return get_team_registry().franchise_team_ids(team_id)
+    except Exception as e:
+        print(f"Team registry unavailable: {e}")
+        return [team_id]
+
+
+@dataclass(frozen=True)
+class PostseasonIndex:
+    """lahman_seriespost in memory, indexed by team, franchise and year.
+
+    series holds (yearid, round, winner, loser, wins, losses) tuples; the
+    by_* maps point into it. ws_titles maps each player to the World Series
+    their team won, newest first.
+    """
+    series: tuple
+    by_team: dict
+    by_franchise: dict
+    by_year: dict
+    ws_titles: dict
+
+    def team_series(self, team_id, year=None):
+        rows = (self.series[i] for i in self.by_team.get(team_id, ()))
+        return [row for row in rows if year is None or row[0] == year]
+
+    def playoff_summary(self, team_id, year=None):
+        """(playoff appearances, WS appearances, WS titles) for a team.
+
+        With a year, appearances are 0/1 flags for that season; without
+        one, they count distinct postseason years.
+        """
+        rows = self.team_series(team_id, year)
+        ws_rows = [row for row in rows if row[1] == "WS"]
+        ws_titles = sum(1 for row in ws_rows if row[2] == team_id)
+        if year is not None:
+            return int(bool(rows)), int(bool(ws_rows)), ws_titles
+        return len({row[0] for row in rows}), len({row[0] for row in ws_rows}), ws_titles
+
+    def franchise_summary(self, team_ids, start_year=None, end_year=None):
+        """playoff_summary totals across several team IDs and a season range"""
+        positions = {p for team_id in team_ids for p in self.by_team.get(team_id, ())}
+        rows = [
+            self.series[p] for p in positions
+            if (start_year is None or self.series[p][0] >= start_year)
+            and (end_year is None or self.series[p][0] <= end_year)
+        ]
+        ws_rows = [row for row in rows if row[1] == "WS"]
+        ws_titles = sum(1 for row in ws_rows if row[2] in team_ids)
+        return len({row[0] for row in rows}), len({row[0] for row in ws_rows}), ws_titles
+
+    def matchups(self, team_a, team_b, start_year=None, end_year=None):
+        """Series played between two teams, optionally limited to a season range"""
+        return [
+            row for row in self.team_series(team_a)
+            if {row[2], row[3]} == {team_a, team_b}
+            and (start_year is None or row[0] >= start_year)
+            and (end_year is None or row[0] <= end_year)
+        ]
+
+    def championships(self, playerid):
+        return [dict(title) for title in self.ws_titles.get(playerid, ())]
+
+
+@preloaded_dataset
+def get_postseason_index():
+    """Load lahman_seriespost and each player's World Series titles once"""
+    series_df = pd.read_sql_query(
+        text("""
+            SELECT yearid, round, teamidwinner, teamidloser, wins, losses
+            FROM lahman_seriespost
+        """),
+        get_engine(),
+    ).sort_values("yearid", kind="stable")
+
+    series = tuple(
+        (
+            int(row.yearid),
+            row.round,
+            row.teamidwinner,
+            row.teamidloser,
+            int(row.wins) if pd.notna(row.wins) else None,
+            int(row.losses) if pd.notna(row.losses) else None,
+        )
+        for row in series_df.itertuples(index=False)
+    )
+
+    by_team, by_year = {}, {}
+    for position, (yearid, _, winner, loser, _, _) in enumerate(series):
+        for team_id in {winner, loser}:
+            by_team.setdefault(team_id, []).append(position)
+        by_year.setdefault(yearid, []).append(position)
+
+    by_franchise = {}
+    for franchid, franchise in get_team_registry().franchises.items():
+        positions = sorted({p for team_id in franchise.team_ids for p in by_team.get(team_id, ())})
+        if positions:
+            by_franchise[franchid] = tuple(positions)
+
+    titles_df = pd.read_sql_query(
+        text("""
+            SELECT DISTINCT b.playerid, b.yearid, b.teamid, s.name as team_name
+            FROM lahman_batting b
+            JOIN lahman_seriespost sp ON b.yearid = sp.yearid AND b.teamid = sp.teamidwinner
+            LEFT JOIN lahman_teams s ON b.teamid = s.teamid AND b.yearid = s.yearid
+            WHERE sp.round = 'WS'
+
+            UNION
+
+            SELECT DISTINCT p.playerid, p.yearid, p.teamid, s.name as team_name
+            FROM lahman_pitching p
+            JOIN lahman_seriespost sp ON p.yearid = sp.yearid AND p.teamid = sp.teamidwinner
+            LEFT JOIN lahman_teams s ON p.teamid = s.teamid AND p.yearid = s.yearid
+            WHERE sp.round = 'WS'
+        """),
+        get_engine(),
+    ).sort_values(["playerid", "yearid"], ascending=[True, False], kind="stable")
+
+    ws_titles = {}
+    for row in titles_df.itertuples(index=False):
+        title = (
+            ("year", int(row.yearid)),
+            ("team", row.teamid),
+            ("team_name", row.team_name if isinstance(row.team_name, str) else row.teamid),
+        )
+        ws_titles.setdefault(row.playerid, []).append(title)
+
+    return PostseasonIndex(
+        series=series,
+        by_team={team_id: tuple(p) for team_id, p in by_team.items()},
+        by_franchise=by_franchise,
+        by_year={yearid: tuple(p) for yearid, p in by_year.items()},
+        ws_titles={playerid: tuple(titles) for playerid, titles in ws_titles.items()},
+    )
+
+
+FRANCHISE_TOTAL_COLUMNS = (
+    "seasons", "g", "w", "l", "r", "ra", "playoff_apps", "ws_apps", "ws_championships",
+)
+
+
+@dataclass(frozen=True)
+class FranchiseTotals:
+    """Season-by-season running totals for every franchise and team ID.
+
+    Groups are the registry's franchises plus each team ID on its own (what
+    get_franchise_team_ids returns for a former code). running[g, k] holds
+    group g's FRANCHISE_TOTAL_COLUMNS for the seasons before first_year + k,
+    so the totals over any season range are one subtraction.
+    """
+    group_index: dict
+    first_year: int
+    running: np.ndarray
+
+    def bounds(self, start_year=None, end_year=None):
+        """Positions on the season axis covering start_year..end_year"""
+        seasons = self.running.shape[1] - 1
+        lo = 0 if start_year is None else min(max(start_year - self.first_year, 0), seasons)
+        hi = seasons if end_year is None else min(max(end_year - self.first_year + 1, 0), seasons)
+        return lo, max(lo, hi)
+
+    def totals(self, team_ids, start_year=None, end_year=None):
+        """Column -> total for a group of team IDs, or None if it isn't a group"""
+        group = self.group_index.get(frozenset(team_ids))
+        if group is None:
+            return None
+        lo, hi = self.bounds(start_year, end_year)
+        total = self.running[group, hi] - self.running[group, lo]
+        return dict(zip(FRANCHISE_TOTAL_COLUMNS, total.tolist()))
+
+    def to_snapshot(self):
+        groups = sorted(self.group_index.items(), key=lambda item: item[1])
+        return {"running": self.running}, {
+            "first_year": self.first_year,
+            "groups": [sorted(team_ids) for team_ids, _ in groups],
+        }
+
+    @classmethod
+    def from_snapshot(cls, arrays, meta):
+        group_index = {frozenset(team_ids): i for i, team_ids in enumerate(meta["groups"])}
+        return cls(group_index, meta["first_year"], arrays["running"])
+
+
+@preloaded_dataset
+def get_franchise_totals():
+    """Build running season totals from lahman_teams and the postseason index"""
+    snapshot = read_snapshot_dataset("franchise_totals")
+    if snapshot is not None:
+        return FranchiseTotals.from_snapshot(*snapshot)
+
+    seasons_df = pd.read_sql_query(
+        text("SELECT yearid, teamid, g, w, l, r, ra FROM lahman_teams"), get_engine()
+    ).dropna(subset=["yearid", "teamid"])
+    seasons_df["seasons"] = 1
+
+    # One row per postseason team-year: made it, reached the WS, won it
+    postseason_rows = []
+    for yearid, round_name, winner, loser, _, _ in get_postseason_index().series:
+        for team_id in {winner, loser}:
+            postseason_rows.append({
+                "yearid": yearid,
+                "teamid": team_id,
+                "ws_apps": int(round_name == "WS"),
+                "ws_championships": int(round_name == "WS" and team_id == winner),
+            })
+    postseason_df = pd.DataFrame(
+        postseason_rows, columns=["yearid", "teamid", "ws_apps", "ws_championships"]
+    )
+    postseason_df = postseason_df.groupby(["yearid", "teamid"], as_index=False).agg(
+        {"ws_apps": "max", "ws_championships": "sum"}
+    )
+    postseason_df["playoff_apps"] = 1
+
+    df = pd.concat([seasons_df, postseason_df], ignore_index=True)
+    for column in FRANCHISE_TOTAL_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors="coerce").fillna(0)
 
-    return franchise_mapping.get(team_id, [team_id])
+    groups = [frozenset(team_ids) for team_ids in (
+        franchise.team_ids for franchise in get_team_registry().franchises.values()
+    )]
+    groups += [frozenset([team_id]) for team_id in sorted(seasons_df["teamid"].unique())]
+    group_index = {}
+    for team_ids in groups:
+        group_index.setdefault(team_ids, len(group_index))
 
+    if df.empty:
+        first_year, seasons = 0, 0
+    else:
+        first_year = int(df["yearid"].min())
+        seasons = int(df["yearid"].max()) - first_year + 1
+
+    # Per-code season totals, then summed into each group that code belongs to
+    codes = {code: i for i, code in enumerate(sorted(df["teamid"].unique()))}
+    by_code = np.zeros((len(codes), seasons + 1, len(FRANCHISE_TOTAL_COLUMNS)), dtype=np.int64)
+    np.add.at(
+        by_code,
+        (df["teamid"].map(codes).to_numpy(), df["yearid"].to_numpy(dtype=np.int64) - first_year + 1),
+        df[list(FRANCHISE_TOTAL_COLUMNS)].to_numpy(dtype=np.int64),
+    )
+    members = np.zeros((len(group_index), len(codes)), dtype=np.int64)
+    for team_ids, group in group_index.items():
+        for team_id in team_ids:
+            if team_id in codes:
+                members[group, codes[team_id]] = 1
+
+    running = np.cumsum(np.tensordot(members, by_code, axes=1), axis=1)
+    running.setflags(write=False)
+    return FranchiseTotals(group_index, first_year, running)
 
-def add_playoff_stats(df, team_id, year, mode):
+
+def add_playoff_stats(df, team_id, year, mode, team_ids=None, start_year=None, end_year=None):
     """Add playoff appearance and World Series statistics using lahman_seriespost"""
     try:
-        from sqlalchemy import text
-        
+        postseason = get_postseason_index()
+
         if mode == "season":
             # For single season, check if team made playoffs that year
-            actual_year = year or 2024
-
-            # Check if they appeared in any playoff series that year
-            playoff_query = text("""
-            SELECT COUNT(*) as series_count
-            FROM lahman_seriespost 
-            WHERE (teamidwinner = :team_id OR teamidloser = :team_id) 
-            AND yearid = :year
-            """)
-
-            with db_engine.connect() as conn:
-                result = conn.execute(playoff_query, {"team_id": team_id, "year": actual_year})
-                playoff_apps = 1 if result.fetchone()[0] > 0 else 0
-
-                # Check World Series appearances
-                ws_query = text("""
-                SELECT COUNT(*) as ws_series
-                FROM lahman_seriespost 
-                WHERE (teamidwinner = :team_id OR teamidloser = :team_id) 
-                AND yearid = :year 
-                AND round = 'WS'
-                """)
-
-                result = conn.execute(ws_query, {"team_id": team_id, "year": actual_year})
-                ws_apps = 1 if result.fetchone()[0] > 0 else 0
-
-                # Check World Series wins
-                ws_win_query = text("""
-                SELECT COUNT(*) as ws_wins
-                FROM lahman_seriespost 
-                WHERE teamidwinner = :team_id
-                AND yearid = :year 
-                AND round = 'WS'
-                """)
-
-                result = conn.execute(ws_win_query, {"team_id": team_id, "year": actual_year})
-                ws_championships = result.fetchone()[0]
-
+            actual_year = int(year or 2024)
+            playoff_apps, ws_apps, ws_championships = postseason.playoff_summary(team_id, actual_year)
         else:
-            # For franchise/career mode, count all playoff appearances
-            with db_engine.connect() as conn:
-                playoff_query = text("""
-                SELECT COUNT(DISTINCT yearid) as playoff_years
-                FROM lahman_seriespost 
-                WHERE (teamidwinner = :team_id OR teamidloser = :team_id)
-                """)
-
-                result = conn.execute(playoff_query, {"team_id": team_id})
-                playoff_apps = result.fetchone()[0]
-
-                # Count World Series appearances
-                ws_query = text("""
-                SELECT COUNT(DISTINCT yearid) as ws_years
-                FROM lahman_seriespost 
-                WHERE (teamidwinner = :team_id OR teamidloser = :team_id) 
-                AND round = 'WS'
-                """)
-
-                result = conn.execute(ws_query, {"team_id": team_id})
-                ws_apps = result.fetchone()[0]
-
-                # Count World Series championships
-                ws_win_query = text("""
-                SELECT COUNT(*) as total_ws_wins
-                FROM lahman_seriespost 
-                WHERE teamidwinner = :team_id
-                AND round = 'WS'
-                """)
-
-                result = conn.execute(ws_win_query, {"team_id": team_id})
-                ws_championships = result.fetchone()[0]
+            # For franchise/career mode, count every appearance in the range
+            playoff_apps, ws_apps, ws_championships = postseason.franchise_summary(
+                team_ids or [team_id], start_year, end_year
+            )
 
         df.loc[0, "playoff_apps"] = playoff_apps
         df.loc[0, "ws_apps"] = ws_apps
@@ -1375,14 +3750,14 @@ def calculate_simple_team_stats(df):
         for col in essential_cols:
             df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
 
-        # Calculate derived stats
+        # Calculate derived stats, a whole column at a time
         df["gp"] = df["g"]  # Games played same as games
-        df["rpg"] = df.apply(
-            lambda row: row["r"] / row["g"] if row["g"] > 0 else 0, axis=1
-        )  # Runs per game
-        df["rapg"] = df.apply(
-            lambda row: row["ra"] / row["g"] if row["g"] > 0 else 0, axis=1
-        )  # Runs allowed per game
+        has_games = df["g"] > 0
+        df["rpg"] = (df["r"] / df["g"]).where(has_games, 0)  # Runs per game
+        df["rapg"] = (df["ra"] / df["g"]).where(has_games, 0)  # Runs allowed per game
+        df["run_diff"] = df["r"] - df["ra"]
+        decisions = df["w"] + df["l"]
+        df["win_pct"] = (df["w"] / decisions).where(decisions > 0, 0)
 
         return df
 
@@ -1445,7 +3820,7 @@ def calculate_combined_team_stats(df):
         return df
 
 
-def format_combined_team_response(df, mode, team_id, year):
+def format_combined_team_response(df, mode, team_id, year, year_range=None):
     """Format combined team stats response"""
     try:
         # Pass the mode to get_team_name for proper formatting
@@ -1463,22 +3838,33 @@ def format_combined_team_response(df, mode, team_id, year):
         stats = format_and_round_stats(stats)
         team_logo = get_team_logo_with_fallback(team_id, year)
 
-        return jsonify(
-            {
-                "mode": mode,
-                "team_id": team_id,
-                "team_name": team_name,
-                "year": year,
-                "team_logo": team_logo,
-                "stats": stats,
-            }
-        )
+        response = {
+            "mode": mode,
+            "team_id": team_id,
+            "team_name": team_name,
+            "year": year,
+            "team_logo": team_logo,
+            "stats": stats,
+        }
+        if year_range is not None and year_range != (None, None):
+            response["from"], response["to"] = year_range
+
+        return jsonify(response)
 
     except Exception as e:
         return jsonify({"error": f"Response formatting error: {str(e)}"}), 500
 
 def parse_team_input(team):
     """Parse team input like '2024 Dodgers', 'Dodgers 2024', 'Yankees', etc."""
+    team_code, year = split_team_input(team)
+    if year is not None:
+        # '1955 Dodgers' means Brooklyn, not Los Angeles
+        team_code = season_team_id(team_code, year)
+    return team_code, year
+
+
+def split_team_input(team):
+    """Split team input into a team code and an optional year"""
     try:
         parts = team.strip().split()
 
@@ -1517,369 +3903,498 @@ def parse_team_input(team):
         return team_code, None
 
 
+# Exact team codes people type -> database team code. Codes win over names.
+TEAM_CODE_ALIASES = {
+    # Angels - various historical codes
+    "alt": "ALT",  # Early Angels
+    "cal": "CAL",  # California Angels
+    "ana": "ANA",  # Anaheim Angels
+    "laa": "LAA",  # Los Angeles Angels (current)
+    # Diamondbacks
+    "ari": "ARI",
+    # Braves - historical codes
+    "bsn": "BSN",  # Boston Braves (historical)
+    "ml1": "ML1",  # Milwaukee Braves (historical)
+    "mla": "MLA",  # Another Milwaukee code
+    "atl": "ATL",  # Atlanta Braves (current)
+    # Orioles - historical St. Louis Browns
+    "sla": "SLA",  # St. Louis Browns (historical)
+    "bal": "BAL",  # Baltimore Orioles (current)
+    # Red Sox
+    "bs1": "BS1",  # Historical Boston code
+    "bos": "BOS",  # Boston Red Sox (current)
+    # Cubs
+    "chn": "CHN",  # Chicago Cubs (historical database code)
+    "chc": "CHC",  # Chicago Cubs (modern)
+    # White Sox
+    "cha": "CHA",  # Chicago White Sox (historical database code)
+    "chw": "CWS",  # Map CHW to CWS
+    "cws": "CWS",  # Chicago White Sox (current)
+    # Reds
+    "cn2": "CN2",  # Historical Cincinnati code
+    "cn3": "CN3",  # Another historical Cincinnati code
+    "cin": "CIN",  # Cincinnati Reds (current)
+    # Indians/Guardians
+    "cle": "CLE",  # Cleveland (current - covers both Indians and Guardians)
+    # Rockies
+    "col": "COL",
+    # Tigers
+    "det": "DET",
+    # Astros
+    "hou": "HOU",
+    # Royals
+    "kca": "KCA",  # Map old code to current
+    "kcr": "KCA",  # Kansas City Royals
+    # Dodgers
+    "br1": "BR1",  # Brooklyn Dodgers (very old)
+    "br2": "BR2",  # Brooklyn Dodgers (historical)
+    "br4": "BR4",  # Brooklyn Dodgers (another historical)
+    "bro": "BRO",  # Brooklyn (if it exists)
+    "lad": "LAN",  # Map LAD to LAN (database uses LAN)
+    "lan": "LAN",  # Los Angeles Dodgers (database code)
+    # Marlins
+    "fla": "FLA",  # Florida Marlins (historical)
+    "mia": "MIA",  # Miami Marlins (current)
+    # Brewers
+    "mil": "MIL",
+    # Twins
+    "min": "MIN",
+    # Mets
+    "nym": "NYN",
+    # Yankees
+    "nyy": "NYA",
+    # Athletics
+    "pha": "PHA",  # Philadelphia Athletics (historical)
+    "oak": "OAK",  # Oakland Athletics (current)
+    # Phillies
+    "phn": "PHN",  # Historical Philadelphia code
+    "ph3": "PH3",  # Another historical Philadelphia code
+    "phi": "PHI",  # Philadelphia Phillies (current)
+    # Pirates
+    "pit": "PIT",
+    # Padres
+    "sdp": "SDN",  # San Diego Padres (database code)
+    "sd": "SDN",  # Map SD to SDP
+    # Mariners
+    "sea": "SEA",
+    # Giants
+    "ny1": "NY1",  # New York Giants (historical, if it exists)
+    "sfg": "SFN",  # San Francisco Giants (database code)
+    "sf": "SFN",  # Map SF to SFG
+    # Cardinals
+    "stl": "SLN",
+    # Rays
+    "tbd": "TBA",  # Map old code to current
+    "TBA": "TBA",  # Tampa Bay Rays
+    "tb": "TBA",  # Map TB to TBR
+    # Rangers
+    "was": "WAS",  # Washington Senators (historical, became Rangers)
+    "tex": "TEX",  # Texas Rangers (current)
+    # Blue Jays
+    "tor": "TOR",
+    # Nationals
+    "mon": "MON",  # Montreal Expos (historical)
+    "wsn": "WAS",  # Washington Nationals (current)
+    "was": "WAS",  # Map WAS to WSN for Nationals
+}
+
+# Team names and nicknames -> database team code
+TEAM_NAME_ALIASES = {
+    # Angels
+    "angels": "LAA",
+    "los angeles angels": "LAA",
+    "anaheim angels": "ANA",  # Use historical code for historical name
+    "california angels": "CAL",  # Use historical code for historical name
+    # Diamondbacks
+    "diamondbacks": "ARI",
+    "arizona diamondbacks": "ARI",
+    "d-backs": "ARI",
+    "dbacks": "ARI",
+    # Braves
+    "braves": "ATL",
+    "atlanta braves": "ATL",
+    "atlanta": "ATL",
+    "boston braves": "BSN",  # Historical
+    "milwaukee braves": "ML1",  # Historical
+    # Orioles
+    "orioles": "BAL",
+    "baltimore orioles": "BAL",
+    "baltimore": "BAL",
+    "o's": "BAL",
+    "st. louis browns": "SLA",
+    "st louis browns": "SLA",
+    "browns": "SLA",
+    # Red Sox
+    "red sox": "BOS",
+    "boston red sox": "BOS",
+    "boston": "BOS",
+    "redsox": "BOS",
+    # Cubs
+    "cubs": "CHN",
+    "chicago cubs": "CHN",
+    "cubbies": "CHN",
+    # White Sox
+    "white sox": "CHA",
+    "chicago white sox": "CHA",
+    "whitesox": "CHA",
+    # Reds
+    "reds": "CIN",
+    "cincinnati reds": "CIN",
+    "cincinnati": "CIN",
+    # Guardians/Indians
+    "guardians": "CLE",
+    "cleveland guardians": "CLE",
+    "cleveland": "CLE",
+    "indians": "CLE",
+    "cleveland indians": "CLE",
+    # Rockies
+    "rockies": "COL",
+    "colorado rockies": "COL",
+    "colorado": "COL",
+    # Tigers
+    "tigers": "DET",
+    "detroit tigers": "DET",
+    "detroit": "DET",
+    # Astros
+    "astros": "HOU",
+    "houston astros": "HOU",
+    "houston": "HOU",
+    # Royals
+    "royals": "KCA",
+    "kansas city royals": "KCA",
+    "kansas city": "KCA",
+    # Dodgers
+    "dodgers": "LAN",
+    "los angeles dodgers": "LAN",
+    "brooklyn dodgers": "BR2",
+    # Marlins
+    "marlins": "MIA",
+    "miami marlins": "MIA",
+    "florida marlins": "FLA",
+    "miami": "MIA",
+    # Brewers
+    "brewers": "MIL",
+    "milwaukee brewers": "MIL",
+    "milwaukee": "MIL",
+    # Twins
+    "twins": "MIN",
+    "minnesota twins": "MIN",
+    "minnesota": "MIN",
+    # Mets
+    "mets": "NYN",
+    "new york mets": "NYN",
+    "ny mets": "NYN",
+    # Yankees
+    "yankees": "NYA",
+    "new york yankees": "NYA",
+    "ny yankees": "NYA",
+    "yanks": "NYA",
+    # Athletics
+    "athletics": "OAK",
+    "oakland athletics": "OAK",
+    "oakland": "OAK",
+    "a's": "OAK",
+    "as": "OAK",
+    "philadelphia athletics": "PHA",
+    # Phillies
+    "phillies": "PHI",
+    "philadelphia phillies": "PHI",
+    "philadelphia": "PHI",
+    "phils": "PHI",
+    # Pirates
+    "pirates": "PIT",
+    "pittsburgh pirates": "PIT",
+    "pittsburgh": "PIT",
+    "bucs": "PIT",
+    # Padres
+    "padres": "SDN",
+    "san diego padres": "SDN",
+    "san diego": "SDN",
+    # Mariners
+    "mariners": "SEA",
+    "seattle mariners": "SEA",
+    "seattle": "SEA",
+    "m's": "SEA",
+    # Giants
+    "giants": "SFN",
+    "san francisco giants": "SFN",
+    "sf giants": "SFN",
+    "san francisco": "SFN",
+    # Cardinals
+    "cardinals": "SLN",
+    "st. louis cardinals": "SLN",
+    "st louis cardinals": "SLN",
+    "cards": "SLN",
+    "st. louis": "SLN",
+    "st louis": "SLN",
+    # Rays
+    "rays": "TBA",
+    "tampa bay rays": "TBA",
+    "tampa bay": "TBA",
+    "devil rays": "TBD",
+    "tampa bay devil rays": "TBD",
+    # Rangers
+    "rangers": "TEX",
+    "texas rangers": "TEX",
+    "texas": "TEX",
+    "washington senators": "WAS",
+    "senators": "WAS",
+    # Blue Jays
+    "blue jays": "TOR",
+    "toronto blue jays": "TOR",
+    "toronto": "TOR",
+    "jays": "TOR",
+    "bluejays": "TOR",
+    # Nationals
+    "nationals": "WAS",
+    "washington nationals": "WAS",
+    "washington": "WAS",
+    "nats": "WAS",
+    "expos": "MON",
+    "montreal expos": "MON",
+}
+
+TEAM_FUZZY_PREFIX_MIN = 3  # shortest token matched as a prefix ("yank")
+TEAM_FUZZY_TYPO_MIN = 4  # shortest token matched with one typo ("dodgrs")
+
+
+def normalize_team_alias(name):
+    """Lowercase, drop periods/apostrophes, treat hyphens as spaces"""
+    name = name.lower().replace(".", "").replace("'", "").replace("-", " ")
+    return " ".join(name.split())
+
+
+def single_deletions(token):
+    """The token itself plus every string one character shorter"""
+    return {token} | {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def within_one_typo(a, b):
+    """One insertion, deletion, substitution or swap of adjacent letters apart"""
+    if bounded_edit_distance(a, b, 1) <= 1:
+        return True
+    if len(a) != len(b):
+        return False
+    diffs = [i for i, (ca, cb) in enumerate(zip(a, b)) if ca != cb]
+    return (
+        len(diffs) == 2 and diffs[1] == diffs[0] + 1
+        and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]]
+    )
+
+
+@dataclass(frozen=True)
+class TeamResolver:
+    """Team search terms -> database team codes, compiled once at import.
+
+    Exact aliases (as written, normalized and with spaces removed) are a
+    dict hit. Anything else is scored against aliases sharing a token with
+    it: whole-token matches count most, then prefixes, then one-typo
+    matches, with a bonus for covering more of the alias. An alias that
+    leaves one of its own tokens unmatched while a query token it misses
+    matches another alias ranks below every alias without that conflict, so
+    "new york giants" finds "giants" rather than "new york mets". Ties go to
+    the shorter alias, then alphabetically, so results never depend on dict
+    order.
+    """
+    exact: dict
+    alias_tokens: dict
+    token_aliases: dict
+    tokens: tuple
+    # Each token and its one-character deletions -> tokens; strings one
+    # edit apart always share an entry, so typo candidates are dict hits
+    deletion_index: dict
+
+    @classmethod
+    def compile(cls, code_aliases, name_aliases):
+        aliases = {}
+        for alias, code in name_aliases.items():
+            aliases[alias.lower().strip()] = code
+        for alias, code in code_aliases.items():
+            aliases[alias.lower().strip()] = code
+
+        exact = dict(aliases)
+        for alias, code in aliases.items():
+            normalized = normalize_team_alias(alias)
+            exact.setdefault(normalized, code)
+            exact.setdefault(normalized.replace(" ", ""), code)
+
+        alias_tokens = {}
+        token_aliases = {}
+        for alias, code in aliases.items():
+            normalized = normalize_team_alias(alias)
+            if normalized in alias_tokens:
+                continue
+            alias_tokens[normalized] = (code, tuple(normalized.split()))
+            for token in set(normalized.split()):
+                token_aliases.setdefault(token, []).append(normalized)
+
+        deletion_index = {}
+        for token in token_aliases:
+            if len(token) >= TEAM_FUZZY_TYPO_MIN - 1:
+                for variant in single_deletions(token):
+                    deletion_index.setdefault(variant, set()).add(token)
+
+        return cls(
+            exact=exact,
+            alias_tokens=alias_tokens,
+            token_aliases={token: tuple(sorted(names)) for token, names in token_aliases.items()},
+            tokens=tuple(sorted(token_aliases)),
+            deletion_index={variant: tuple(sorted(found)) for variant, found in deletion_index.items()},
+        )
+
+    def matching_tokens(self, query_token):
+        """Alias tokens matching one query token, with match weights"""
+        matches = {}
+        if query_token in self.token_aliases:
+            matches[query_token] = 1.0
+        if len(query_token) >= TEAM_FUZZY_PREFIX_MIN:
+            i = bisect.bisect_left(self.tokens, query_token)
+            while i < len(self.tokens) and self.tokens[i].startswith(query_token):
+                matches.setdefault(self.tokens[i], 0.9)
+                i += 1
+        if not matches and len(query_token) >= TEAM_FUZZY_TYPO_MIN:
+            candidates = set()
+            for variant in single_deletions(query_token):
+                candidates.update(self.deletion_index.get(variant, ()))
+            for token in candidates:
+                if within_one_typo(query_token, token):
+                    matches[token] = 0.8
+        return matches
+
+    def score(self, query):
+        """Best-scoring (alias, code) for a normalized query, or None"""
+        query_tokens = query.split()
+        if not query_tokens:
+            return None
+
+        # alias -> {query token position: weight}, {alias tokens matched}
+        query_hits = {}
+        alias_hits = {}
+        for position, query_token in enumerate(query_tokens):
+            for token, weight in self.matching_tokens(query_token).items():
+                for alias in self.token_aliases[token]:
+                    hits = query_hits.setdefault(alias, {})
+                    hits[position] = max(hits.get(position, 0), weight)
+                    alias_hits.setdefault(alias, set()).add(token)
+
+        # Query positions that matched some alias
+        matched = {position for hits in query_hits.values() for position in hits}
+
+        best = None
+        for alias, hits in query_hits.items():
+            code, tokens = self.alias_tokens[alias]
+            score = sum(hits.values()) / len(query_tokens) + 0.5 * len(alias_hits[alias]) / len(tokens)
+            conflict = len(alias_hits[alias]) < len(set(tokens)) and bool(matched - hits.keys())
+            rank = (conflict, -score, len(tokens), alias)
+            if best is None or rank < best[0]:
+                best = (rank, alias, code)
+
+        return (best[1], best[2]) if best else None
+
+    def resolve(self, search_term):
+        term = search_term.lower().strip()
+        code = self.exact.get(term)
+        if code is None:
+            normalized = normalize_team_alias(term)
+            code = self.exact.get(normalized) or self.exact.get(normalized.replace(" ", ""))
+        if code is None:
+            match = self.score(normalize_team_alias(term))
+            code = match[1] if match else None
+        return code or search_term.upper().strip()
+
+
+team_resolver = TeamResolver.compile(TEAM_CODE_ALIASES, TEAM_NAME_ALIASES)
+
+
 def get_team_code_from_search(search_term):
     """Convert team search terms to database team codes"""
-    search_term = search_term.lower().strip()
-
-    # Direct team code mappings (if they search the exact code)
-    team_codes = {
-        # Angels - various historical codes
-        "alt": "ALT",  # Early Angels
-        "cal": "CAL",  # California Angels
-        "ana": "ANA",  # Anaheim Angels
-        "laa": "LAA",  # Los Angeles Angels (current)
-        # Diamondbacks
-        "ari": "ARI",
-        # Braves - historical codes
-        "bsn": "BSN",  # Boston Braves (historical)
-        "ml1": "ML1",  # Milwaukee Braves (historical)
-        "mla": "MLA",  # Another Milwaukee code
-        "atl": "ATL",  # Atlanta Braves (current)
-        # Orioles - historical St. Louis Browns
-        "sla": "SLA",  # St. Louis Browns (historical)
-        "bal": "BAL",  # Baltimore Orioles (current)
-        # Red Sox
-        "bs1": "BS1",  # Historical Boston code
-        "bos": "BOS",  # Boston Red Sox (current)
-        # Cubs
-        "chn": "CHN",  # Chicago Cubs (historical database code)
-        "chc": "CHC",  # Chicago Cubs (modern)
-        # White Sox
-        "cha": "CHA",  # Chicago White Sox (historical database code)
-        "chw": "CWS",  # Map CHW to CWS
-        "cws": "CWS",  # Chicago White Sox (current)
-        # Reds
-        "cn2": "CN2",  # Historical Cincinnati code
-        "cn3": "CN3",  # Another historical Cincinnati code
-        "cin": "CIN",  # Cincinnati Reds (current)
-        # Indians/Guardians
-        "cle": "CLE",  # Cleveland (current - covers both Indians and Guardians)
-        # Rockies
-        "col": "COL",
-        # Tigers
-        "det": "DET",
-        # Astros
-        "hou": "HOU",
-        # Royals
-        "kca": "KCA",  # Map old code to current
-        "kcr": "KCA",  # Kansas City Royals
-        # Dodgers
-        "br1": "BR1",  # Brooklyn Dodgers (very old)
-        "br2": "BR2",  # Brooklyn Dodgers (historical)
-        "br4": "BR4",  # Brooklyn Dodgers (another historical)
-        "bro": "BRO",  # Brooklyn (if it exists)
-        "lad": "LAN",  # Map LAD to LAN (database uses LAN)
-        "lan": "LAN",  # Los Angeles Dodgers (database code)
-        # Marlins
-        "fla": "FLA",  # Florida Marlins (historical)
-        "mia": "MIA",  # Miami Marlins (current)
-        # Brewers
-        "mil": "MIL",
-        # Twins
-        "min": "MIN",
-        # Mets
-        "nym": "NYN",
-        # Yankees
-        "nyy": "NYA",
-        # Athletics
-        "pha": "PHA",  # Philadelphia Athletics (historical)
-        "oak": "OAK",  # Oakland Athletics (current)
-        # Phillies
-        "phn": "PHN",  # Historical Philadelphia code
-        "ph3": "PH3",  # Another historical Philadelphia code
-        "phi": "PHI",  # Philadelphia Phillies (current)
-        # Pirates
-        "pit": "PIT",
-        # Padres
-        "sdp": "SDN",  # San Diego Padres (database code)
-        "sd": "SDN",  # Map SD to SDP
-        # Mariners
-        "sea": "SEA",
-        # Giants
-        "ny1": "NY1",  # New York Giants (historical, if it exists)
-        "sfg": "SFN",  # San Francisco Giants (database code)
-        "sf": "SFN",  # Map SF to SFG
-        # Cardinals
-        "stl": "SLN",
-        # Rays
-        "tbd": "TBA",  # Map old code to current
-        "TBA": "TBA",  # Tampa Bay Rays
-        "tb": "TBA",  # Map TB to TBR
-        # Rangers
-        "was": "WAS",  # Washington Senators (historical, became Rangers)
-        "tex": "TEX",  # Texas Rangers (current)
-        # Blue Jays
-        "tor": "TOR",
-        # Nationals
-        "mon": "MON",  # Montreal Expos (historical)
-        "wsn": "WAS",  # Washington Nationals (current)
-        "was": "WAS",  # Map WAS to WSN for Nationals
-    }
+    return canonical_team_id(team_resolver.resolve(search_term))
+
+
+TEAM_RESOLVER_SAMPLES = [
+    ("exact code", "nyy"),
+    ("exact name", "los angeles dodgers"),
+    ("normalized", "St. Louis Cardinals"),
+    ("token", "la dodgers"),
+    ("prefix", "yank"),
+    ("typo", "dodgrs"),
+    ("nickname", "New York Giants"),
+    ("no match", "zzzz"),
+]
+
+
+def substring_team_match(search_term):
+    """The pre-resolver lookup: exact alias, else the first name alias that
+    contains the term or is contained in it (in dict order), else None"""
+    term = search_term.lower().strip()
+    if term in TEAM_CODE_ALIASES:
+        return TEAM_CODE_ALIASES[term], True
+    if term in TEAM_NAME_ALIASES:
+        return TEAM_NAME_ALIASES[term], True
+    for name, code in TEAM_NAME_ALIASES.items():
+        if term in name or name in term:
+            # Whole words only; "as" inside "superbas" was an accident
+            whole_words = f" {name} " in f" {term} " or f" {term}" in f" {name}"
+            return code, whole_words
+    return None, False
+
+
+@app.cli.command("check-team-resolver")
+def check_team_resolver():
+    """Check that every alias, benchmark sample and historical team name the
+    old substring lookup resolved still resolves to the same team"""
+    terms = list(TEAM_CODE_ALIASES) + list(TEAM_NAME_ALIASES)
+    terms += [term for _, term in TEAM_RESOLVER_SAMPLES]
+    try:
+        terms += sorted({
+            name for team in get_team_registry().teams.values() for _, _, name in team.eras
+        })
+    except Exception as e:
+        click.echo(f"Team registry unavailable, checking aliases only: {e}")
 
-    if search_term in team_codes:
-        return team_codes[search_term]
-
-    # Name mappings
-    name_mappings = {
-        # Angels
-        "angels": "LAA",
-        "los angeles angels": "LAA",
-        "anaheim angels": "ANA",  # Use historical code for historical name
-        "california angels": "CAL",  # Use historical code for historical name
-        # Diamondbacks
-        "diamondbacks": "ARI",
-        "arizona diamondbacks": "ARI",
-        "d-backs": "ARI",
-        "dbacks": "ARI",
-        # Braves
-        "braves": "ATL",
-        "atlanta braves": "ATL",
-        "atlanta": "ATL",
-        "boston braves": "BSN",  # Historical
-        "milwaukee braves": "ML1",  # Historical
-        # Orioles
-        "orioles": "BAL",
-        "baltimore orioles": "BAL",
-        "baltimore": "BAL",
-        "o's": "BAL",
-        "st. louis browns": "SLA",
-        "st louis browns": "SLA",
-        "browns": "SLA",
-        # Red Sox
-        "red sox": "BOS",
-        "boston red sox": "BOS",
-        "boston": "BOS",
-        "redsox": "BOS",
-        # Cubs
-        "cubs": "CHN",
-        "chicago cubs": "CHN",
-        "cubbies": "CHN",
-        # White Sox
-        "white sox": "CHA",
-        "chicago white sox": "CHA",
-        "whitesox": "CHA",
-        # Reds
-        "reds": "CIN",
-        "cincinnati reds": "CIN",
-        "cincinnati": "CIN",
-        # Guardians/Indians
-        "guardians": "CLE",
-        "cleveland guardians": "CLE",
-        "cleveland": "CLE",
-        "indians": "CLE",
-        "cleveland indians": "CLE",
-        # Rockies
-        "rockies": "COL",
-        "colorado rockies": "COL",
-        "colorado": "COL",
-        # Tigers
-        "tigers": "DET",
-        "detroit tigers": "DET",
-        "detroit": "DET",
-        # Astros
-        "astros": "HOU",
-        "houston astros": "HOU",
-        "houston": "HOU",
-        # Royals
-        "royals": "KCA",
-        "kansas city royals": "KCA",
-        "kansas city": "KCA",
-        # Dodgers
-        "dodgers": "LAN",
-        "los angeles dodgers": "LAN",
-        "brooklyn dodgers": "BR2",
-        # Marlins
-        "marlins": "MIA",
-        "miami marlins": "MIA",
-        "florida marlins": "FLA",
-        "miami": "MIA",
-        # Brewers
-        "brewers": "MIL",
-        "milwaukee brewers": "MIL",
-        "milwaukee": "MIL",
-        # Twins
-        "twins": "MIN",
-        "minnesota twins": "MIN",
-        "minnesota": "MIN",
-        # Mets
-        "mets": "NYN",
-        "new york mets": "NYN",
-        "ny mets": "NYN",
-        # Yankees
-        "yankees": "NYA",
-        "new york yankees": "NYA",
-        "ny yankees": "NYA",
-        "yanks": "NYA",
-        # Athletics
-        "athletics": "OAK",
-        "oakland athletics": "OAK",
-        "oakland": "OAK",
-        "a's": "OAK",
-        "as": "OAK",
-        "philadelphia athletics": "PHA",
-        # Phillies
-        "phillies": "PHI",
-        "philadelphia phillies": "PHI",
-        "philadelphia": "PHI",
-        "phils": "PHI",
-        # Pirates
-        "pirates": "PIT",
-        "pittsburgh pirates": "PIT",
-        "pittsburgh": "PIT",
-        "bucs": "PIT",
-        # Padres
-        "padres": "SDN",
-        "san diego padres": "SDN",
-        "san diego": "SDN",
-        # Mariners
-        "mariners": "SEA",
-        "seattle mariners": "SEA",
-        "seattle": "SEA",
-        "m's": "SEA",
-        # Giants
-        "giants": "SFN",
-        "san francisco giants": "SFN",
-        "sf giants": "SFN",
-        "san francisco": "SFN",
-        # Cardinals
-        "cardinals": "SLN",
-        "st. louis cardinals": "SLN",
-        "st louis cardinals": "SLN",
-        "cards": "SLN",
-        "st. louis": "SLN",
-        "st louis": "SLN",
-        # Rays
-        "rays": "TBA",
-        "tampa bay rays": "TBA",
-        "tampa bay": "TBA",
-        "devil rays": "TBD",
-        "tampa bay devil rays": "TBD",
-        # Rangers
-        "rangers": "TEX",
-        "texas rangers": "TEX",
-        "texas": "TEX",
-        "washington senators": "WAS",
-        "senators": "WAS",
-        # Blue Jays
-        "blue jays": "TOR",
-        "toronto blue jays": "TOR",
-        "toronto": "TOR",
-        "jays": "TOR",
-        "bluejays": "TOR",
-        # Nationals
-        "nationals": "WAS",
-        "washington nationals": "WAS",
-        "washington": "WAS",
-        "nats": "WAS",
-        "expos": "MON",
-        "montreal expos": "MON",
-    }
+    checked, failures, accidents = 0, [], []
+    for term in dict.fromkeys(terms):
+        expected, whole_words = substring_team_match(term)
+        if expected is None:
+            continue
+        checked += 1
+        expected, found = canonical_team_id(expected), get_team_code_from_search(term)
+        if found == expected:
+            continue
+        (failures if whole_words else accidents).append((term, expected, found))
 
-    if search_term in name_mappings:
-        return name_mappings[search_term]
+    for term, expected, found in accidents:
+        click.echo(f"  changed (old match was inside a word) {term!r}: {expected} -> {found}")
+    for term, expected, found in failures:
+        click.echo(f"  MISMATCH {term!r}: expected {expected}, got {found}")
+    click.echo(f"{checked} terms checked, {len(failures)} mismatches")
+    if failures:
+        raise SystemExit(1)
 
-    for name, code in name_mappings.items():
-        if search_term in name or name in search_term:
-            return code
 
-    return search_term.upper()
+@app.cli.command("bench-team-resolver")
+@click.option("--iterations", default=20000, show_default=True, help="Calls per input")
+def bench_team_resolver(iterations):
+    """Time get_team_code_from_search on exact, normalized and fuzzy inputs"""
+    for label, term in TEAM_RESOLVER_SAMPLES:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            code = get_team_code_from_search(term)
+        per_call = (time.perf_counter() - start) / iterations * 1e6
+        click.echo(f"{label:<12} {term!r:<24} -> {code:<6} {per_call:8.2f} us/call")
 
 
 def get_team_name(team_id, year=None, mode=None):
     """Get full team name for display"""
-    team_names = {
-        # Angels - various eras
-        "ALT": "Los Angeles Angels",  # Early Angels
-        "CAL": "California Angels",  # California era
-        "ANA": "Anaheim Angels",  # Anaheim era
-        "LAA": "Los Angeles Angels",  # Current era
-        # Diamondbacks
-        "ARI": "Arizona Diamondbacks",
-        # Braves - moved cities
-        "BSN": "Boston Braves",  # Boston era
-        "ML1": "Milwaukee Braves",  # Milwaukee era
-        "MLA": "Milwaukee Braves",  # Alternative Milwaukee code
-        "ATL": "Atlanta Braves",  # Current Atlanta era
-        # Orioles / St. Louis Browns
-        "SLA": "St. Louis Browns",  # Before moving to Baltimore
-        "BAL": "Baltimore Orioles",  # Current
-        # Red Sox
-        "BS1": "Boston Red Sox",  # Historical code
-        "BOS": "Boston Red Sox",  # Current
-        # Cubs
-        "CHN": "Chicago Cubs",  # Database code
-        "CHC": "Chicago Cubs",  # Alternative
-        # White Sox
-        "CHA": "Chicago White Sox",  # Database code
-        "CHW": "Chicago White Sox",  # Alternative
-        "CWS": "Chicago White Sox",  # Alternative
-        # Reds
-        "CN2": "Cincinnati Reds",  # Historical code
-        "CN3": "Cincinnati Reds",  # Another historical code
-        "CIN": "Cincinnati Reds",  # Current
-        # Indians/Guardians
-        "CLE": "Cleveland Guardians",  # Current (covers both Indians/Guardians)
-        # Rockies
-        "COL": "Colorado Rockies",
-        # Tigers
-        "DET": "Detroit Tigers",
-        # Astros
-        "HOU": "Houston Astros",
-        # Royals
-        "KCA": "Kansas City Royals",  # Historical code
-        # Dodgers - Brooklyn to LA
-        "BR1": "Brooklyn Dodgers",  # Early Brooklyn era
-        "BR2": "Brooklyn Dodgers",  # Brooklyn era
-        "BR4": "Brooklyn Dodgers",  # Another Brooklyn code
-        "BRO": "Brooklyn Dodgers",  # If this code exists
-        "LAD": "Los Angeles Dodgers",  # Alternative current
-        "LAN": "Los Angeles Dodgers",  # Database code
-        # Marlins
-        "FLA": "Florida Marlins",  # Florida era
-        "MIA": "Miami Marlins",  # Current Miami era
-        # Brewers
-        "MIL": "Milwaukee Brewers",
-        # Twins
-        "MIN": "Minnesota Twins",
-        # Mets
-        "NYN": "New York Mets",
-        # Yankees
-        "NYA": "New York Yankees",
-        # Athletics - Philadelphia to Oakland
-        "PHA": "Philadelphia Athletics",  # Philadelphia era
-        "OAK": "Oakland Athletics",  # Current Oakland era
-        # Phillies
-        "PHN": "Philadelphia Phillies",  # Historical code
-        "PH3": "Philadelphia Phillies",  # Another historical code
-        "PHI": "Philadelphia Phillies",  # Current
-        # Pirates
-        "PIT": "Pittsburgh Pirates",
-        # Padres
-        "SDN": "San Diego Padres",  # Database code
-        # Mariners
-        "SEA": "Seattle Mariners",
-        # Giants - New York to San Francisco
-        "NY1": "New York Giants",  # If this code exists
-        "SFN": "San Francisco Giants",  # Current
-        "SF": "San Francisco Giants",  # Alternative
-        # Cardinals
-        "SLN": "St. Louis Cardinals",
-        # Rays
-        "TBD": "Tampa Bay Devil Rays",  # Devil Rays era
-        "TBA": "Tampa Bay Rays",  # Current Rays era
-        "TB": "Tampa Bay Rays",  # Alternative
-        # Rangers / Washington Senators
-        "WAS": "Washington Senators",  # Before moving to Texas
-        "TEX": "Texas Rangers",  # Current
-        # Blue Jays
-        "TOR": "Toronto Blue Jays",
-        # Nationals / Montreal Expos
-        "MON": "Montreal Expos",  # Montreal era
-        "WSN": "Washington Nationals",  # Current
-        "WAS": "Washington Nationals",  # Alternative (though might conflict with Senators)
-    }
+    try:
+        team = get_team_registry().team(team_id)
+    except Exception as e:
+        print(f"Team registry unavailable: {e}")
+        team = None
 
-    base_name = team_names.get(team_id.upper(), team_id)
+    # Season pages use that season's name, all-time pages the latest one
+    season_year = year if mode == "season" else None
+    base_name = team.name_in(season_year) if team else team_id
 
     # Check mode first, then year
     if mode == "season" and year is not None:
@@ -1893,404 +4408,342 @@ def get_team_name(team_id, year=None, mode=None):
 
 def get_team_logo_url(team_id, year=None):
     """Get team logo URL using working MLB logo sources"""
+    try:
+        team = get_team_registry().team(team_id)
+    except Exception as e:
+        print(f"Team registry unavailable: {e}")
+        team = None
 
-    mlb_team_mapping = {
-        # Angels
-        "ALT": {"abbrev": "LAA", "id": "108"},
-        "CAL": {"abbrev": "LAA", "id": "108"},
-        "ANA": {"abbrev": "LAA", "id": "108"},
-        "LAA": {"abbrev": "LAA", "id": "108"},
-        # Diamondbacks
-        "ARI": {"abbrev": "ARI", "id": "109"},
-        # Braves
-        "BSN": {"abbrev": "ATL", "id": "144"},
-        "ML1": {"abbrev": "ATL", "id": "144"},
-        "MLA": {"abbrev": "ATL", "id": "144"},
-        "ATL": {"abbrev": "ATL", "id": "144"},
-        # Orioles
-        "SLA": {"abbrev": "BAL", "id": "110"},
-        "BAL": {"abbrev": "BAL", "id": "110"},
-        # Red Sox
-        "BS1": {"abbrev": "BOS", "id": "111"},
-        "BOS": {"abbrev": "BOS", "id": "111"},
-        # Cubs
-        "CHN": {"abbrev": "CHC", "id": "112"},
-        "CHC": {"abbrev": "CHC", "id": "112"},
-        # White Sox
-        "CHA": {"abbrev": "CWA", "id": "145"},
-        "CHW": {"abbrev": "CHA", "id": "145"},
-        "CWS": {"abbrev": "CWA", "id": "145"},
-        # Reds
-        "CN2": {"abbrev": "CIN", "id": "113"},
-        "CN3": {"abbrev": "CIN", "id": "113"},
-        "CIN": {"abbrev": "CIN", "id": "113"},
-        # Indians/Guardians
-        "CLE": {"abbrev": "CLE", "id": "114"},
-        # Rockies
-        "COL": {"abbrev": "COL", "id": "115"},
-        # Tigers
-        "DET": {"abbrev": "DET", "id": "116"},
-        # Astros
-        "HOU": {"abbrev": "HOU", "id": "117"},
-        # Royals
-        "KCA": {"abbrev": "KCA", "id": "118"},
-        #'KCR': {'abbrev': 'KCA', 'id': '118'},
-        # Dodgers
-        "BR1": {"abbrev": "LAD", "id": "119"},
-        "BR2": {"abbrev": "LAD", "id": "119"},
-        "BR4": {"abbrev": "LAD", "id": "119"},
-        "BRO": {"abbrev": "LAD", "id": "119"},
-        "LAD": {"abbrev": "LAD", "id": "119"},
-        "LAN": {"abbrev": "LAD", "id": "119"},
-        # Marlins
-        "FLA": {"abbrev": "MIA", "id": "146"},
-        "MIA": {"abbrev": "MIA", "id": "146"},
-        # Brewers
-        "MIL": {"abbrev": "MIL", "id": "158"},
-        # Twins
-        "MIN": {"abbrev": "MIN", "id": "142"},
-        # Mets
-        "NYN": {"abbrev": "NYN", "id": "121"},
-        # Yankees
-        "NYA": {"abbrev": "NYA", "id": "147"},
-        # Athletics
-        "PHA": {"abbrev": "OAK", "id": "133"},
-        "OAK": {"abbrev": "OAK", "id": "133"},
-        # Phillies
-        "PHN": {"abbrev": "PHI", "id": "143"},
-        "PH3": {"abbrev": "PHI", "id": "143"},
-        "PHI": {"abbrev": "PHI", "id": "143"},
-        # Pirates
-        "PIT": {"abbrev": "PIT", "id": "134"},
-        # Padres
-        "SDP": {"abbrev": "SDN", "id": "135"},
-        "SD": {"abbrev": "SDN", "id": "135"},
-        # Mariners
-        "SEA": {"abbrev": "SEA", "id": "136"},
-        # Giants
-        "NY1": {"abbrev": "SFN", "id": "137"},
-        "SFN": {"abbrev": "SFN", "id": "137"},
-        "SF": {"abbrev": "SFN", "id": "137"},
-        # Cardinals
-        "SLN": {"abbrev": "SLN", "id": "138"},
-        # Rays
-        "TBD": {"abbrev": "TB", "id": "139"},
-        "TBA": {"abbrev": "TB", "id": "139"},
-        "TB": {"abbrev": "TB", "id": "139"},
-        # Rangers
-        "WAS": {"abbrev": "TEX", "id": "140"},
-        "TEX": {"abbrev": "TEX", "id": "140"},
-        # Blue Jays
-        "TOR": {"abbrev": "TOR", "id": "141"},
-        # Nationals
-        "MON": {"abbrev": "WSH", "id": "120"},
-        "WSN": {"abbrev": "WSH", "id": "120"},
-        "WAS": {"abbrev": "WSH", "id": "120"},
-    }
-
-    # Get team info
-    team_info = mlb_team_mapping.get(
-        team_id.upper(), {"abbrev": team_id.upper(), "id": "0"}
-    )
-    abbrev = team_info["abbrev"]
-    team_number = team_info["id"]
-
-    # Try multiple URL patterns that are known to work
-    logo_urls = [
-        # MLB official team logos - using team ID
-        f"https://www.mlbstatic.com/team-logos/url/{team_number}.svg",
-        # Alternative MLB static URLs
-        f"https://img.mlbstatic.com/mlb-photos/image/upload/v1/team/{abbrev.lower()}/logo/current",
-        # ESPN logos (reliable fallback)
-        f"https://a.espncdn.com/i/teamlogos/mlb/500/{abbrev.lower()}.png",
-        # Sports logos database
-        f"https://content.sportslogos.net/logos/54/{team_number}/{abbrev}-logo-primary-dark.png",
-        # Loodibee logos (free transparent PNGs)
-        f"https://loodibee.com/wp-content/uploads/mlb-{abbrev.lower()}-logo-transparent.png",
-        # TeamColorCodes fallback
-        f"https://teamcolorcodes.com/wp-content/uploads/{abbrev.lower()}-logo.png",
-    ]
-
-    return logo_urls[0]  # Return primary URL
+    if team is None:
+        return team_logo_descriptor(team_id.lower(), "0")["mlb"]
+    return team.logo["mlb"]
 
 
 def get_team_logo_with_fallback(team_id, year=None):
     """Get team logo with fallback options"""
-    mlb_team_mapping = {
-        # mappings - database code to ESPN abbreviation
-        "CHN": {"abbrev": "chc"},  # Cubs
-        "CHA": {"abbrev": "cws"},  # White Sox
-        "LAN": {"abbrev": "lad"},  # Dodgers
-        "SLN": {"abbrev": "stl"},  # Cardinals
-        "SDN": {"abbrev": "sd"},  # Padres
-        "SFN": {"abbrev": "sf"},  # Giants
-        "NYN": {"abbrev": "nym"},  # Mets
-        "NYA": {"abbrev": "nyy"},  # Yankees
-        "KCA": {"abbrev": "kc"},  # Royals 
-        "WAS": {"abbrev": "wsh"},  # Nationals
-        "TBA": {"abbrev": "tb"},  # Rays
-        "WSN": {"abbrev": "wsh"},  # Alternative Nationals code
-        "LAA": {"abbrev": "laa"},  # Angels
-        "ARI": {"abbrev": "ari"},  # Diamondbacks
-        "ATL": {"abbrev": "atl"},  # Braves
-        "BAL": {"abbrev": "bal"},  # Orioles
-        "BOS": {"abbrev": "bos"},  # Red Sox
-        "CIN": {"abbrev": "cin"},  # Reds
-        "CLE": {"abbrev": "cle"},  # Guardians
-        "COL": {"abbrev": "col"},  # Rockies
-        "DET": {"abbrev": "det"},  # Tigers
-        "HOU": {"abbrev": "hou"},  # Astros
-        "MIL": {"abbrev": "mil"},  # Brewers
-        "MIN": {"abbrev": "min"},  # Twins
-        "OAK": {"abbrev": "oak"},  # Athletics
-        "PHI": {"abbrev": "phi"},  # Phillies
-        "PIT": {"abbrev": "pit"},  # Pirates
-        "SEA": {"abbrev": "sea"},  # Mariners
-        "TEX": {"abbrev": "tex"},  # Rangers
-        "TOR": {"abbrev": "tor"},  # Blue Jays
-        "MIA": {"abbrev": "mia"},  # Marlins
-    }
-
-    team_info = mlb_team_mapping.get(team_id.upper(), {"abbrev": team_id.lower()})
-    abbrev = team_info["abbrev"]
-
-    primary_url = f"https://a.espncdn.com/i/teamlogos/mlb/500/{abbrev}.png"
+    try:
+        team = get_team_registry().team(team_id)
+    except Exception as e:
+        print(f"Team registry unavailable: {e}")
+        team = None
 
-    fallback_urls = [
-        f"https://loodibee.com/wp-content/uploads/mlb-{abbrev}-logo-transparent.png",
-        f"https://content.sportslogos.net/logos/54/team/{abbrev}-logo-primary-dark.png",
-    ]
+    logo = team.logo if team else team_logo_descriptor(team_id.lower(), "0")
+    return {"primary": logo["primary"], "fallbacks": logo["fallbacks"]}
 
-    return {"primary": primary_url, "fallbacks": fallback_urls}
 
+def format_and_round_stats(stats):
+    """Format stats with proper decimal places - updated for StatHead format
 
-def format_and_round_stats(stats_dict):
-    """Format stats with proper decimal places - updated for StatHead format"""
+    Takes one stats dict, or a DataFrame of many rows that is formatted a
+    column at a time and comes back as a list of dicts.
+    """
+    if isinstance(stats, dict):
+        return format_and_round_stats(pd.DataFrame([stats]))[0]
 
     # Stats that should show one decimal place
     per_game_stats = ["rpg", "rapg"]
-
-    formatted_stats = {}
-
-    for key, value in stats_dict.items():
-        if value is None or pd.isna(value):
-            formatted_stats[key] = None
-            continue
-
-        try:
-            num_value = float(value)
-        except (ValueError, TypeError):
-            formatted_stats[key] = value
-            continue
+    # Stats that read like batting averages
+    rate_stats = ["win_pct"]
+
+    formatted = {}
+    for key, column in stats.items():
+        column = column.astype(object)
+        numbers = pd.to_numeric(column.map(
+            lambda value: float(value) if isinstance(value, (bool, np.bool_)) else value
+        ), errors="coerce").astype(float)
+        is_number = np.isfinite(numbers)
+        missing = column.isna()
 
         if key in per_game_stats:
             # Per-game stats get 1 decimal place
-            formatted_stats[key] = f"{num_value:.1f}"
+            values = numbers.map("{:.1f}".format)
+        elif key in rate_stats:
+            values = numbers.map("{:.3f}".format)
         else:
             # Everything else is whole numbers
-            if isinstance(num_value, float) and num_value.is_integer():
-                formatted_stats[key] = int(num_value)
-            elif isinstance(num_value, float):
-                formatted_stats[key] = int(round(num_value))
-            else:
-                formatted_stats[key] = value
-
-    return formatted_stats
+            values = numbers.round().where(is_number, 0).astype(np.int64).map(int)
 
+        # Anything that isn't a number passes through untouched
+        formatted[key] = values.where(is_number, column).astype(object).where(~missing, None)
 
-def get_regular_season_h2h(engine, team_a, team_b, year_filter=None):
-    """
-    Get regular season head-to-head record from retrosheet_teamstats
-    Updated to use SQLAlchemy properly
-    """
-    print(f"=== Starting get_regular_season_h2h for {team_a} vs {team_b} ===")
-    
-    try:
-        from sqlalchemy import text, inspect
-        
-        team_a_ids = get_franchise_team_ids(team_a)
-        team_b_ids = get_franchise_team_ids(team_b)
-        
-        with engine.connect() as conn:
-            print("Database connection established successfully")
-            
-            inspector = inspect(engine)
-            tables = inspector.get_table_names()
-            
-            if 'retrosheet_teamstats' not in tables:
-                print("retrosheet_teamstats table does not exist")
-                return {"error": "retrosheet_teamstats table not found"}
-            
-            print("retrosheet_teamstats table exists")
-            
-            # Check columns
-            columns = inspector.get_columns('retrosheet_teamstats')
-            column_names = [col['name'] for col in columns]
-            print(f"retrosheet_teamstats columns: {column_names}")
-            
-            # Check total row count
-            count_query = text("SELECT COUNT(*) FROM retrosheet_teamstats")
-            result = conn.execute(count_query)
-            total_rows = result.fetchone()[0]
-            print(f"Total rows in retrosheet_teamstats: {total_rows}")
-            
-            if total_rows == 0:
-                print("Table is empty!")
-                return {"team_a_wins": 0, "team_b_wins": 0, "ties": 0, "total_games": 0, "error": "Table is empty"}
+    return pd.DataFrame(formatted, index=stats.index).to_dict(orient="records")
 
-        # Get franchise team IDs
-        team_a_ids = get_franchise_team_ids(team_a)
-        team_b_ids = get_franchise_team_ids(team_b)
-        
-        print(f"Team A ({team_a}) IDs: {team_a_ids}")
-        print(f"Team B ({team_b}) IDs: {team_b_ids}")
-
-        # Build dynamic query with named parameters
-        team_a_placeholders = ",".join([f":team_a_{i}" for i in range(len(team_a_ids))])
-        team_b_placeholders = ",".join([f":team_b_{i}" for i in range(len(team_b_ids))])
-
-        base_query_str = f"""
-        SELECT team, opp, date, win
-        FROM retrosheet_teamstats 
-        WHERE (
-            (team IN ({team_a_placeholders}) AND opp IN ({team_b_placeholders})) OR 
-            (team IN ({team_b_placeholders}) AND opp IN ({team_a_placeholders}))
-        )
-        """
 
-        # Build parameter dictionary
-        params = {}
-        for i, team_id in enumerate(team_a_ids):
-            params[f"team_a_{i}"] = team_id
-        for i, team_id in enumerate(team_b_ids):
-            params[f"team_b_{i}"] = team_id
+H2H_REQUIRED_COLUMNS = {"team", "opp", "date", "win", "loss"}
 
-        if year_filter:
-            base_query_str += " AND CAST(date / 10000 AS INTEGER) = :year_filter"
-            params["year_filter"] = int(year_filter)
 
-        base_query_str += " ORDER BY date, team"
-        
-        print(f"Final query: {base_query_str}")
-        print(f"Query params: {params}")
+@preloaded_dataset
+def get_teamstats_schema():
+    """One-time check that retrosheet_teamstats exists with the columns H2H needs"""
+    inspector = inspect(get_engine())
+    if "retrosheet_teamstats" not in inspector.get_table_names():
+        return {"error": "retrosheet_teamstats table not found"}
 
-        # Execute query using SQLAlchemy text and pandas
-        query = text(base_query_str)
-        games_df = pd.read_sql_query(query, engine, params=params)
-        print(f"Query executed successfully, returned {len(games_df)} rows")
-        
-        if not games_df.empty:
-            print(f"Sample results:\n{games_df.head()}")
+    columns = {col["name"].lower() for col in inspector.get_columns("retrosheet_teamstats")}
+    missing = H2H_REQUIRED_COLUMNS - columns
+    if missing:
+        return {"error": f"retrosheet_teamstats is missing columns: {', '.join(sorted(missing))}"}
 
-        if games_df.empty:
-            print("No games found between these teams")
-            return {"team_a_wins": 0, "team_b_wins": 0, "ties": 0, "total_games": 0}
+    with get_engine().connect() as conn:
+        has_rows = conn.execute(text("SELECT 1 FROM retrosheet_teamstats LIMIT 1")).fetchone() is not None
 
-        # Count wins for each franchise
-        team_a_wins = 0
-        team_b_wins = 0
+    return {"error": None, "empty": not has_rows}
 
-        for _, row in games_df.iterrows():
-            game_winner = row['team']
-            game_win_flag = row['win']
 
-            if game_win_flag == 1:  # This team won
-                if game_winner in team_a_ids:
-                    team_a_wins += 1
-                elif game_winner in team_b_ids:
-                    team_b_wins += 1
+@dataclass(frozen=True)
+class HeadToHeadCube:
+    """Regular-season results between franchises, by season.
 
-        total_games = len(games_df) // 2
+    Every team code in retrosheet_teamstats belongs to one group: its
+    franchise in the team registry, or a group of its own for any code the
+    registry doesn't know. games/wins/losses[a, b, k] are running totals of group a's rows
+    against group b for the seasons before first_year + k, so any season
+    range is a difference of two slices.
+    """
+    franchises: tuple
+    group_index: dict
+    first_year: int
+    games: np.ndarray
+    wins: np.ndarray
+    losses: np.ndarray
+
+    @property
+    def last_year(self):
+        return self.first_year + self.games.shape[2] - 2
+
+    def bounds(self, start_year=None, end_year=None):
+        """Slice positions on the season axis covering start_year..end_year"""
+        seasons = self.games.shape[2] - 1
+        lo = 0 if start_year is None else min(max(start_year - self.first_year, 0), seasons)
+        hi = seasons if end_year is None else min(max(end_year - self.first_year + 1, 0), seasons)
+        return lo, max(lo, hi)
+
+    def totals(self, start_year=None, end_year=None):
+        """(games, wins, losses) matrices summed over the season range"""
+        lo, hi = self.bounds(start_year, end_year)
+        return tuple(cube[:, :, hi] - cube[:, :, lo] for cube in (self.games, self.wins, self.losses))
+
+    def record(self, team_a_ids, team_b_ids, start_year=None, end_year=None):
+        """Same shape as the SQL H2H result, or None if either side isn't a group"""
+        a = self.group_index.get(frozenset(team_a_ids))
+        b = self.group_index.get(frozenset(team_b_ids))
+        if a is None or b is None:
+            return None
+
+        lo, hi = self.bounds(start_year, end_year)
+
+        def season_total(cube, row, col):
+            return int(cube[row, col, hi]) - int(cube[row, col, lo])
+
+        pairs = [(a, a)] if a == b else [(a, b), (b, a)]
+        game_rows = sum(season_total(self.games, *pair) for pair in pairs)
+        # A tie is a game whose rows are neither wins nor losses, as in /team/h2h/matrix
+        decided_rows = sum(
+            season_total(self.wins, *pair) + season_total(self.losses, *pair) for pair in pairs
+        )
+        if a == b:
+            team_a_wins, team_b_wins = season_total(self.wins, a, a), 0
+        else:
+            team_a_wins, team_b_wins = season_total(self.wins, a, b), season_total(self.wins, b, a)
 
-        result = {
+        return {
             "team_a_wins": team_a_wins,
             "team_b_wins": team_b_wins,
-            "ties": 0,
-            "total_games": total_games,
+            "ties": (game_rows - decided_rows) // 2,
+            "total_games": game_rows // 2,
         }
-        
-        print(f"Final result: {result}")
+
+    def to_snapshot(self):
+        return {"games": self.games, "wins": self.wins, "losses": self.losses}, {
+            "franchises": list(self.franchises),
+            "first_year": self.first_year,
+            "groups": [[sorted(team_ids), i] for team_ids, i in self.group_index.items()],
+        }
+
+    @classmethod
+    def from_snapshot(cls, arrays, meta):
+        return cls(
+            franchises=tuple(meta["franchises"]),
+            group_index={frozenset(team_ids): i for team_ids, i in meta["groups"]},
+            first_year=meta["first_year"],
+            games=arrays["games"],
+            wins=arrays["wins"],
+            losses=arrays["losses"],
+        )
+
+
+@preloaded_dataset
+def get_head_to_head_cube():
+    """Build the franchise H2H cube from per-season team/opponent totals"""
+    snapshot = read_snapshot_dataset("head_to_head_cube")
+    if snapshot is not None:
+        return HeadToHeadCube.from_snapshot(*snapshot)
+
+    query = text("""
+        SELECT team, opp, CAST(date / 10000 AS INTEGER) AS yearid,
+               COUNT(*) AS games,
+               SUM(CASE WHEN win = 1 THEN 1 ELSE 0 END) AS wins,
+               SUM(CASE WHEN loss = 1 THEN 1 ELSE 0 END) AS losses
+        FROM retrosheet_teamstats
+        GROUP BY team, opp, CAST(date / 10000 AS INTEGER)
+    """)
+    df = pd.read_sql_query(query, get_engine()).dropna(subset=["team", "opp", "yearid"])
+
+    franchises = []
+    group_index = {}
+    code_group = {}
+    for franchid, franchise in get_team_registry().franchises.items():
+        group_index[frozenset(franchise.team_ids)] = len(franchises)
+        for team_id in franchise.team_ids:
+            code_group[team_id] = len(franchises)
+        franchises.append(franchid)
+    for code in sorted(set(df["team"]).union(df["opp"]) - set(code_group)):
+        group_index[frozenset([code])] = len(franchises)
+        code_group[code] = len(franchises)
+        franchises.append(code)
+
+    if df.empty:
+        first_year, seasons = 0, 0
+    else:
+        first_year = int(df["yearid"].min())
+        seasons = int(df["yearid"].max()) - first_year + 1
+
+    size = len(franchises)
+    team = df["team"].map(code_group).to_numpy()
+    opp = df["opp"].map(code_group).to_numpy()
+    season = df["yearid"].to_numpy(dtype=np.int64) - first_year + 1
+
+    cubes = []
+    for column in ("games", "wins", "losses"):
+        cube = np.zeros((size, size, seasons + 1), dtype=np.int32)
+        np.add.at(cube, (team, opp, season), df[column].fillna(0).to_numpy(dtype=np.int32))
+        cube = np.cumsum(cube, axis=2, dtype=np.int32)
+        cube.setflags(write=False)
+        cubes.append(cube)
+
+    return HeadToHeadCube(tuple(franchises), group_index, first_year, *cubes)
+
+
+def query_regular_season_h2h(engine, team_a_ids, team_b_ids, start_year=None, end_year=None):
+    """Aggregate the H2H record straight from retrosheet_teamstats"""
+    team_a_placeholders = ",".join([f":team_a_{i}" for i in range(len(team_a_ids))])
+    team_b_placeholders = ",".join([f":team_b_{i}" for i in range(len(team_b_ids))])
+
+    query_str = f"""
+    SELECT COUNT(*) AS game_rows,
+           COALESCE(SUM(CASE WHEN win = 1 AND team IN ({team_a_placeholders}) THEN 1 ELSE 0 END), 0) AS team_a_wins,
+           COALESCE(SUM(CASE WHEN win = 1 AND team NOT IN ({team_a_placeholders}) THEN 1 ELSE 0 END), 0) AS team_b_wins,
+           COALESCE(SUM(CASE WHEN win = 1 THEN 1 ELSE 0 END + CASE WHEN loss = 1 THEN 1 ELSE 0 END), 0) AS decided_rows
+    FROM retrosheet_teamstats
+    WHERE (
+        (team IN ({team_a_placeholders}) AND opp IN ({team_b_placeholders})) OR
+        (team IN ({team_b_placeholders}) AND opp IN ({team_a_placeholders}))
+    )
+    """
+
+    params = {}
+    for i, team_id in enumerate(team_a_ids):
+        params[f"team_a_{i}"] = team_id
+    for i, team_id in enumerate(team_b_ids):
+        params[f"team_b_{i}"] = team_id
+
+    # Dates are stored as YYYYMMDD integers; a range keeps the filter indexable
+    if start_year is not None:
+        query_str += " AND date >= :date_from"
+        params["date_from"] = start_year * 10000
+    if end_year is not None:
+        query_str += " AND date < :date_to"
+        params["date_to"] = (end_year + 1) * 10000
+
+    with engine.connect() as conn:
+        game_rows, team_a_wins, team_b_wins, decided_rows = conn.execute(text(query_str), params).fetchone()
+
+    return {
+        "team_a_wins": int(team_a_wins),
+        "team_b_wins": int(team_b_wins),
+        "ties": (int(game_rows) - int(decided_rows)) // 2,
+        "total_games": int(game_rows) // 2,
+    }
+
+
+def get_regular_season_h2h(engine, team_a, team_b, year_filter=None, start_year=None, end_year=None):
+    """
+    Get regular season head-to-head record from retrosheet_teamstats.
+    Each game has a row per team, so wins are counted from the winning
+    side's row and games are half the matching rows. Franchise matchups
+    are answered from the H2H cube, anything else from SQL.
+    """
+    empty_record = {"team_a_wins": 0, "team_b_wins": 0, "ties": 0, "total_games": 0}
+
+    try:
+        schema = get_teamstats_schema()
+        if schema["error"]:
+            return {"error": schema["error"]}
+        if schema["empty"]:
+            return {**empty_record, "error": "Table is empty"}
+
+        if year_filter:
+            start_year = end_year = int(year_filter)
+
+        team_a_ids = get_franchise_team_ids(team_a)
+        team_b_ids = get_franchise_team_ids(team_b)
+
+        result = None
+        try:
+            result = get_head_to_head_cube().record(team_a_ids, team_b_ids, start_year, end_year)
+        except Exception as e:
+            print(f"H2H cube unavailable, querying directly: {e}")
+        if result is None:
+            result = query_regular_season_h2h(engine, team_a_ids, team_b_ids, start_year, end_year)
+
         return result
 
     except Exception as e:
         print(f"get_regular_season_h2h error: {str(e)}")
-        import traceback
-        print(f"Full traceback: {traceback.format_exc()}")
-        return {
-            "team_a_wins": 0,
-            "team_b_wins": 0,
-            "ties": 0,
-            "total_games": 0,
-            "error": str(e),
-        }
+        return {**empty_record, "error": str(e)}
 
 
-def get_head_to_head_record(team_a, team_b, year_filter=None):
+def get_head_to_head_record(team_a, team_b, year_filter=None, start_year=None, end_year=None):
     """
-    Get head-to-head record between two teams using SQLAlchemy
+    Get head-to-head record between two teams
     """
     try:
-        from sqlalchemy import text
-        
         # Get regular season head-to-head 
-        regular_season_record = get_regular_season_h2h(db_engine, team_a, team_b, year_filter)
-
-        # Get playoff data using SQLAlchemy
-        playoff_query = text("""
-        SELECT yearid, round, teamidwinner, teamidloser, wins, losses
-        FROM lahman_seriespost 
-        WHERE (
-            (teamidwinner = :team_a AND teamidloser = :team_b) OR 
-            (teamidwinner = :team_b AND teamidloser = :team_a)
+        regular_season_record = get_regular_season_h2h(
+            get_engine(), team_a, team_b, year_filter, start_year, end_year
         )
-        """)
-
-        params = {"team_a": team_a, "team_b": team_b}
 
+        # Playoff series between the two teams
         if year_filter:
-            playoff_query = text("""
-            SELECT yearid, round, teamidwinner, teamidloser, wins, losses
-            FROM lahman_seriespost 
-            WHERE (
-                (teamidwinner = :team_a AND teamidloser = :team_b) OR 
-                (teamidwinner = :team_b AND teamidloser = :team_a)
-            ) AND yearid = :year_filter
-            """)
-            params["year_filter"] = year_filter
+            try:
+                start_year = end_year = int(year_filter)
+            except ValueError:
+                start_year, end_year = 1, 0  # matches nothing
+        series = get_postseason_index().matchups(team_a, team_b, start_year, end_year)
 
-        playoff_df = pd.read_sql_query(playoff_query, db_engine, params=params)
-
-        # Process playoff data
-        team_a_series_wins = len(playoff_df[playoff_df["teamidwinner"] == team_a])
-        team_b_series_wins = len(playoff_df[playoff_df["teamidwinner"] == team_b])
+        team_a_series_wins = sum(1 for s in series if s[2] == team_a)
+        team_b_series_wins = sum(1 for s in series if s[2] == team_b)
 
         team_a_game_wins = 0
         team_b_game_wins = 0
+        series_details = []
 
-        if "wins" in playoff_df.columns and "losses" in playoff_df.columns:
-            for _, row in playoff_df.iterrows():
-                wins_val = int(row["wins"]) if pd.notna(row["wins"]) else 0
-                losses_val = int(row["losses"]) if pd.notna(row["losses"]) else 0
-
-                if row["teamidwinner"] == team_a:
-                    team_a_game_wins += wins_val
-                    team_b_game_wins += losses_val
-                else:
-                    team_b_game_wins += wins_val
-                    team_a_game_wins += losses_val
+        for yearid, round_name, winner, loser, wins, losses in series:
+            if winner == team_a:
+                team_a_game_wins += wins or 0
+                team_b_game_wins += losses or 0
+            else:
+                team_b_game_wins += wins or 0
+                team_a_game_wins += losses or 0
 
-        series_details = []
-        for _, row in playoff_df.iterrows():
             series_details.append(
                 {
-                    "year": int(row["yearid"]),
-                    "round": row["round"],
-                    "winner": row["teamidwinner"],
-                    "loser": row["teamidloser"],
-                    "series_wins": int(row["wins"]) if pd.notna(row["wins"]) else None,
-                    "series_losses": (
-                        int(row["losses"]) if pd.notna(row["losses"]) else None
-                    ),
+                    "year": yearid,
+                    "round": round_name,
+                    "winner": winner,
+                    "loser": loser,
+                    "series_wins": wins,
+                    "series_losses": losses,
                 }
             )
 
@@ -2315,6 +4768,7 @@ def get_head_to_head_record(team_a, team_b, year_filter=None):
 
 
 @app.route('/team/h2h')
+@cached_route("h2h", h2h_cache_key)
 def team_h2h():
     team_a = request.args.get('team_a')
     team_b = request.args.get('team_b')
@@ -2322,6 +4776,13 @@ def team_h2h():
     
     if not team_a or not team_b:
         return jsonify({"error": "team_a and team_b parameters required"}), 400
+
+    try:
+        if year:
+            int(year)
+        start_year, end_year = parse_year_range_args()
+    except ValueError:
+        return jsonify({"error": "year, from and to must be years"}), 400
     
     try:
         # Parse team inputs to get team codes
@@ -2329,14 +4790,403 @@ def team_h2h():
         team_b_id, _ = parse_team_input(team_b)
         
         # Use the parsed team IDs, not the original strings
-        h2h_data = get_head_to_head_record(team_a_id, team_b_id, year)  # CHANGED THIS LINE
-        
+        h2h_data = get_head_to_head_record(team_a_id, team_b_id, year, start_year, end_year)
+
+        # The record falls back to zeros when the database fails; that's an
+        # outage, not an answer, so it goes out as a 503 (never cached)
+        if "error" in h2h_data or "error" in h2h_data["regular_season"]:
+            return jsonify(h2h_data), 503
+
         return jsonify(h2h_data)
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+
+def parse_year_range_args():
+    """Optional from/to season bounds from the query string"""
+    start = request.args.get("from", "").strip()
+    end = request.args.get("to", "").strip()
+    return (int(start) if start else None, int(end) if end else None)
+
+
+@app.route('/team/h2h/matrix')
+@cached_route("h2h", h2h_matrix_cache_key)
+def team_h2h_matrix():
+    """Regular-season record of every franchise against every other one.
+
+    Takes a single `year` or a `from`/`to` season range (default: all
+    seasons). wins[i][j] is franchise i's wins against franchise j, and
+    likewise for losses, ties and games.
+    """
+    try:
+        year = request.args.get("year", "").strip()
+        if year:
+            start_year = end_year = int(year)
+        else:
+            start_year, end_year = parse_year_range_args()
+    except ValueError:
+        return jsonify({"error": "year, from and to must be years"}), 400
+
+    try:
+        cube = get_head_to_head_cube()
+        games, wins, losses = cube.totals(start_year, end_year)
+
+        # Only franchises that played in the range
+        active = np.flatnonzero(games.sum(axis=1) > 0)
+        games, wins, losses = (m[np.ix_(active, active)] for m in (games, wins, losses))
+
+        return jsonify({
+            "from": start_year if start_year is not None else cube.first_year,
+            "to": end_year if end_year is not None else cube.last_year,
+            "franchises": [cube.franchises[i] for i in active],
+            "wins": wins.tolist(),
+            "losses": losses.tolist(),
+            "ties": (games - wins - losses).tolist(),
+            "games": games.tolist(),
+        })
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/cache-stats")
+def cache_stats():
+    """Response cache counters and the data version they were built against"""
+    return jsonify({
+        **response_cache.snapshot(),
+        "shared": shared_response_cache.snapshot(),
+        "data_version": _data_version["value"],
+    })
+
+# Tables loaded by `flask load-local-db`, with the CSV file names accepted
+# for each besides "<table>.csv": the Lahman export, Retrosheet team stats
+# and the WAR download
+LOCAL_DB_TABLES = {
+    "lahman_people": ["People.csv"],
+    "lahman_batting": ["Batting.csv"],
+    "lahman_pitching": ["Pitching.csv"],
+    "lahman_fielding": ["Fielding.csv"],
+    "lahman_teams": ["Teams.csv"],
+    "lahman_teamsfranchises": ["TeamsFranchises.csv"],
+    "lahman_seriespost": ["SeriesPost.csv"],
+    "lahman_awardsplayers": ["AwardsPlayers.csv"],
+    "lahman_allstarfull": ["AllstarFull.csv"],
+    "retrosheet_teamstats": ["teamstats.csv"],
+    "jeffbagwell_war": ["war.csv"],
+}
+
+# Indexes for the lookups the app makes: (table, columns)
+LOCAL_DB_INDEXES = [
+    ("lahman_people", ["playerid"]),
+    ("lahman_batting", ["playerid", "yearid"]),
+    ("lahman_batting", ["teamid", "yearid"]),
+    ("lahman_pitching", ["playerid", "yearid"]),
+    ("lahman_pitching", ["teamid", "yearid"]),
+    ("lahman_fielding", ["playerid"]),
+    ("lahman_teams", ["teamid", "yearid"]),
+    ("lahman_seriespost", ["yearid"]),
+    ("lahman_awardsplayers", ["playerid"]),
+    ("lahman_allstarfull", ["playerid"]),
+    ("retrosheet_teamstats", ["team", "opp", "date"]),
+    ("jeffbagwell_war", ["key_bbref"]),
+]
+
+
+def find_table_csv(csv_dir, table):
+    """Path of the CSV for a table in csv_dir (any letter case), or None"""
+    files = {name.lower(): name for name in os.listdir(csv_dir)}
+    for candidate in [f"{table}.csv"] + LOCAL_DB_TABLES[table]:
+        if candidate.lower() in files:
+            return os.path.join(csv_dir, files[candidate.lower()])
+    return None
+
+
+def read_table_csv(path):
+    """Read a CSV with lowercase column names and whole-number columns as integers"""
+    df = pd.read_csv(path, low_memory=False)
+    df.columns = [column.strip().lower() for column in df.columns]
+    for column in df.columns:
+        values = df[column]
+        # Blank cells turn count columns into floats; keep them INTEGER with NULLs
+        if values.dtype.kind == "f" and values.notna().any() and (values.dropna() % 1 == 0).all():
+            df[column] = values.astype("Int64")
+    return df
+
+
+@app.cli.command("load-local-db")
+@click.argument("csv_dir", type=click.Path(exists=True, file_okay=False))
+@click.option("--path", default=LOCAL_DB_PATH or "statlines.sqlite3", show_default=True,
+              help="SQLite file to write")
+def load_local_db(csv_dir, path):
+    """Load the Lahman, Retrosheet and WAR CSVs in CSV_DIR into a SQLite file.
+
+    Serve from it with LOCAL_DB_PATH (and no DATABASE_URL) set.
+    """
+    staging = f"{path}.tmp-{os.getpid()}"
+    if os.path.exists(staging):
+        os.remove(staging)
+
+    engine = create_engine(f"sqlite:///{os.path.abspath(staging)}")
+    loaded = set()
+    try:
+        with engine.begin() as conn:
+            for table in LOCAL_DB_TABLES:
+                csv_path = find_table_csv(csv_dir, table)
+                if csv_path is None:
+                    click.echo(f"{table:<24} skipped (no CSV)")
+                    continue
+                df = read_table_csv(csv_path)
+                df.to_sql(table, conn, index=False, chunksize=10000)
+                loaded.add(table)
+                click.echo(f"{table:<24} {len(df):>9,} rows from {os.path.basename(csv_path)}")
+
+            for table, columns in LOCAL_DB_INDEXES:
+                if table in loaded:
+                    conn.execute(text(
+                        f"CREATE INDEX idx_{table}_{'_'.join(columns)} ON {table} ({', '.join(columns)})"
+                    ))
+            conn.execute(text("ANALYZE"))
+    finally:
+        engine.dispose()
+
+    os.replace(staging, path)
+    click.echo(f"Wrote {len(loaded)} tables to {path}")
+
+
+# Datasets written to the on-disk snapshot
+SNAPSHOT_DATASETS = (get_player_stats_store, get_franchise_totals, get_head_to_head_cube)
+
+
+@app.cli.command("build-snapshot")
+@click.option("--path", default=SNAPSHOT_DIR, show_default=True, help="Snapshot directory to write")
+def build_snapshot(path):
+    """Build the mmap snapshot of the largest datasets from DATABASE_URL"""
+    # Build from the database, not from the snapshot being replaced
+    _snapshot["disabled"] = True
+    reset_datasets()
+
+    start = time.perf_counter()
+    datasets = {get_dataset.dataset_name: get_dataset() for get_dataset in SNAPSHOT_DATASETS}
+    header = write_snapshot(path, datasets, fetch_data_version())
+
+    size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    click.echo(
+        f"Wrote {len(header['datasets'])} datasets ({size / 1e6:.1f} MB) at data version "
+        f"{header['data_version']} to {path} in {time.perf_counter() - start:.1f}s"
+    )
+
+
+def read_process_memory(pid="self"):
+    """RSS, PSS and USS (private pages) of a process in MB, from /proc (Linux)"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss_mb": round(fields.get("Rss", 0.0), 1),
+        "pss_mb": round(fields.get("Pss", 0.0), 1),
+        "uss_mb": round(fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0), 1),
+        "shared_mb": round(fields.get("Shared_Clean", 0.0) + fields.get("Shared_Dirty", 0.0), 1),
+    }
+
+
+@app.route("/memory-stats")
+def memory_stats():
+    """Memory of the worker that serves this request"""
+    try:
+        return jsonify({
+            "pid": os.getpid(),
+            "preloaded": PRELOAD_DATASETS,
+            "datasets": sorted(_datasets),
+            **read_process_memory(),
+        })
+    except OSError as e:
+        return jsonify({"error": f"Memory stats unavailable: {e}"}), 501
+
+
+@app.cli.command("memory-report")
+@click.argument("master_pid", type=int)
+def memory_report(master_pid):
+    """Per-process RSS/PSS/USS of a gunicorn master and its workers.
+
+    USS is what each worker holds on its own; pages still shared with the
+    master after fork only count toward RSS and PSS.
+    """
+    with open(f"/proc/{master_pid}/task/{master_pid}/children") as f:
+        workers = [int(pid) for pid in f.read().split()]
+
+    click.echo(f"{'role':<8}{'pid':>8}{'rss MB':>10}{'pss MB':>10}{'uss MB':>10}{'shared MB':>11}")
+    totals = {"rss_mb": 0.0, "pss_mb": 0.0, "uss_mb": 0.0}
+    for role, pid in [("master", master_pid)] + [("worker", pid) for pid in workers]:
+        memory = read_process_memory(pid)
+        for key in totals:
+            totals[key] += memory[key]
+        click.echo(
+            f"{role:<8}{pid:>8}{memory['rss_mb']:>10.1f}{memory['pss_mb']:>10.1f}"
+            f"{memory['uss_mb']:>10.1f}{memory['shared_mb']:>11.1f}"
+        )
+    click.echo(
+        f"{'total':<16}{totals['rss_mb']:>10.1f}{totals['pss_mb']:>10.1f}{totals['uss_mb']:>10.1f}"
+    )
+    click.echo("PSS total is the real footprint; RSS double-counts shared pages.")
+
+
+# Besides POPULAR_PLAYERS, the team pages and rivalries warmed at boot
+WARM_UP_FRANCHISES = [
+    "Yankees", "Dodgers", "Red Sox", "Cubs", "Giants",
+    "Cardinals", "Braves", "Mets", "Phillies", "Astros",
+]
+WARM_UP_RIVALRIES = [
+    ("Yankees", "Red Sox"),
+    ("Dodgers", "Giants"),
+    ("Cubs", "Cardinals"),
+    ("Yankees", "Mets"),
+    ("Cubs", "White Sox"),
+    ("Dodgers", "Yankees"),
+    ("Mets", "Phillies"),
+    ("Cardinals", "Royals"),
+]
+WARM_UP_RESPONSES = os.environ.get("WARM_UP_RESPONSES", "1") == "1"
+WARM_UP_CONCURRENCY = int(os.environ.get("WARM_UP_CONCURRENCY", "4"))
+
+
+def warm_up_urls():
+    """Career and season pages of the popular players, teams and rivalries"""
+    from urllib.parse import urlencode
+
+    urls = []
+    for name in POPULAR_PLAYERS:
+        for mode in ("career", "season"):
+            for path in ("/player-disambiguate", "/player-two-way"):
+                urls.append(f"{path}?{urlencode({'name': name, 'mode': mode})}")
+    for team in WARM_UP_FRANCHISES:
+        for mode in ("franchise", "season"):
+            urls.append(f"/team?{urlencode({'team': team, 'mode': mode})}")
+    for team_a, team_b in WARM_UP_RIVALRIES:
+        urls.append(f"/team/h2h?{urlencode({'team_a': team_a, 'team_b': team_b})}")
+    return urls
+
+
+def warm_responses():
+    """Request the popular pages once so their responses land in the caches.
+
+    Runs WARM_UP_CONCURRENCY requests at a time through the test client, so
+    the pages are built and cached exactly as a visitor's request would be.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    urls = warm_up_urls()
+    responses = _warm_up["responses"]
+    responses.update(state="running", total=len(urls), done=0, errors={}, elapsed_seconds=None)
+    started_at = time.time()
+
+    def fetch(url):
+        return app.test_client().get(url).status_code
+
+    with ThreadPoolExecutor(max_workers=WARM_UP_CONCURRENCY, thread_name_prefix="warm-up") as executor:
+        futures = {executor.submit(fetch, url): url for url in urls}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                status = future.result()
+                if status >= 500:
+                    responses["errors"][url] = status
+            except Exception as e:
+                responses["errors"][url] = str(e)
+            responses["done"] += 1
+
+    responses.update(state="done", elapsed_seconds=round(time.time() - started_at, 2))
+    print(f"Warmed {len(urls)} popular pages in {responses['elapsed_seconds']}s ({len(responses['errors'])} errors)")
+
+
+def run_warm_up():
+    """Build the datasets, then warm the popular pages once they're all built"""
+    warm_datasets()
+    if _warm_up["failed"] or _warm_up["responses"]["state"] != "pending":
+        return
+    if WARM_UP_RESPONSES:
+        warm_responses()
+    else:
+        _warm_up["responses"]["state"] = "skipped"
+
+
+@app.route("/healthz")
+def healthz():
+    """Liveness: the process is up and serving. Touches neither the database nor the datasets."""
+    return jsonify({"status": "ok", "pid": os.getpid()})
+
+
+@app.route("/readyz")
+def readyz():
+    """Readiness: 200 once every dataset is built and the popular pages are warm"""
+    status = warm_up_status()
+    ready = (
+        status["state"] == "done"
+        and not status["failed"]
+        and status["responses"]["state"] in ("done", "skipped")
+    )
+    if not ready:
+        start_warm_up()
+    return jsonify({"ready": ready, "warm_up": status}), 200 if ready else 503
+
+
+@app.cli.command("import-profile")
+@click.option("--top", default=15, show_default=True, help="Rows per table")
+def import_profile(top):
+    """Profile importing app.py with python -X importtime.
+
+    Shows the total, the app's direct imports by cumulative time, and the
+    slowest individual modules.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+
+    app_row = next((row for row in rows if row[0] == "app"), None)
+    if app_row is None:
+        click.echo(result.stderr[-2000:])
+        raise SystemExit("Importing app failed")
+
+    # importtime prints a module after everything it imported, so app's
+    # subtree is the run of deeper rows just before it
+    end = rows.index(app_row)
+    start = end
+    while start > 0 and rows[start - 1][3] > app_row[3]:
+        start -= 1
+    subtree = rows[start:end]
+    direct = [row for row in subtree if row[3] == app_row[3] + 1]
+
+    click.echo(f"import app: {app_row[2] / 1000:.0f} ms ({app_row[1] / 1000:.0f} ms in app.py itself)\n")
+    click.echo("Direct imports by cumulative time")
+    for name, _, cumulative_us, _ in sorted(direct, key=lambda row: -row[2])[:top]:
+        click.echo(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    click.echo("\nSlowest modules by own time")
+    for name, self_us, _, _ in sorted(subtree, key=lambda row: -row[1])[:top]:
+        click.echo(f"  {self_us / 1000:8.1f} ms  {name}")
+
+
+# Importing the app never touches the database. Under gunicorn (see
+# gunicorn.conf.py) the master builds the datasets in its when_ready hook
+# when preloading, and each worker starts the warm-up once it has loaded
+# the app; otherwise the first /readyz poll starts it.
+PRELOAD_DATASETS = os.environ.get("PRELOAD_DATASETS") == "1"
+
 if __name__ == "__main__":
     port = int(os.environ.get('PORT', 5000))
+    start_warm_up()
 
     app.run(host='0.0.0.0', port=port, debug=False)
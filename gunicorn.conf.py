@@ -0,0 +1,59 @@
+"""Gunicorn settings for Schipper Statlines.
+
+The app is loaded once in the master (preload_app), which builds the
+read-only datasets in when_ready, after binding the port and before
+forking. Workers then share those pages copy-on-write instead of each
+building its own copy, so adding workers costs little memory. Check with
+`flask memory-report <master pid>`. Importing the app itself does no I/O.
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+
+preload_app = os.environ.get("PRELOAD_APP", "1") == "1"
+
+if preload_app:
+    # Reported by /memory-stats
+    os.environ.setdefault("PRELOAD_DATASETS", "1")
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    # Build in the master, where every worker forked afterwards shares the
+    # result. A warm-up thread would not survive the fork.
+    from app import read_process_memory, run_warm_up
+
+    run_warm_up()
+    try:
+        server.log.info("Master memory after preload: %s", read_process_memory())
+    except OSError:
+        pass
+
+
+def pre_fork(server, worker):
+    # Move everything built so far out of the collector's reach. Otherwise
+    # the first collection in each worker writes to every object's header
+    # and un-shares those pages.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        # Pooled connections opened in the master must not be shared across
+        # processes; drop them without closing the master's sockets
+        from app import dispose_engine
+
+        dispose_engine(close=False)
+
+
+def post_worker_init(worker):
+    # Without preload this starts the worker's background build. With it,
+    # the datasets are already built and this is a no-op, unless the
+    # master's build had failures and a retry is due.
+    from app import start_warm_up
+
+    start_warm_up()